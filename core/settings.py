@@ -74,11 +74,51 @@ STATIC_ROOT = BASE_DIR / "staticfiles"         # collectstatic hedefi (prod içi
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Katılım listesi OCR önbelleği (import_attendance)
+OCR_CACHE_DIR = BASE_DIR / ".ocr_cache"
+OCR_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Online video ilerleme kalp atışları: bellekte birleştir, aralıklı toplu yaz
+VIDEO_PROGRESS_BUFFERED = True
+VIDEO_PROGRESS_FLUSH_SECONDS = 10
+
+# Korumalı medya (online video) sunumu: None → Django aralıklı akış (sendfile
+# destekleyen WSGI sunucusunda kopyasız), "x-sendfile" (Apache/lighttpd) ya da
+# "x-accel-redirect" (nginx; MEDIA_ROOT'u bu önekle 'internal' olarak eşleyin)
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Sertifika şablonu: None → ReportLab ile gelen Vera (Türkçe karakterli) fontları
+CERTIFICATE_FONT = None
+CERTIFICATE_FONT_BOLD = None
+CERTIFICATE_LOGO = None        # PNG/JPG yolu; taban katmana bir kez gömülür
+CERTIFICATE_ORG_NAME = ""
+# QR doğrulama bağlantılarının dış adresi ve /verify/ istek sınırı (istek, saniye).
+# Sınır sayacı varsayılan cache'tedir: birden çok işçi süreçle çalışırken CACHES
+# paylaşımlı bir arka uç olmalıdır (ör. "django.core.cache.backends.redis.RedisCache");
+# varsayılan LocMemCache süreç başınadır, N işçi sınırın N katına izin verir.
+SITE_URL = "http://localhost:8000"
+CERTIFICATE_VERIFY_RATE = (30, 60)
+# İndirmede PDF henüz yoksa istek içinde üret (False → kuyruğa al, 202 dön)
+CERTIFICATE_ON_DEMAND = False
+# Sertifika başına toplam üretim denemesi (generate_certificates --max-attempts varsayılanı)
+CERTIFICATE_MAX_ATTEMPTS = 3
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # E-posta (geliştirme)
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "egitim@company.local"
+# Plan hatırlatmaları (send_training_reminders): saniyedeki mesaj sınırı ve parti boyu
+REMINDER_RATE_PER_SECOND = 10
+REMINDER_BATCH_SIZE = 50
+# Giden e-posta kuyruğu (send_outbox): hız sınırı, yeniden deneme aralığı ve günlük özet saati
+OUTBOX_RATE_PER_SECOND = 10
+OUTBOX_BACKOFF_BASE_SECONDS = 60
+OUTBOX_BACKOFF_MAX_SECONDS = 6 * 3600
+OUTBOX_DIGEST_HOUR = 8
+# Gecikmiş ihtiyaç eskalasyonu (escalate_overdue_needs): yönetici bulunamazsa bildirim adresleri
+NEED_ESCALATION_EMAILS = []
 
 # Login yönlendirmeleri
 LOGIN_URL = "/login/"
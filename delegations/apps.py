@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DelegationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'delegations'
+
+    def ready(self):
+        # Zincir indeksi önbelleği için sinyaller
+        from . import signals  # noqa: F401
@@ -0,0 +1,106 @@
+# delegations/compliance.py
+"""
+Vekalet kapsaması × eğitim uyumu raporu.
+
+Her aktif vekalet (from_role → to_role) için:
+- lacks: from_role'ün zorunlu olup to_role tanımında zorunlu olmayan eğitimler,
+- holders / unqualified: to_role görev sahipleri ve from_role'ün zorunlu
+  eğitimlerinden en az birini (geçerli olarak) almamış olanlar,
+- status: ok (hepsi uygun) | partial | none (hiçbiri uygun değil) | empty (görev sahibi yok).
+
+Rapor küme tabanlı birkaç sorguyla (vekaletler, gereklilikler, görev
+sahipleri, GROUP BY katılımlar) tek seferde kurulur ve Django cache'te
+(matris sürümü, uyum kuşağı, gün) anahtarıyla tutulur. Kuşak veritabanında
+(DelegationDocument.compliance_generation) tutulur ve değişikliği yazan
+transaction içinde artırılır: katılım, gereklilik ve görev ataması kayıtları
+sinyallerle, sinyal tetiklemeyen toplu yazımlar (ör. yoklama onayı)
+trainings.signals.enrollments_bulk_changed ile. Anahtar her istekte
+veritabanından okunduğundan süreç başına (LocMemCache) önbellekte de eski
+rapor sunulmaz; paylaşımlı cache yalnızca raporu süreçler arasında paylaştırır.
+Gün değişince geçerlilik süreleri yeniden değerlendirilir.
+"""
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DelegationDocument, RoleDelegation
+from .resolver import active_assignments, completions, holders, is_current, required_by_role
+
+COVERAGE_TTL = 3600
+
+STATUS_OK, STATUS_PARTIAL, STATUS_NONE, STATUS_EMPTY = "ok", "partial", "none", "empty"
+
+
+def bump_generation() -> None:
+    """Uyum verisi değişti: önbellekteki raporlar geçersiz (çağıranın transaction'ında)."""
+    bump = DelegationDocument.objects.filter(pk=1)
+    if not bump.update(compliance_generation=F("compliance_generation") + 1):
+        DelegationDocument.singleton()
+        bump.update(compliance_generation=F("compliance_generation") + 1)
+
+
+def _state() -> Tuple[int, int]:
+    """(matris sürümü, uyum kuşağı) tek sorguda."""
+    row = DelegationDocument.objects.filter(pk=1).values_list("matrix_version", "compliance_generation").first()
+    return row or (0, 0)
+
+
+def _cache_key(version: int, generation: int, today) -> str:
+    return f"delegations:coverage:{version}:{generation}:{today:%Y%m%d}"
+
+
+def build_report(version: Optional[int] = None, today=None) -> dict:
+    today = today or timezone.localdate()
+    if version is None:
+        version = DelegationDocument.current_version()
+
+    active = RoleDelegation.objects.filter(is_active=True)
+    edges = list(active.values_list("from_role_id", "to_role_id"))
+    required = required_by_role()
+    to_roles = active.values("to_role_id")
+    by_role = holders(to_roles)
+    have = completions(
+        active_assignments().filter(job_role_id__in=to_roles).values("user_id"),
+        {t for reqs in required.values() for t in reqs},
+    )
+
+    cells = {}
+    for a, b in edges:
+        need = required.get(a, {})
+        own = required.get(b, {})
+        hs = by_role.get(b, [])
+        unq = [
+            u for u in hs
+            if any(not is_current(have.get((u, t)), months, today) for t, months in need.items())
+        ]
+        if not hs:
+            status = STATUS_EMPTY
+        elif not unq:
+            status = STATUS_OK
+        elif len(unq) == len(hs):
+            status = STATUS_NONE
+        else:
+            status = STATUS_PARTIAL
+        cells[f"{a}_{b}"] = {
+            "status": status,
+            "lacks": sorted(t for t in need if t not in own),
+            "holders": len(hs),
+            "unqualified": unq,
+        }
+    return {"version": version, "date": today.isoformat(), "cells": cells}
+
+
+def get_report(today=None) -> dict:
+    """Güncel matris sürümü için rapor (önbellekten ya da yeni kurulur)."""
+    today = today or timezone.localdate()
+    version, generation = _state()
+    key = _cache_key(version, generation, today)
+    report = cache.get(key)
+    if report is None:
+        report = build_report(version, today)
+        cache.set(key, report, COVERAGE_TTL)
+    return report
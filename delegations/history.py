@@ -0,0 +1,116 @@
+# delegations/history.py
+"""
+Vekalet matrisi geçmişi.
+
+- Her hücre değişikliği, yazımla aynı transaction içinde DelegationChange'e
+  eklenir (apply_cells / reset_all); kayıt yalnızca eklenir, güncellenmez.
+- Son anlık görüntüden bu yana SNAPSHOT_EVERY değişiklik birikince aktif
+  çiftlerin sıralı, zlib ile sıkıştırılmış bir kopyası (DelegationSnapshot)
+  alınır. Her değişiklik için tam kopya tutulmaz.
+- matrix_at(sürüm): en yakın (≤ sürüm) anlık görüntü açılır, aradaki
+  değişiklikler sürüm sırasıyla oynatılır: en fazla SNAPSHOT_EVERY satır.
+"""
+from __future__ import annotations
+
+import zlib
+from array import array
+from datetime import datetime, time as dtime, timedelta
+from typing import Iterable, Optional, Set, Tuple
+
+from django.utils import timezone
+
+from .models import DelegationChange, DelegationDocument, DelegationSnapshot, RoleDelegation
+
+SNAPSHOT_EVERY = 2000
+
+
+# -------- Kodlama --------
+def encode_pairs(pairs: Iterable[Tuple[int, int]]) -> bytes:
+    flat = array("q")
+    for a, b in sorted(pairs):
+        flat.append(a)
+        flat.append(b)
+    return zlib.compress(flat.tobytes(), 6)
+
+
+def decode_pairs(data) -> Set[Tuple[int, int]]:
+    flat = array("q")
+    flat.frombytes(zlib.decompress(bytes(data)))
+    return set(zip(flat[0::2], flat[1::2]))
+
+
+# -------- Yazma --------
+def record(version: int, changes, user=None, at=None) -> None:
+    """Değişen hücreleri deftere ekler; eşik aşıldıysa anlık görüntü alır."""
+    if not changes:
+        return
+    at = at or timezone.now()
+    user_id = getattr(user, "pk", None)
+    DelegationChange.objects.bulk_create(
+        [
+            DelegationChange(version=version, from_role_id=a, to_role_id=b, is_active=on,
+                             changed_at=at, changed_by_id=user_id)
+            for a, b, on in changes
+        ],
+        batch_size=1000,
+    )
+    last = DelegationSnapshot.objects.order_by("-version").values_list("version", flat=True).first() or 0
+    if DelegationChange.objects.filter(version__gt=last).count() >= SNAPSHOT_EVERY:
+        take_snapshot(version)
+
+
+def take_snapshot(version: Optional[int] = None) -> DelegationSnapshot:
+    """
+    Güncel aktif çiftlerin anlık görüntüsü; çağıranın transaction'ında
+    çalışmalıdır. Sürüm verilmezse DelegationDocument satırı kilitlenir:
+    sürüm ve çiftler arasına başka bir yazım giremez.
+    """
+    if version is None:
+        version = DelegationDocument.lock()
+    pairs = list(RoleDelegation.objects.filter(is_active=True).values_list("from_role_id", "to_role_id"))
+    snap, _ = DelegationSnapshot.objects.update_or_create(
+        version=version, defaults={"data": encode_pairs(pairs), "pair_count": len(pairs)}
+    )
+    return snap
+
+
+# -------- Okuma --------
+def matrix_at(version: int) -> Set[Tuple[int, int]]:
+    """Verilen sürümdeki aktif (from, to) çiftleri."""
+    snap = (
+        DelegationSnapshot.objects.filter(version__lte=version)
+        .order_by("-version").only("version", "data").first()
+    )
+    pairs = decode_pairs(snap.data) if snap else set()
+    base = snap.version if snap else 0
+    rows = (
+        DelegationChange.objects.filter(version__gt=base, version__lte=version)
+        .order_by("version", "id")
+        .values_list("from_role_id", "to_role_id", "is_active")
+    )
+    for a, b, on in rows.iterator(chunk_size=5000):
+        if on:
+            pairs.add((a, b))
+        else:
+            pairs.discard((a, b))
+    return pairs
+
+
+def version_at(when) -> int:
+    """Verilen andaki matris sürümü (o ana kadar yazılan son değişiklik)."""
+    v = (
+        DelegationChange.objects.filter(changed_at__lte=when)
+        .order_by("-version").values_list("version", flat=True).first()
+    )
+    if v is not None:
+        return v
+    # Defter öncesi: başlangıç anlık görüntüsü o tarihten önce alındıysa onu kullan
+    return (
+        DelegationSnapshot.objects.filter(created_at__lte=when)
+        .order_by("-version").values_list("version", flat=True).first() or 0
+    )
+
+
+def end_of_day(day) -> datetime:
+    tz = timezone.get_current_timezone()
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), dtime.min), tz) - timedelta(microseconds=1)
@@ -0,0 +1,89 @@
+# delegations/management/commands/bench_delegation_resolver.py
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+
+from django.core.management.base import BaseCommand
+
+from delegations.resolver import DelegationIndex
+
+
+def _bfs_reach(adj, src):
+    """Karşılaştırma: indekssiz, her sorguda BFS."""
+    seen = {src}
+    queue = deque([src])
+    while queue:
+        v = queue.popleft()
+        for w in adj.get(v, ()):
+            if w not in seen:
+                seen.add(w)
+                queue.append(w)
+    seen.discard(src)
+    return seen
+
+
+class Command(BaseCommand):
+    help = (
+        "Zincirleme vekalet indeksini sentetik bir matrisle ölçer (veritabanına yazmaz): "
+        "kurulum süresi, 'kim vekalet edebilir' ve 'vekil uygun mu' sorgu süreleri."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--roles", type=int, default=1000)
+        parser.add_argument("--edges-per-role", type=int, default=8, help="Rol başına ortalama doğrudan vekalet")
+        parser.add_argument("--queries", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        n = opts["roles"]
+        roles = {i: f"Rol {i}" for i in range(1, n + 1)}
+        edges = set()
+        for a in roles:
+            for _ in range(rng.randint(0, 2 * opts["edges_per_role"])):
+                b = rng.randint(1, n)
+                if a != b:
+                    edges.add((a, b))
+        adj = {}
+        for a, b in edges:
+            adj.setdefault(a, []).append(b)
+
+        t0 = time.perf_counter()
+        idx = DelegationIndex(1, roles, edges)
+        build = time.perf_counter() - t0
+        self.stdout.write(f"{n} rol, {len(edges)} vekalet: indeks {build * 1000:.1f} ms")
+
+        pairs = [(rng.randint(1, n), rng.randint(1, n)) for _ in range(opts["queries"])]
+        t0 = time.perf_counter()
+        for x, y in pairs:
+            idx.can_cover(y, x)
+        per_check = (time.perf_counter() - t0) / len(pairs)
+
+        sample = [x for x, _ in pairs[:200]]
+        t0 = time.perf_counter()
+        for x in sample:
+            idx.coverers(x)
+        per_cover = (time.perf_counter() - t0) / len(sample)
+        t0 = time.perf_counter()
+        for x in sample:
+            idx.chains(x)
+        per_chain = (time.perf_counter() - t0) / len(sample)
+
+        t0 = time.perf_counter()
+        for x in sample:
+            _bfs_reach(adj, x)
+        per_bfs = (time.perf_counter() - t0) / len(sample)
+
+        bad = sum(1 for x in sample[:50] if set(idx.coverers(x)) != _bfs_reach(adj, x))
+        self.stdout.write(
+            f"vekil uygun mu (can_cover): {per_check * 1e6:.2f} µs | "
+            f"kim vekalet edebilir (coverers): {per_cover * 1000:.3f} ms | "
+            f"en kısa zincirler: {per_chain * 1000:.3f} ms | "
+            f"indekssiz BFS: {per_bfs * 1000:.3f} ms"
+        )
+        if bad:
+            self.stderr.write(self.style.ERROR(f"{bad} sorguda BFS ile uyuşmazlık!"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Sonuçlar BFS ile aynı."))
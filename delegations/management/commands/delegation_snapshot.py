@@ -0,0 +1,28 @@
+# delegations/management/commands/delegation_snapshot.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from delegations.history import take_snapshot
+from delegations.models import DelegationChange, DelegationSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Vekalet matrisinin güncel halinin sıkıştırılmış anlık görüntüsünü alır "
+        "(periyodik/cron; geçmiş sorgularında yeniden oynatılacak değişiklik sayısını kısaltır)."
+    )
+
+    def handle(self, *args, **opts):
+        last = DelegationSnapshot.objects.order_by("-version").values_list("version", flat=True).first() or 0
+        pending = DelegationChange.objects.filter(version__gt=last).count()
+        if not pending and last:
+            self.stdout.write(f"Son anlık görüntüden (v{last}) bu yana değişiklik yok.")
+            return
+        with transaction.atomic():
+            snap = take_snapshot()  # matris satırını kilitler; sürüm ve çiftler tutarlı okunur
+        self.stdout.write(self.style.SUCCESS(
+            f"v{snap.version}: {snap.pair_count} aktif vekalet, {len(snap.data) / 1024:.1f} KB "
+            f"({pending} değişiklik sonrası)."
+        ))
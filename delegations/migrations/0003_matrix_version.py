@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delegations', '0002_delegationmatrixlink'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='delegationdocument',
+            name='matrix_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='roledelegation',
+            name='version',
+            field=models.PositiveBigIntegerField(db_index=True, default=0),
+        ),
+    ]
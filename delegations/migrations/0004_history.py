@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+import zlib
+from array import array
+
+from django.db import migrations, models
+
+
+def baseline_snapshot(apps, schema_editor):
+    """Geçmiş kaydı başlamadan önceki matrisin başlangıç anlık görüntüsü."""
+    RoleDelegation = apps.get_model('delegations', 'RoleDelegation')
+    DelegationDocument = apps.get_model('delegations', 'DelegationDocument')
+    DelegationSnapshot = apps.get_model('delegations', 'DelegationSnapshot')
+    version = DelegationDocument.objects.filter(pk=1).values_list('matrix_version', flat=True).first() or 0
+    flat = array('q')
+    pairs = sorted(RoleDelegation.objects.filter(is_active=True).values_list('from_role_id', 'to_role_id'))
+    for a, b in pairs:
+        flat.append(a)
+        flat.append(b)
+    DelegationSnapshot.objects.create(
+        version=version, pair_count=len(pairs), data=zlib.compress(flat.tobytes(), 6)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delegations', '0003_matrix_version'),
+        ('trainings', '0019_need_escalation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DelegationChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(db_index=True)),
+                ('is_active', models.BooleanField()),
+                ('changed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('from_role', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='trainings.jobrole')),
+                ('to_role', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='trainings.jobrole')),
+            ],
+            options={
+                'verbose_name': 'Vekalet Değişikliği',
+                'verbose_name_plural': 'Vekalet Değişiklikleri',
+                'ordering': ['version', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DelegationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('pair_count', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Vekalet Anlık Görüntüsü',
+                'verbose_name_plural': 'Vekalet Anlık Görüntüleri',
+                'ordering': ['-version'],
+            },
+        ),
+        migrations.RunPython(baseline_snapshot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delegations', '0004_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='delegationdocument',
+            name='compliance_generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 
 # Projedeki JobRole modeline doğrudan FK (app label + Model adı)
@@ -12,6 +14,11 @@ class DelegationDocument(models.Model):
     form_no = models.CharField(max_length=50, blank=True, default='')
     revizyon_tarihi = models.DateField(null=True, blank=True)
     guncelleme_tarihi = models.DateField(null=True, blank=True)
+    # Matristeki her değişiklikte bir artar; istemciler "N'den sonraki değişiklikleri" ister
+    matrix_version = models.PositiveBigIntegerField(default=0)
+    # Eğitim uyumu verisi (katılım, gereklilik, görev ataması) her değiştiğinde
+    # yazımla aynı transaction içinde bir artar; kapsama raporu önbellek anahtarı
+    compliance_generation = models.PositiveBigIntegerField(default=0)
 
     class Meta:
         verbose_name = "Vekalet Tablosu Üst Bilgisi"
@@ -28,6 +35,30 @@ class DelegationDocument(models.Model):
         obj, _ = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def current_version(cls) -> int:
+        return cls.objects.filter(pk=1).values_list('matrix_version', flat=True).first() or 0
+
+    @classmethod
+    def lock(cls) -> int:
+        """
+        Tekil satırı çağıranın transaction'ı sonuna kadar kilitler ve güncel
+        sürümü döndürür; yazıcılar (bump_version) bu sürede bekler.
+        """
+        cls.singleton()
+        return cls.objects.select_for_update().filter(pk=1).values_list('matrix_version', flat=True).get()
+
+    @classmethod
+    def bump_version(cls) -> int:
+        """
+        Sürümü bir artırıp yeni değeri döndürür. Çağıranın transaction'ı içinde
+        kullanılmalı: satır kilidi, değişikliklerin sürüm sırasıyla yazılmasını sağlar.
+        """
+        with transaction.atomic():
+            cls.singleton()
+            cls.objects.filter(pk=1).update(matrix_version=F('matrix_version') + 1)
+            return cls.current_version()
+
     def __str__(self):
         return f"Vekalet Üst Bilgi (Form No: {self.form_no or '-'})"
 
@@ -44,6 +75,8 @@ class RoleDelegation(models.Model):
         JOBROLE_MODEL, on_delete=models.CASCADE, related_name='delegations_received'
     )
     is_active = models.BooleanField(default=True)
+    # Hücrenin son değiştiği matris sürümü (DelegationDocument.matrix_version)
+    version = models.PositiveBigIntegerField(default=0, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -63,3 +96,50 @@ class RoleDelegation(models.Model):
 
     def __str__(self):
         return f"{self.from_role} -> {self.to_role} ({'Aktif' if self.is_active else 'Pasif'})"
+
+
+class DelegationChange(models.Model):
+    """
+    Matris hücre değişikliklerinin salt-eklenir kaydı (ISO denetim izi).
+    Rol silinse de kayıt kalır (db_constraint=False, DO_NOTHING).
+    """
+    version = models.PositiveBigIntegerField(db_index=True)
+    from_role = models.ForeignKey(
+        JOBROLE_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    to_role = models.ForeignKey(
+        JOBROLE_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    is_active = models.BooleanField()
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+
+    class Meta:
+        verbose_name = "Vekalet Değişikliği"
+        verbose_name_plural = "Vekalet Değişiklikleri"
+        ordering = ['version', 'id']
+
+    def __str__(self):
+        return f"v{self.version}: {self.from_role_id} -> {self.to_role_id} ({'Aktif' if self.is_active else 'Pasif'})"
+
+
+class DelegationSnapshot(models.Model):
+    """
+    Belirli bir matris sürümündeki aktif çiftlerin sıkıştırılmış kopyası.
+    Geçmiş, en yakın anlık görüntü + sonrasındaki DelegationChange
+    kayıtlarının yeniden oynatılmasıyla kurulur (bkz. delegations/history.py).
+    """
+    version = models.PositiveBigIntegerField(unique=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    pair_count = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Vekalet Anlık Görüntüsü"
+        verbose_name_plural = "Vekalet Anlık Görüntüleri"
+        ordering = ['-version']
+
+    def __str__(self):
+        return f"v{self.version} ({self.pair_count} vekalet)"
@@ -0,0 +1,309 @@
+# delegations/resolver.py
+"""
+Zincirleme vekalet çözümleyicisi.
+
+RoleDelegation yalnızca doğrudan izinleri tutar (from_role → to_role:
+to_role, from_role'ün yerine bakabilir). "X rolüne kimler sonunda
+vekalet edebilir?" sorusu geçişli kapanıştır:
+
+- Aktif roller ve aktif vekaletlerden bitişiklik listesi kurulur; güçlü
+  bağlı bileşenler (Tarjan) çıkarılıp ters topolojik sırayla her bileşenin
+  erişim kümesi Python int bit kümesi olarak hesaplanır. can_cover() tek
+  bit testi, coverers() bit kümesinin açılımıdır.
+- En kısa zincirler kaynak başına BFS ile bulunur ve indekste saklanır.
+- İndeks süreç içinde tutulur; DelegationDocument.matrix_version değişince
+  (tek sorgu ile kontrol) ya da INDEX_TTL dolunca yeniden kurulur. Sinyaller
+  yerel kopyayı hemen düşürür.
+- Yeterlilik: X rolünün zorunlu eğitimleri (TrainingRequirement) ile
+  vekilin tamamlanmış katılımları karşılaştırılır; geçerlilik süresi
+  (validity_months) dolanlar eksik sayılır.
+"""
+from __future__ import annotations
+
+import calendar
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional
+
+from django.apps import apps
+from django.db.models import Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import DelegationDocument, RoleDelegation
+
+INDEX_TTL = 300.0
+CHAIN_CACHE_SIZE = 256
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+# -------- İndeks --------
+class DelegationIndex:
+    def __init__(self, version: int, roles: Dict[int, str], edges: Iterable[tuple]):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.names = roles
+        self.ids: List[int] = list(roles)
+        self.pos = {rid: i for i, rid in enumerate(self.ids)}
+        self.adj: List[List[int]] = [[] for _ in self.ids]
+        for a, b in edges:
+            ia, ib = self.pos.get(a), self.pos.get(b)
+            if ia is not None and ib is not None and ia != ib:
+                self.adj[ia].append(ib)
+        self.edge_count = sum(len(x) for x in self.adj)
+        self._reach = self._closure()
+        self._chains: "OrderedDict[int, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _closure(self) -> List[int]:
+        """Düğüm başına erişim bit kümesi (kendisi dahil), SCC + DP ile."""
+        n = len(self.ids)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        comp = [-1] * n
+        stack: List[int] = []
+        comp_reach: List[int] = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, i = work.pop()
+                if i == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                recurse = False
+                succ = self.adj[v]
+                while i < len(succ):
+                    w = succ[i]
+                    i += 1
+                    if index[w] == -1:
+                        work.append((v, i))
+                        work.append((w, 0))
+                        recurse = True
+                        break
+                    if on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                if recurse:
+                    continue
+                if low[v] == index[v]:
+                    # Tarjan bileşenleri ters topolojik sırayla verir: ardılların
+                    # erişim kümeleri bu noktada hazırdır.
+                    c = len(comp_reach)
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp[w] = c
+                        members.append(w)
+                        if w == v:
+                            break
+                    bits = 0
+                    for w in members:
+                        bits |= 1 << w
+                    for w in members:
+                        for x in self.adj[w]:
+                            if comp[x] != c:
+                                bits |= comp_reach[comp[x]]
+                    comp_reach.append(bits)
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+        return [comp_reach[comp[v]] for v in range(n)]
+
+    # -------- Sorgular --------
+    def can_cover(self, substitute_role: int, role: int) -> bool:
+        """substitute_role, role'ün yerine (zincirle) bakabilir mi?"""
+        i, j = self.pos.get(role), self.pos.get(substitute_role)
+        if i is None or j is None or i == j:
+            return False
+        return bool(self._reach[i] >> j & 1)
+
+    def coverers(self, role: int) -> List[int]:
+        i = self.pos.get(role)
+        if i is None:
+            return []
+        bits = self._reach[i] & ~(1 << i)
+        out = []
+        while bits:
+            low_bit = bits & -bits
+            out.append(self.ids[low_bit.bit_length() - 1])
+            bits ^= low_bit
+        return out
+
+    def _parents(self, role: int) -> dict:
+        with self._lock:
+            hit = self._chains.get(role)
+            if hit is not None:
+                self._chains.move_to_end(role)
+                return hit
+        src = self.pos[role]
+        parent = {src: -1}
+        queue = deque([src])
+        while queue:
+            v = queue.popleft()
+            for w in self.adj[v]:
+                if w not in parent:
+                    parent[w] = v
+                    queue.append(w)
+        with self._lock:
+            self._chains[role] = parent
+            while len(self._chains) > CHAIN_CACHE_SIZE:
+                self._chains.popitem(last=False)
+        return parent
+
+    def chain(self, role: int, substitute_role: int) -> Optional[List[int]]:
+        """role → ... → substitute_role en kısa vekalet zinciri (rol id'leri) ya da None."""
+        if not self.can_cover(substitute_role, role):
+            return None
+        parent = self._parents(role)
+        v, path = self.pos[substitute_role], []
+        while v != -1:
+            path.append(self.ids[v])
+            v = parent[v]
+        return path[::-1]
+
+    def chains(self, role: int) -> Dict[int, List[int]]:
+        """Tüm vekiller için en kısa zincirler (BFS sırası = yakından uzağa)."""
+        if role not in self.pos:
+            return {}
+        parent = self._parents(role)
+        out = {}
+        for v in parent:
+            if parent[v] == -1:
+                continue
+            path, u = [], v
+            while u != -1:
+                path.append(self.ids[u])
+                u = parent[u]
+            out[self.ids[v]] = path[::-1]
+        return out
+
+
+_index: Optional[DelegationIndex] = None
+_index_lock = threading.Lock()
+
+
+def invalidate():
+    global _index
+    _index = None
+
+
+def build_index(version: Optional[int] = None) -> DelegationIndex:
+    JobRole = M("JobRole")
+    if version is None:
+        version = DelegationDocument.current_version()
+    roles = dict(JobRole.objects.filter(is_active=True).order_by("name").values_list("id", "name"))
+    edges = RoleDelegation.objects.filter(is_active=True).values_list("from_role_id", "to_role_id")
+    return DelegationIndex(version, roles, edges.iterator(chunk_size=5000))
+
+
+def get_index() -> DelegationIndex:
+    """Güncel indeks; sürüm aynıysa ve TTL dolmadıysa yeniden kurulmaz."""
+    global _index
+    version = DelegationDocument.current_version()
+    idx = _index
+    if idx is not None and idx.version == version and time.monotonic() - idx.built_at < INDEX_TTL:
+        return idx
+    with _index_lock:
+        idx = _index
+        if idx is None or idx.version != version or time.monotonic() - idx.built_at >= INDEX_TTL:
+            idx = _index = build_index(version)
+    return idx
+
+
+# -------- Yeterlilik --------
+def add_months(d, months: int):
+    y, m = divmod(d.month - 1 + months, 12)
+    y, m = d.year + y, m + 1
+    return d.replace(year=y, month=m, day=min(d.day, calendar.monthrange(y, m)[1]))
+
+
+def required_trainings(role_id: int) -> Dict[int, Optional[int]]:
+    """Rolün zorunlu eğitimleri: {training_id: geçerlilik_ay (None/0 = süresiz)}."""
+    return required_by_role([role_id]).get(role_id, {})
+
+
+def required_by_role(role_ids=None) -> Dict[int, Dict[int, Optional[int]]]:
+    """{rol: {training_id: geçerlilik_ay}}; role_ids liste ya da alt sorgu olabilir."""
+    TrainingRequirement = M("TrainingRequirement")
+    qs = TrainingRequirement.objects.filter(requirement_type="required", is_active=True)
+    if role_ids is not None:
+        qs = qs.filter(job_role_id__in=role_ids)
+    out: Dict[int, Dict[int, Optional[int]]] = {}
+    for role_id, training_id, months in qs.values_list("job_role_id", "training_id", "validity_months"):
+        out.setdefault(role_id, {})[training_id] = months
+    return out
+
+
+def completions(user_ids, training_ids) -> Dict[tuple, object]:
+    """
+    {(user_id, training_id): son tamamlanma} — tek GROUP BY sorgusu.
+    user_ids / training_ids liste ya da alt sorgu (QuerySet) olabilir.
+    """
+    Enrollment = M("Enrollment")
+    done = (
+        Enrollment.objects.filter(user_id__in=user_ids, training_id__in=training_ids)
+        .filter(Q(status="completed") | Q(is_passed=True) | Q(completed_at__isnull=False))
+        .values("user_id", "training_id")
+        .annotate(last=Max("completed_at"), created=Max("created_at"))
+        .order_by()
+    )
+    return {(r["user_id"], r["training_id"]): r["last"] or r["created"] for r in done}
+
+
+def is_current(when, months: Optional[int], today) -> bool:
+    """Tamamlanma tarihi geçerlilik süresi içinde mi?"""
+    if when is None:
+        return False
+    return not months or add_months(timezone.localtime(when).date(), months) >= today
+
+
+def missing_trainings(user_ids: Iterable[int], required: Dict[int, Optional[int]], today=None) -> Dict[int, List[int]]:
+    """Kullanıcı başına eksik (ya da süresi dolmuş) zorunlu eğitim id'leri (tek sorgu)."""
+    user_ids = list(user_ids)
+    if not required:
+        return {u: [] for u in user_ids}
+    today = today or timezone.localdate()
+    have = completions(user_ids, list(required))
+    return {
+        u: [t for t, months in required.items() if not is_current(have.get((u, t)), months, today)]
+        for u in user_ids
+    }
+
+
+def active_assignments():
+    JobRoleAssignment = M("JobRoleAssignment")
+    return JobRoleAssignment.objects.filter(is_active=True).filter(
+        Q(effective_to__isnull=True) | Q(effective_to__gte=timezone.localdate())
+    )
+
+
+def holders(role_ids) -> Dict[int, List[int]]:
+    """Rol başına aktif görev ataması olan kullanıcılar (role_ids liste ya da alt sorgu)."""
+    out: Dict[int, List[int]] = {}
+    if not isinstance(role_ids, QuerySet):
+        role_ids = list(role_ids)
+    rows = (
+        active_assignments().filter(job_role_id__in=role_ids)
+        .values_list("job_role_id", "user_id")
+        .distinct()
+    )
+    for role_id, user_id in rows:
+        out.setdefault(role_id, []).append(user_id)
+    return out
+
+
+def user_roles(user_id: int) -> List[int]:
+    return list(active_assignments().filter(user_id=user_id).values_list("job_role_id", flat=True))
@@ -0,0 +1,45 @@
+# delegations/signals.py
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from trainings.signals import enrollments_bulk_changed
+
+from .models import RoleDelegation
+
+
+# Rol silinince CASCADE ile düşen aktif vekaletleri geçmişe "pasif" olarak yaz
+@receiver(post_delete, sender=RoleDelegation)
+def on_delegation_deleted(sender, instance, **kwargs):
+    if not instance.is_active:
+        return
+    from .history import record
+    from .models import DelegationDocument
+
+    record(DelegationDocument.bump_version(), [(instance.from_role_id, instance.to_role_id, False)])
+
+
+# Vekalet ya da rol değişince bu süreçteki zincir indeksini düşür
+# (diğer süreçler matrix_version / TTL ile tazelenir)
+@receiver(post_save, sender=RoleDelegation)
+@receiver(post_delete, sender=RoleDelegation)
+@receiver(post_save, sender=apps.get_model("trainings", "JobRole"))
+@receiver(post_delete, sender=apps.get_model("trainings", "JobRole"))
+def on_delegation_graph_changed(sender, instance, **kwargs):
+    from .resolver import invalidate
+
+    invalidate()
+
+
+# Eğitim uyumunu etkileyen kayıtlar değişince kapsama raporunu geçersiz kıl
+@receiver(post_save, sender=apps.get_model("trainings", "Enrollment"))
+@receiver(post_delete, sender=apps.get_model("trainings", "Enrollment"))
+@receiver(post_save, sender=apps.get_model("trainings", "TrainingRequirement"))
+@receiver(post_delete, sender=apps.get_model("trainings", "TrainingRequirement"))
+@receiver(post_save, sender=apps.get_model("trainings", "JobRoleAssignment"))
+@receiver(post_delete, sender=apps.get_model("trainings", "JobRoleAssignment"))
+@receiver(enrollments_bulk_changed)
+def on_compliance_changed(sender, **kwargs):
+    from .compliance import bump_generation
+
+    bump_generation()
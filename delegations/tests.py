@@ -1,3 +1,258 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from trainings.models import (
+    AttendanceImportLine, AttendanceImportSession, Enrollment, JobRole, JobRoleAssignment, Training,
+    TrainingPlan, TrainingRequirement,
+)
+from trainings.utils.attendance_ocr import confirm_session
+
+from .compliance import get_report
+from .history import matrix_at, take_snapshot
+from .models import DelegationChange, DelegationDocument, DelegationSnapshot, RoleDelegation
+from .views import apply_cells
+
+
+def _active():
+    return set(RoleDelegation.objects.filter(is_active=True).values_list('from_role_id', 'to_role_id'))
+
+
+# -------- apply_cells --------
+class ApplyCellsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.r = [JobRole.objects.create(name=f"Rol {i}").pk for i in range(4)]
+
+    def test_toggle_creates_then_deactivates(self):
+        a, b = self.r[:2]
+        v1, changed = apply_cells([(a, b)])
+        self.assertEqual((v1, changed), (1, [(a, b, True)]))
+        v2, changed = apply_cells([(a, b)])
+        self.assertEqual((v2, changed), (2, [(a, b, False)]))
+        self.assertEqual(RoleDelegation.objects.get().version, 2)
+        self.assertEqual(
+            list(DelegationChange.objects.values_list('version', 'is_active')), [(1, True), (2, False)]
+        )
+
+    def test_fill_and_clear_touch_only_changed_cells(self):
+        a, b, c, d = self.r
+        apply_cells([(a, b)])
+        apply_cells([(a, c)])
+        apply_cells([(a, c)])  # (a, c) pasif kayıt olarak kalır
+
+        version, changed = apply_cells([(a, b), (a, c), (a, d)], active=True)
+        self.assertEqual(version, 4)
+        self.assertEqual(sorted(changed), [(a, c, True), (a, d, True)])
+        self.assertEqual(_active(), {(a, b), (a, c), (a, d)})
+
+        version, changed = apply_cells([(a, b), (a, d), (b, c)], active=False)
+        self.assertEqual(version, 5)
+        self.assertEqual(sorted(changed), [(a, b, False), (a, d, False)])  # (b, c) hiç yoktu
+        self.assertEqual(_active(), {(a, c)})
+        self.assertFalse(RoleDelegation.objects.filter(from_role_id=b).exists())
+
+    def test_noop_rolls_back_without_consuming_version(self):
+        a, b, c = self.r[:3]
+        apply_cells([(a, b)], active=True)
+        before = DelegationChange.objects.count()
+
+        self.assertEqual(apply_cells([(a, b)], active=True), (1, []))
+        self.assertEqual(apply_cells([(a, c)], active=False), (1, []))
+        self.assertEqual(apply_cells([]), (1, []))
+        self.assertEqual(DelegationDocument.current_version(), 1)
+        self.assertEqual(DelegationChange.objects.count(), before)
+
+        # Sonraki gerçek değişiklik sürümü boşluksuz devam ettirir
+        self.assertEqual(apply_cells([(a, c)])[0], 2)
+
+
+# -------- Uç noktalar --------
+class MatrixEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.r = [JobRole.objects.create(name=f"Görev {i}").pk for i in range(4)]
+        cls.staff = get_user_model().objects.create_user("yonetici", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def _batch(self, cells, active=''):
+        return self.client.post(reverse('delegations:toggle_batch'), {'cells': cells, 'active': active})
+
+    def _changes(self, since):
+        resp = self.client.get(reverse('delegations:changes'), {'since': since})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        return data['version'], {(a, b): on for a, b, on in data['changes']}
+
+    def test_changes_since(self):
+        a, b, c, d = self.r
+        apply_cells([(a, b), (a, c)], active=True)   # v1
+        apply_cells([(a, b)])                        # v2: kapanır
+        apply_cells([(c, d)])                        # v3
+
+        self.assertEqual(self._changes(0), (3, {(a, b): 0, (a, c): 1, (c, d): 1}))
+        self.assertEqual(self._changes(1), (3, {(a, b): 0, (c, d): 1}))
+        self.assertEqual(self._changes(3), (3, {}))
+        resp = self.client.get(reverse('delegations:changes'), {'since': 'x'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_toggle_batch_fill_and_clear(self):
+        a, b, c = self.r[:3]
+        data = self._batch(f"{a}_{b};{a}_{c},{a}_{a}", active='1').json()
+        self.assertEqual(data['version'], 1)
+        self.assertEqual(sorted(map(tuple, data['changes'])), [(a, b, 1), (a, c, 1)])  # kendine vekalet atlanır
+
+        data = self._batch(f"{a}_{b},{a}_{b}", active='0').json()
+        self.assertEqual((data['version'], data['changes']), (2, [[a, b, 0]]))
+
+        data = self._batch(f"{a}_{b}", active='0').json()
+        self.assertEqual((data['version'], data['changes']), (2, []))
+
+    def test_toggle_batch_validation(self):
+        a, b = self.r[:2]
+        for cells in ('abc', f"{a}-{b}", f"{a}_x"):
+            self.assertEqual(self._batch(cells).status_code, 400, cells)
+
+        resp = self._batch(f"{a}_999999")
+        self.assertEqual((resp.status_code, resp.json()['reason']), (400, 'role'))
+
+        with mock.patch('delegations.views.MAX_BATCH_CELLS', 1):
+            resp = self._batch(f"{a}_{b},{b}_{a}")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json(), {'ok': False, 'reason': 'too_many', 'max': 1})
+
+        self.assertFalse(RoleDelegation.objects.exists())
+        self.assertEqual(DelegationDocument.current_version(), 0)
+
+    def test_staff_only(self):
+        self.client.force_login(get_user_model().objects.create_user("calisan"))
+        resp = self._batch(f"{self.r[0]}_{self.r[1]}")
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(RoleDelegation.objects.exists())
+
+
+# -------- Geçmiş --------
+class HistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.r = [JobRole.objects.create(name=f"Birim {i}").pk for i in range(5)]
+        cls.staff = get_user_model().objects.create_user("denetci", is_staff=True)
+
+    def _state(self, states):
+        states[DelegationDocument.current_version()] = _active()
+
+    def test_matrix_at_replays_recorded_states(self):
+        a, b, c, d, e = self.r
+        states = {0: set()}
+        self.client.force_login(self.staff)
+        with mock.patch('delegations.history.SNAPSHOT_EVERY', 3):  # oynatma anlık görüntüleri aşsın
+            for cells, active in (
+                ([(a, b), (a, c), (b, c)], True),
+                ([(a, b)], None),
+                ([(c, d), (d, e), (e, a)], True),
+                ([(a, c), (c, d)], False),
+                ([(b, d)], None),
+            ):
+                apply_cells(cells, active)
+                self._state(states)
+            JobRole.objects.get(pk=d).delete()  # CASCADE: (d, e) ve (b, d) düşer
+            self._state(states)
+            self.client.post(reverse('delegations:reset_all'))
+            self._state(states)
+            apply_cells([(a, b), (e, a)], True)
+            self._state(states)
+
+        self.assertGreater(DelegationSnapshot.objects.count(), 2)
+        self.assertEqual(len(states), 9)  # rol silme, düşen her vekalet için ayrı sürüm yazar
+        for version, pairs in states.items():
+            self.assertEqual(matrix_at(version), pairs, f"v{version}")
+
+    def test_changes_report_cascaded_deletes(self):
+        a, b, c = self.r[:3]
+        apply_cells([(a, b), (b, c), (c, a)], True)
+        since = DelegationDocument.current_version()
+        JobRole.objects.get(pk=c).delete()
+
+        self.client.force_login(self.staff)
+        data = self.client.get(reverse('delegations:changes'), {'since': since}).json()
+        self.assertEqual(data['version'], since + 2)
+        self.assertEqual(sorted(map(tuple, data['changes'])), [(b, c, 0), (c, a, 0)])
+
+    def test_changes_before_history_start_include_baseline(self):
+        a, b, c = self.r[:3]
+        RoleDelegation.objects.create(from_role_id=a, to_role_id=b)  # defter dışı (geçmiş öncesi) kayıt
+        DelegationDocument.singleton()
+        DelegationDocument.objects.filter(pk=1).update(matrix_version=5)
+        DelegationSnapshot.objects.all().delete()
+        with transaction.atomic():
+            take_snapshot()
+        apply_cells([(b, c)])
+
+        self.client.force_login(self.staff)
+        data = self.client.get(reverse('delegations:changes'), {'since': 0}).json()
+        self.assertEqual(data['version'], 6)
+        self.assertEqual(sorted(map(tuple, data['changes'])), [(a, b, 1), (b, c, 1)])
+
+    def test_snapshot_is_taken_at_locked_version(self):
+        a, b = self.r[:2]
+        apply_cells([(a, b)])
+        with transaction.atomic():
+            snap = take_snapshot()
+        self.assertEqual((snap.version, snap.pair_count), (1, 1))
+
+
+# -------- Eğitim uyumu raporu --------
+class ComplianceReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.a, cls.b = (JobRole.objects.create(name=n).pk for n in ("Vardiya Amiri", "Operatör"))
+        cls.training = Training.objects.create(title="Kimyasal Güvenlik")
+        TrainingRequirement.objects.create(job_role_id=cls.a, training=cls.training, requirement_type="required")
+        cls.user = get_user_model().objects.create_user("operator")
+        JobRoleAssignment.objects.create(user=cls.user, job_role_id=cls.b)
+        apply_cells([(cls.a, cls.b)], True)
+
+    def setUp(self):
+        cache.clear()
+        self.key = f"{self.a}_{self.b}"
+
+    def _generation(self):
+        return DelegationDocument.objects.values_list('compliance_generation', flat=True).get(pk=1)
+
+    def test_signal_bumps_generation_in_db(self):
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'none')
+        gen = self._generation()
+        Enrollment.objects.create(user=self.user, training=self.training, status="completed", is_passed=True,
+                                  completed_at=timezone.now())
+        self.assertEqual(self._generation(), gen + 1)
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'ok')
+
+    def test_bulk_confirm_invalidates_report(self):
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'none')
+        now = timezone.now()
+        plan = TrainingPlan.objects.create(training=self.training, start_datetime=now, end_datetime=now)
+        session = AttendanceImportSession.objects.create(plan=plan)
+        AttendanceImportLine.objects.create(session=session, position=1, extracted="operator",
+                                            user=self.user, decision="accepted")
+        gen = self._generation()
+        with transaction.atomic():
+            confirm_session(session)
+        self.assertEqual(self._generation(), gen + 1)
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'ok')
 
-# Create your tests here.
+    def test_report_key_follows_db_not_process_cache(self):
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'none')
+        # Başka bir süreç veriyi değiştirip kuşağı artırmış gibi: sinyalsiz yazım + DB'de artış
+        Enrollment.objects.bulk_create([Enrollment(user=self.user, training=self.training, status="completed",
+                                                   is_passed=True, completed_at=timezone.now())])
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'none')  # önbellekten
+        DelegationDocument.objects.filter(pk=1).update(compliance_generation=F('compliance_generation') + 1)
+        self.assertEqual(get_report()['cells'][self.key]['status'], 'ok')
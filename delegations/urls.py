@@ -1,11 +1,21 @@
 from django.urls import path
-from .views import DelegationMatrixView, toggle_delegation, update_meta, reset_all
+from .views import (
+    DelegationMatrixView, matrix_data, toggle_delegation, toggle_batch, matrix_changes, update_meta, reset_all,
+    role_coverage, substitute_check, coverage_report, matrix_history,
+)
 
 app_name = "delegations"
 
 urlpatterns = [
     path("matrix/", DelegationMatrixView.as_view(), name="matrix"),
+    path("matrix-data/", matrix_data, name="matrix_data"),
     path("toggle/", toggle_delegation, name="toggle"),
+    path("toggle-batch/", toggle_batch, name="toggle_batch"),
+    path("changes/", matrix_changes, name="changes"),
+    path("history/", matrix_history, name="history"),
+    path("coverage/<int:role_id>/", role_coverage, name="coverage"),
+    path("substitute-check/", substitute_check, name="substitute_check"),
+    path("coverage-report/", coverage_report, name="coverage_report"),
     path("update-meta/", update_meta, name="update_meta"),
     path("reset-all/", reset_all, name="reset_all"),
 ]
@@ -1,15 +1,22 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db import transaction
 from django.http import JsonResponse, HttpResponseBadRequest
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import TemplateView
-from django.utils.dateparse import parse_date
+from django.utils.dateparse import parse_date, parse_datetime
 
+from .history import record
 from .models import RoleDelegation, DelegationDocument
 from trainings.models import JobRole
 
+# Toplu isteklerde en fazla hücre (satır/sütun doldurma için fazlasıyla yeterli)
+MAX_BATCH_CELLS = 5000
+
 
 def staff_required(user):
     return user.is_staff or user.is_superuser
@@ -23,25 +30,109 @@ class DelegationMatrixView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         return staff_required(self.request.user)
 
     def get_context_data(self, **kwargs):
+        # Matrisin kendisi sayfaya gömülmez; istemci delegations:matrix_data'dan
+        # yükleyip yalnızca görünen pencereyi çizer.
         ctx = super().get_context_data(**kwargs)
-        roles = JobRole.objects.filter(is_active=True).order_by('name')
-
-        # Aktif vekaletler için "from_to" anahtarları
-        qs = RoleDelegation.objects.filter(is_active=True).values_list('from_role_id', 'to_role_id')
-        pair_keys = [f"{a}_{b}" for a, b in qs]
-
-        ctx['roles'] = roles
-        ctx['pair_keys'] = pair_keys
-        ctx['has_any'] = len(pair_keys) > 0  # varsa "Hepsini Temizle" göster
+        ctx['has_any'] = RoleDelegation.objects.filter(is_active=True).exists()  # varsa "Hepsini Temizle" göster
         ctx['meta'] = DelegationDocument.singleton()
         return ctx
 
 
+@login_required
+@user_passes_test(staff_required)
+@require_GET
+def matrix_data(request):
+    """
+    Matris verisi: {"version": N, "roles": [[id, ad], ...], "pairs": [from1, to1, from2, to2, ...]}
+    Yük rol sayısı + aktif çift sayısıyla büyür (N² hücre gönderilmez).
+    Sürüm çiftlerden ÖNCE okunur: arada yazılan bir değişiklik istemcinin
+    sonraki changes?since= çağrısında yeniden gelir (zararsız tekrar).
+    """
+    version = DelegationDocument.current_version()
+    roles = list(JobRole.objects.filter(is_active=True).order_by('name').values_list('id', 'name'))
+    pairs = []
+    for a, b in RoleDelegation.objects.filter(is_active=True).values_list('from_role_id', 'to_role_id').iterator(chunk_size=5000):
+        pairs.append(a)
+        pairs.append(b)
+    return JsonResponse({'ok': True, 'version': version, 'roles': roles, 'pairs': pairs})
+
+
+def _parse_pair_keys(raw):
+    """'3_5,3_7' → [(3, 5), (3, 7)]; hatalıysa None. Kendine vekalet atlanır."""
+    cells = []
+    for key in (raw or '').replace(';', ',').split(','):
+        key = key.strip()
+        if not key:
+            continue
+        a, sep, b = key.partition('_')
+        if not sep:
+            return None
+        try:
+            a, b = int(a), int(b)
+        except ValueError:
+            return None
+        if a != b:
+            cells.append((a, b))
+    return list(dict.fromkeys(cells))
+
+
+def apply_cells(cells, active=None, user=None):
+    """
+    Hücreleri tek transaction ve TEK sürüm artışıyla yazar; değişenler
+    aynı transaction içinde geçmiş defterine (DelegationChange) eklenir.
+    active=None → her hücre tersine çevrilir; True/False → o duruma getirilir.
+    Dönüş: (yeni sürüm, [(from, to, aktif_mi), ...] yalnızca değişenler).
+    """
+    if not cells:
+        return DelegationDocument.current_version(), []
+    froms = {a for a, _ in cells}
+    tos = {b for _, b in cells}
+    wanted = set(cells)
+    with transaction.atomic():
+        version = DelegationDocument.bump_version()
+        existing = {
+            (d.from_role_id, d.to_role_id): d
+            for d in RoleDelegation.objects.select_for_update()
+            .filter(from_role_id__in=froms, to_role_id__in=tos)
+            .only('id', 'from_role_id', 'to_role_id', 'is_active')
+            if (d.from_role_id, d.to_role_id) in wanted
+        }
+        now = timezone.now()
+        changed, to_update, to_create = [], [], []
+        for a, b in cells:
+            obj = existing.get((a, b))
+            if obj is None:
+                if active is False:
+                    continue
+                to_create.append(RoleDelegation(from_role_id=a, to_role_id=b, is_active=True, version=version))
+                changed.append((a, b, True))
+                continue
+            state = (not obj.is_active) if active is None else active
+            if state == obj.is_active:
+                continue
+            obj.is_active, obj.version, obj.updated_at = state, version, now
+            to_update.append(obj)
+            changed.append((a, b, state))
+        if to_update:
+            RoleDelegation.objects.bulk_update(to_update, ['is_active', 'version', 'updated_at'], batch_size=500)
+        if to_create:
+            RoleDelegation.objects.bulk_create(to_create, batch_size=500)
+        record(version, changed, user=user, at=now)
+        if not changed:
+            transaction.set_rollback(True)  # boş değişiklik sürüm tüketmesin
+            version -= 1
+    return version, changed
+
+
 @login_required
 @user_passes_test(staff_required)
 @require_POST
 def toggle_delegation(request):
-    """Hücre tıklandığında vekaleti aç/kapat. Body: from_id, to_id"""
+    """
+    Hücre tıklandığında vekaleti aç/kapat. Body: from_id, to_id
+    Yanıt yalnızca değişen hücreyi ve matris sürümünü taşır; istemci sürüm
+    atlaması görürse arayı delegations:changes ile tamamlar.
+    """
     try:
         from_id = int(request.POST.get('from_id'))
         to_id = int(request.POST.get('to_id'))
@@ -50,23 +141,81 @@ def toggle_delegation(request):
 
     if from_id == to_id:
         return JsonResponse({'ok': False, 'reason': 'self'}, status=400)
+    if JobRole.objects.filter(pk__in=[from_id, to_id]).count() != 2:
+        return JsonResponse({'ok': False, 'reason': 'role'}, status=400)
 
-    obj, created = RoleDelegation.objects.get_or_create(
-        from_role_id=from_id, to_role_id=to_id, defaults={'is_active': True}
-    )
-    if not created:
-        obj.is_active = not obj.is_active
-        obj.save(update_fields=['is_active', 'updated_at'])
+    version, changed = apply_cells([(from_id, to_id)], user=request.user)
+    return JsonResponse({
+        'ok': True,
+        'active': changed[0][2],
+        'pair_key': f"{from_id}_{to_id}",
+        'version': version,
+    })
+
+
+@login_required
+@user_passes_test(staff_required)
+@require_POST
+def toggle_batch(request):
+    """
+    Birden çok hücreyi tek istekte yazar (satır/sütun doldurma).
+    Body: cells="3_5,3_7,...", active="1" | "0" | "" (boş = her hücreyi tersine çevir)
+    """
+    cells = _parse_pair_keys(request.POST.get('cells'))
+    if cells is None:
+        return HttpResponseBadRequest("bad cells")
+    if len(cells) > MAX_BATCH_CELLS:
+        return JsonResponse({'ok': False, 'reason': 'too_many', 'max': MAX_BATCH_CELLS}, status=400)
+    raw = (request.POST.get('active') or '').strip().lower()
+    active = None if raw == '' else raw in ('1', 'true', 'on')
 
-    # Güncel listeyi döndürmek istersek:
-    qs = RoleDelegation.objects.filter(is_active=True).values_list('from_role_id', 'to_role_id')
-    pair_keys = [f"{a}_{b}" for a, b in qs]
+    ids = {a for a, _ in cells} | {b for _, b in cells}
+    if JobRole.objects.filter(pk__in=ids).count() != len(ids):
+        return JsonResponse({'ok': False, 'reason': 'role'}, status=400)
 
+    version, changed = apply_cells(cells, active, user=request.user)
     return JsonResponse({
         'ok': True,
-        'active': obj.is_active,
-        'pair_key': f"{from_id}_{to_id}",
-        'pair_keys': pair_keys,
+        'version': version,
+        'changes': [[a, b, int(on)] for a, b, on in changed],
+    })
+
+
+@login_required
+@user_passes_test(staff_required)
+@require_GET
+def matrix_changes(request):
+    """
+    ?since=N → N sürümünden sonra değişen hücreler: [[from, to, aktif(0/1)], ...]
+    Değişiklik defterinden (DelegationChange) okunur; böylece rol silinince
+    CASCADE ile kaybolan vekaletler de 'pasif' olarak gelir. Hücre başına
+    son durum döner. Geçmiş kaydı başlamadan önceki bir sürüm (ör. since=0)
+    istenirse başlangıç anlık görüntüsündeki çiftler de eklenir.
+    """
+    from .history import decode_pairs
+    from .models import DelegationChange, DelegationSnapshot
+
+    try:
+        since = max(0, int(request.GET.get('since') or 0))
+    except ValueError:
+        return HttpResponseBadRequest("bad since")
+    version = DelegationDocument.current_version()
+    latest = {}
+    base = DelegationSnapshot.objects.order_by('version').only('version', 'data').first()
+    if base is not None and since < base.version:
+        latest.update(dict.fromkeys(sorted(decode_pairs(base.data)), True))
+        since = base.version
+    rows = (
+        DelegationChange.objects.filter(version__gt=since, version__lte=version)
+        .order_by('version', 'id')
+        .values_list('from_role_id', 'to_role_id', 'is_active')
+    )
+    for a, b, on in rows.iterator(chunk_size=5000):
+        latest[(a, b)] = on
+    return JsonResponse({
+        'ok': True,
+        'version': version,
+        'changes': [[a, b, int(on)] for (a, b), on in latest.items()],
     })
 
 
@@ -83,7 +232,8 @@ def update_meta(request):
     meta.revizyon_tarihi = parse_date(rev) if rev else None
     meta.guncelleme_tarihi = parse_date(gun) if gun else None
 
-    meta.save()
+    # matrix_version'a dokunma: eşzamanlı toplu değişikliklerin artırdığı sürüm ezilmesin
+    meta.save(update_fields=['form_no', 'revizyon_tarihi', 'guncelleme_tarihi'])
     return JsonResponse({
         'ok': True,
         'form_no': meta.form_no,
@@ -96,6 +246,195 @@ def update_meta(request):
 @user_passes_test(staff_required)
 @require_POST
 def reset_all(request):
-    """Tüm vekalet kayıtlarını sil (matrisi boşalt)."""
-    RoleDelegation.objects.all().delete()
-    return JsonResponse({'ok': True})
+    """
+    Tüm vekaletleri pasifleştir (matrisi boşalt). Kayıtlar silinmez; böylece
+    diğer açık sayfalar boşalmayı delegations:changes ile görebilir.
+    """
+    with transaction.atomic():
+        version = DelegationDocument.bump_version()
+        qs = RoleDelegation.objects.select_for_update().filter(is_active=True)
+        cleared = [(a, b, False) for a, b in qs.values_list('from_role_id', 'to_role_id')]
+        now = timezone.now()
+        qs.update(is_active=False, version=version, updated_at=now)
+        record(version, cleared, user=request.user, at=now)
+    return JsonResponse({'ok': True, 'version': version})
+
+
+# -------- Zincirleme vekalet sorguları --------
+@login_required
+@user_passes_test(staff_required)
+@require_GET
+def role_coverage(request, role_id):
+    """
+    X rolüne (zincirle) vekalet edebilecek roller, en kısa zincirleriyle.
+    ?users=1 → her vekil rolün aktif görev sahipleri ve X'in zorunlu
+    eğitimlerine göre yeterlilikleri de döner.
+    """
+    from .resolver import get_index, holders, missing_trainings, required_trainings
+
+    idx = get_index()
+    if role_id not in idx.pos:
+        return JsonResponse({'ok': False, 'reason': 'role'}, status=404)
+    chains = idx.chains(role_id)
+    coverers = [
+        {'role_id': rid, 'name': idx.names[rid], 'depth': len(path) - 1, 'chain': path}
+        for rid, path in chains.items()
+    ]
+    data = {
+        'ok': True,
+        'version': idx.version,
+        'role': {'id': role_id, 'name': idx.names[role_id]},
+        'coverers': coverers,
+    }
+    if request.GET.get('users') in ('1', 'true', 'on'):
+        User = get_user_model()
+        required = required_trainings(role_id)
+        by_role = holders(chains)
+        user_ids = {u for ids in by_role.values() for u in ids}
+        missing = missing_trainings(user_ids, required)
+        usernames = dict(User.objects.filter(pk__in=user_ids).values_list('pk', User.USERNAME_FIELD))
+        for c in coverers:
+            c['users'] = [
+                {'id': u, 'username': usernames.get(u, ''), 'qualified': not missing[u], 'missing': missing[u]}
+                for u in by_role.get(c['role_id'], ())
+            ]
+        data['required'] = list(required)
+    return JsonResponse(data)
+
+
+@login_required
+@user_passes_test(staff_required)
+@require_GET
+def substitute_check(request):
+    """
+    ?role=X&substitute=Y → Y rolü X'e vekalet edebilir mi (zincir)?
+    ?role=X&user=U       → U kullanıcısı görevlerinden biriyle X'e vekalet
+                            edebilir mi ve X'in zorunlu eğitimlerini almış mı?
+    """
+    from .resolver import get_index, missing_trainings, required_trainings, user_roles
+
+    try:
+        role_id = int(request.GET.get('role'))
+        substitute = int(request.GET['substitute']) if request.GET.get('substitute') else None
+        user_id = int(request.GET['user']) if request.GET.get('user') else None
+    except (TypeError, ValueError):
+        return HttpResponseBadRequest("bad ids")
+    if (substitute is None) == (user_id is None):
+        return HttpResponseBadRequest("substitute or user")
+
+    idx = get_index()
+    if role_id not in idx.pos:
+        return JsonResponse({'ok': False, 'reason': 'role'}, status=404)
+
+    if substitute is not None:
+        chain = idx.chain(role_id, substitute)
+        return JsonResponse({
+            'ok': True, 'version': idx.version,
+            'can_cover': chain is not None, 'chain': chain or [],
+        })
+
+    # Kullanıcının görevlerinden en kısa zinciri vereni seç
+    chain = None
+    for rid in user_roles(user_id):
+        path = [rid] if rid == role_id else idx.chain(role_id, rid)
+        if path and (chain is None or len(path) < len(chain)):
+            chain = path
+    missing = missing_trainings([user_id], required_trainings(role_id))[user_id]
+    return JsonResponse({
+        'ok': True, 'version': idx.version,
+        'can_cover': chain is not None, 'chain': chain or [],
+        'qualified': chain is not None and not missing,
+        'missing': missing,
+    })
+
+
+@login_required
+@user_passes_test(staff_required)
+@require_GET
+def coverage_report(request):
+    """
+    Aktif vekaletlerin eğitim uyumu (matris hücrelerini renklendirmek için).
+    Varsayılan: {"a_b": [durum, görev sahibi, uygun olmayan, eksik gereklilik]}
+    ?pair=a_b → tek hücrenin ayrıntısı (eğitim adları ve kullanıcılar).
+    """
+    from .compliance import get_report
+
+    report = get_report()
+    pair = request.GET.get('pair')
+    if not pair:
+        return JsonResponse({
+            'ok': True,
+            'version': report['version'],
+            'cells': {
+                k: [c['status'], c['holders'], len(c['unqualified']), len(c['lacks'])]
+                for k, c in report['cells'].items()
+            },
+        })
+
+    cell = report['cells'].get(pair)
+    if cell is None:
+        return JsonResponse({'ok': False, 'reason': 'pair'}, status=404)
+    from trainings.models import Training
+
+    User = get_user_model()
+    titles = dict(Training.objects.filter(pk__in=cell['lacks']).values_list('pk', 'title'))
+    users = dict(User.objects.filter(pk__in=cell['unqualified']).values_list('pk', User.USERNAME_FIELD))
+    return JsonResponse({
+        'ok': True,
+        'version': report['version'],
+        'status': cell['status'],
+        'holders': cell['holders'],
+        'lacks': [{'id': t, 'title': titles.get(t, '')} for t in cell['lacks']],
+        'unqualified': [{'id': u, 'username': users.get(u, '')} for u in cell['unqualified']],
+    })
+
+
+@login_required
+@user_passes_test(staff_required)
+@require_GET
+def matrix_history(request):
+    """
+    Matrisin geçmişteki hali (ISO denetimi):
+    ?version=N | ?date=YYYY-AA-GG (o günün sonu) | ?at=ISO tarih-saat
+    Yanıt: {"version", "roles": [[id, ad], ...], "pairs": [from1, to1, ...]}
+    Roller, o sürümde vekaleti olanlardır (sonradan pasifleşmiş/silinmiş olsa da).
+    """
+    from .history import end_of_day, matrix_at, version_at
+    from .models import DelegationSnapshot
+
+    if request.GET.get('version'):
+        try:
+            version = int(request.GET['version'])
+        except ValueError:
+            return HttpResponseBadRequest("bad version")
+        as_of = None
+    else:
+        if request.GET.get('date'):
+            day = parse_date(request.GET['date'])
+            as_of = end_of_day(day) if day else None
+        else:
+            as_of = parse_datetime(request.GET.get('at') or '')
+            if as_of is not None and timezone.is_naive(as_of):
+                as_of = timezone.make_aware(as_of, timezone.get_current_timezone())
+        if as_of is None:
+            return HttpResponseBadRequest("version, date or at")
+        version = version_at(as_of)
+
+    current = DelegationDocument.current_version()
+    if version < 0 or version > current:
+        return JsonResponse({'ok': False, 'reason': 'version', 'current': current}, status=404)
+    first = DelegationSnapshot.objects.order_by('version').values_list('version', 'created_at').first()
+
+    pairs = sorted(matrix_at(version))
+    ids = {a for a, _ in pairs} | {b for _, b in pairs}
+    roles = list(JobRole.objects.filter(pk__in=ids).order_by('name').values_list('id', 'name'))
+    return JsonResponse({
+        'ok': True,
+        'version': version,
+        'current_version': current,
+        'as_of': as_of.isoformat() if as_of else None,
+        # Geçmiş kaydı başlamadan önceki bir an istendiyse sonuç kesin değildir
+        'before_history': bool(first) and (version < first[0] or (as_of is not None and as_of < first[1])),
+        'roles': roles,
+        'pairs': [x for pair in pairs for x in pair],
+    })
@@ -3,7 +3,7 @@ from django.apps import apps
 from django.utils.html import format_html
 from django.utils.text import Truncator
 from django.contrib import messages
-from django.db.models import Q, Exists, OuterRef
+from django.db.models import Count, Q, Exists, OuterRef
 from django.utils import timezone
 from datetime import datetime
 from django.shortcuts import redirect
@@ -24,10 +24,10 @@ def has_field(model, fname: str) -> bool:
         return False
 
 def fk_name_to(model, related_model, candidates=("role", "job_role", "jobrole", "position", "job")):
-    
+    """
     'model' içindeki, 'related_model'e many-to-one FK alan adını bulur.
     Bulamazsa candidates listesindeki isimlerden var olanı döner.
-    
+    """
     if not model or not related_model:
         return None
     try:
@@ -54,7 +54,9 @@ TrainingNeed = M("TrainingNeed")
 TrainingPlan = M("TrainingPlan")
 TrainingPlanAttendee = M("TrainingPlanAttendee")
 OnlineVideo = M("OnlineVideo")
+TrainingReminderLog = M("TrainingReminderLog")
 VideoProgress = M("VideoProgress")
+AttendanceImportSession = M("AttendanceImportSession")
 
 
 # =========================================
@@ -400,10 +402,21 @@ if Certificate:
             "serial" if has_field(Certificate, "serial") else None,
             "issued_at" if has_field(Certificate, "issued_at") else None,
             "expires_at" if has_field(Certificate, "expires_at") else None,
+            "status" if has_field(Certificate, "status") else None,
         )
         list_display = tuple([f for f in list_display if f])
+        list_filter = tuple([f for f in ("status",) if has_field(Certificate, f)])
         search_fields = ("user__username", "training__title", "serial")
         autocomplete_fields = ("user", "training")
+        readonly_fields = tuple(
+            f for f in ("status", "attempts", "error", "started_at", "generated_at") if has_field(Certificate, f)
+        )
+        actions = ["regenerate_pdf"]
+
+        @admin.action(description="PDF'i yeniden üret (kuyruğa al)")
+        def regenerate_pdf(self, request, queryset):
+            n = queryset.exclude(status="processing").update(status="pending", attempts=0, error="")
+            self.message_user(request, f"{n} sertifika kuyruğa alındı (generate_certificates komutu üretir).")
 
 
 # ========== TrainingPlan ==========
@@ -422,6 +435,44 @@ if TrainingPlan:
         list_filter = tuple([f for f in ("status",) if has_field(TrainingPlan, f)])
         search_fields = ("training__title", "training__code")
         autocomplete_fields = tuple([f for f in ("training", "need", "created_by") if has_field(TrainingPlan, f)])
+        actions = ["issue_certificates_pdf", "issue_certificates_zip"]
+
+        def _issue_certificates(self, request, queryset, fmt):
+            """Katılımcılara sertifika düzenler, PDF'leri üretir ve tek dosya olarak akıtır."""
+            from django.http import StreamingHttpResponse
+            from .utils.certificates import issue_for_plan, iter_certificate_zip, iter_merged_pdf, not_ready
+
+            plans = list(queryset)
+            certs, bad = issue_for_plan(plans)
+            if not certs:
+                self.message_user(request, "Seçilen planlarda katılımcı yok.", level=messages.WARNING)
+                return None
+            if bad:
+                self.message_user(request, f"{bad} sertifika üretilemedi (Sertifikalar listesinden yeniden denenebilir).",
+                                  level=messages.WARNING)
+            skipped = not_ready(certs)
+            if skipped == len(certs):
+                self.message_user(request, "Hazır sertifika yok; dosya oluşturulmadı.", level=messages.WARNING)
+                return None
+            if skipped:
+                # İndirme yanıtı döndüğünden mesaj bir sonraki sayfada görünür
+                self.message_user(request, f"{skipped} sertifika hazır olmadığı için dosyaya eklenmedi.",
+                                  level=messages.WARNING)
+            stem = f"sertifikalar-plan-{plans[0].pk}" if len(plans) == 1 else f"sertifikalar-{timezone.localdate():%Y%m%d}"
+            if fmt == "zip":
+                resp = StreamingHttpResponse(iter_certificate_zip(certs), content_type="application/zip")
+            else:
+                resp = StreamingHttpResponse(iter_merged_pdf(certs), content_type="application/pdf")
+            resp["Content-Disposition"] = f'attachment; filename="{stem}.{fmt}"'
+            return resp
+
+        @admin.action(description="Katılımcılara sertifika düzenle (tek PDF)")
+        def issue_certificates_pdf(self, request, queryset):
+            return self._issue_certificates(request, queryset, "pdf")
+
+        @admin.action(description="Katılımcılara sertifika düzenle (ZIP)")
+        def issue_certificates_zip(self, request, queryset):
+            return self._issue_certificates(request, queryset, "zip")
 
         # İstenen konumda salt-okunur katılımcı listesi
         readonly_fields = tuple(
@@ -479,6 +530,17 @@ if TrainingPlan:
         participants_readonly.short_description = "Katılımcılar (salt okunur)"
 
 
+# ========== Hatırlatma Defteri ==========
+if TrainingReminderLog:
+    @admin.register(TrainingReminderLog)
+    class TrainingReminderLogAdmin(admin.ModelAdmin):
+        list_display = ("plan", "user", "days_before", "sent_at")
+        list_filter = ("days_before",)
+        search_fields = ("user__username", "plan__training__title")
+        list_select_related = ("plan", "plan__training", "user")
+        readonly_fields = ("plan", "user", "days_before", "sent_at")
+
+
 # ========== TrainingNeed ==========
 def _has_completed(user, training) -> bool:
     ok, _ = _completion_info(user, training)
@@ -546,6 +608,7 @@ if TrainingNeed:
             "status" if has_field(TrainingNeed, "status") else None,
             "is_resolved" if has_field(TrainingNeed, "is_resolved") else None,
             "due_date" if has_field(TrainingNeed, "due_date") else None,
+            "escalated_at" if has_field(TrainingNeed, "escalated_at") else None,
             "created_at" if has_field(TrainingNeed, "created_at") else None,
             "short_note",
         )
@@ -558,6 +621,8 @@ if TrainingNeed:
             list_filter += ("is_resolved",)
         if has_field(TrainingNeed, "due_date"):
             list_filter += ("due_date",)
+        if has_field(TrainingNeed, "escalated_at"):
+            list_filter += ("escalated_at",)
 
         search_fields = ("training__title", "training__code")
         if has_field(TrainingNeed, "note"):
@@ -646,12 +711,37 @@ if TrainingNeed:
 if OnlineVideo:
     @admin.register(OnlineVideo)
     class OnlineVideoAdmin(admin.ModelAdmin):
-        list_display = ("training", "duration_display", "is_active", "created_at")
-        list_filter = ("is_active",)
+        list_display = ("training", "duration_display", "is_active", "hls_status", "created_at")
+        list_filter = ("is_active", "hls_status")
         search_fields = ("training__title", "training__code", "title")
         list_select_related = ("training",)
         autocomplete_fields = ("training",)
-        readonly_fields = tuple(f for f in ("created_at", "updated_at") if has_field(OnlineVideo, f))
+        readonly_fields = tuple(
+            f for f in (
+                "hls_status", "hls_master", "transcode_attempts", "transcode_error",
+                "transcode_started_at", "transcoded_at", "created_at", "updated_at",
+            ) if has_field(OnlineVideo, f)
+        )
+        actions = ["queue_transcode"]
+
+        def save_model(self, request, obj, form, change):
+            # Yeni dosya yüklendiyse dönüştürme kuyruğuna geri al
+            if has_field(OnlineVideo, "hls_status") and "video" in form.changed_data:
+                obj.hls_status = "pending"
+                obj.transcode_attempts = 0
+                obj.transcode_error = ""
+            super().save_model(request, obj, form, change)
+            # Süre değiştiyse bırakma histogramı dilimleri yeniden hesaplanır
+            if change and "duration_seconds" in form.changed_data:
+                from .utils.video_analytics import rebuild
+                rebuild([obj.pk])
+
+        @admin.action(description="HLS dönüştürme kuyruğuna al")
+        def queue_transcode(self, request, queryset):
+            n = queryset.exclude(hls_status="processing").update(
+                hls_status="pending", transcode_attempts=0, transcode_error=""
+            )
+            self.message_user(request, f"{n} video kuyruğa alındı (transcode_videos komutu işler).")
 
         def duration_display(self, obj):
             try:
@@ -663,8 +753,33 @@ if OnlineVideo:
 if VideoProgress:
     @admin.register(VideoProgress)
     class VideoProgressAdmin(admin.ModelAdmin):
-        list_display = ("user", "video", "max_position_seconds", "completed", "completed_at", "updated_at")
+        list_display = ("user", "video", "max_position_seconds", "watched_percent", "completed", "completed_at", "updated_at")
         list_filter = ("completed",)
         search_fields = ("user__username", "video__training__title", "video__title")
         list_select_related = ("user", "video", "video__training")
-        readonly_fields = ("user", "video", "last_position_seconds", "max_position_seconds", "completed", "completed_at", "created_at", "updated_at")
+        readonly_fields = ("user", "video", "last_position_seconds", "max_position_seconds", "watched_seconds", "watched_percent", "completed", "completed_at", "created_at", "updated_at")
+        exclude = ("coverage",)
+
+
+# ========== OCR Katılım Listesi İçe Aktarmaları ==========
+if AttendanceImportSession:
+    @admin.register(AttendanceImportSession)
+    class AttendanceImportSessionAdmin(admin.ModelAdmin):
+        list_display = ("id", "plan", "file_name", "status", "line_count", "created_at", "review_link")
+        list_filter = ("status",)
+        search_fields = ("file_name", "plan__training__title")
+        list_select_related = ("plan", "plan__training")
+        readonly_fields = ("plan", "file_name", "file_sha256", "lang", "min_score", "status",
+                           "created_by", "confirmed_by", "confirmed_at", "created_at")
+        exclude = ("page_texts",)
+
+        def get_queryset(self, request):
+            return super().get_queryset(request).annotate(_line_count=Count("lines"))
+
+        def line_count(self, obj):
+            return obj._line_count
+        line_count.short_description = "Satır"
+
+        def review_link(self, obj):
+            return format_html('<a href="{}">İncele</a>', reverse("attendance_import_review", args=[obj.pk]))
+        review_link.short_description = "İnceleme"
@@ -0,0 +1,62 @@
+# trainings/management/commands/bench_certificates.py
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from trainings.utils.certificate_pdf import get_template, render_full
+from trainings.utils.certificates import template_config
+
+_NAMES = ("Çağrı Şenol", "İlknur Öztürk", "Ümit Ağaoğlu", "Işıl Güneş", "Gökhan Çelik")
+_TITLES = ("İş Sağlığı ve Güvenliği", "Yangın Güvenliği Eğitimi", "Kişisel Koruyucu Donanım")
+
+
+class Command(BaseCommand):
+    help = (
+        "Sertifika çizimini karşılaştırır: her sertifikada tüm sayfayı önbelleksiz çizmek, "
+        "önbellekli şablonla (form XObject) tek dosya çizmek ve tek birleşik PDF üretmek "
+        "(süre ve dosya boyutu). Diske yazılmaz."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=500, help="Çizilecek sertifika sayısı")
+        parser.add_argument("--qr", action="store_true", help="Her sertifikaya QR kodu ekle")
+
+    def handle(self, *args, **opts):
+        n = max(1, opts["count"])
+        cfg = template_config()
+        jobs = [
+            (_NAMES[i % len(_NAMES)], _TITLES[i % len(_TITLES)], "19.10.2026", f"CRT-2026-{i:06d}",
+             f"https://egitim.company.local/verify/CRT-2026-{i:06d}" if opts["qr"] else "")
+            for i in range(n)
+        ]
+
+        t0 = time.perf_counter()
+        full_sizes = [len(render_full(*j, **cfg)) for j in jobs]
+        t_full = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        tpl = get_template(**cfg)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        tpl_sizes = [len(tpl.render(*j)) for j in jobs]
+        t_tpl = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        merged_size = sum(len(chunk) for chunk in tpl.iter_merged(jobs))
+        t_merged = time.perf_counter() - t0
+
+        avg_full = sum(full_sizes) / n
+        avg_tpl = sum(tpl_sizes) / n
+        self.stdout.write(f"Tam çizim:     {t_full / n * 1000:7.2f} ms/sertifika | ort. {avg_full / 1024:.1f} KB")
+        self.stdout.write(
+            f"Şablon:        {t_tpl / n * 1000:7.2f} ms/sertifika | ort. {avg_tpl / 1024:.1f} KB "
+            f"(hazırlık bir kez {t_build * 1000:.1f} ms)"
+        )
+        self.stdout.write(
+            f"Birleşik PDF:  {t_merged / n * 1000:7.2f} ms/sayfa      | sayfa başına {merged_size / n / 1024:.2f} KB "
+            f"(toplam {merged_size / 1024:.1f} KB)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Hızlanma (tek dosya): {t_full / max(t_tpl + t_build, 1e-9):.1f}×"))
@@ -0,0 +1,115 @@
+# trainings/management/commands/bench_name_matcher.py
+from __future__ import annotations
+
+import random
+import time
+from difflib import SequenceMatcher
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from trainings.utils.attendance_ocr import _normalize, _user_display_name, build_user_index, match_names_to_users
+
+FIRST = [
+    "Ahmet", "Mehmet", "Mustafa", "Ali", "Hüseyin", "Hasan", "İbrahim", "İsmail", "Osman", "Yusuf",
+    "Murat", "Ömer", "Ramazan", "Halil", "Süleyman", "Abdullah", "Mahmut", "Salih", "Kemal", "Recep",
+    "Fatma", "Ayşe", "Emine", "Hatice", "Zeynep", "Elif", "Meryem", "Şerife", "Zehra", "Sultan",
+    "Hanife", "Merve", "Havva", "Zeliha", "Esra", "Fadime", "Özlem", "Hacer", "Melek", "Yasemin",
+    "Gökhan", "Çağlar", "Ümit", "Gülşen", "Şükrü", "Tuğba", "Doğan", "Ilgın", "Işıl", "Büşra",
+]
+LAST = [
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+    "Polat", "Özcan", "Korkmaz", "Çakır", "Erdoğan", "Yavuz", "Can", "Acar", "Şen", "Aktaş",
+    "Güler", "Yalçın", "Güneş", "Bozkurt", "Bulut", "Keskin", "Ünal", "Turan", "Gül", "Özer",
+    "Işık", "Kaplan", "Avcı", "Sarı", "Tekin", "Taş", "Köse", "Yüksel", "Ateş", "Aksoy",
+]
+_ASCII = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+
+def _ocr_noise(rng: random.Random, name: str) -> str:
+    """El yazısı/OCR benzeri bozulma: aksan kaybı, harf düşmesi/değişimi, büyük harf."""
+    s = name
+    if rng.random() < 0.6:
+        s = s.translate(_ASCII)
+    chars = list(s)
+    for _ in range(rng.randint(0, 2)):
+        i = rng.randrange(len(chars))
+        if chars[i] == " ":
+            continue
+        if rng.random() < 0.5:
+            chars.pop(i)
+        else:
+            chars[i] = rng.choice("aeilnorstu")
+    s = "".join(chars)
+    return s.upper() if rng.random() < 0.3 else s
+
+
+def _legacy_match(candidates, users, min_score):
+    """Eski O(N×M) döngü (karşılaştırma için)."""
+    user_keys = [(_user_display_name(u), u) for u in users]
+    out = []
+    for ext in candidates:
+        ext_n = _normalize(ext)
+        best = (None, 0.0)
+        for key, u in user_keys:
+            if not key:
+                continue
+            sc = SequenceMatcher(None, ext_n.lower(), key.lower()).ratio()
+            if sc > best[1]:
+                best = (u, sc)
+        out.append(best if best[1] >= min_score else (None, best[1]))
+    return out
+
+
+class Command(BaseCommand):
+    help = "Sentetik isim kümeleriyle eski ve indeksli isim eşleştiricisini karşılaştırır (DB kullanmaz)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=12000, help="Sentetik kullanıcı sayısı")
+        parser.add_argument("--candidates", type=int, default=60, help="OCR aday satırı sayısı")
+        parser.add_argument("--min-score", type=float, default=0.78)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--skip-legacy", action="store_true", help="Eski döngüyü çalıştırma")
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        n_users, n_cand, min_score = opts["users"], opts["candidates"], opts["min_score"]
+
+        users, seen = [], set()
+        while len(users) < n_users:
+            fn = rng.choice(FIRST)
+            if rng.random() < 0.25:
+                fn = f"{fn} {rng.choice(FIRST)}"
+            ln = rng.choice(LAST)
+            if rng.random() < 0.5:
+                ln = f"{ln}{rng.choice(LAST).lower()}"
+            if (fn, ln) in seen:
+                continue
+            seen.add((fn, ln))
+            users.append(SimpleNamespace(id=len(users) + 1, username=f"u{len(users) + 1}", first_name=fn, last_name=ln))
+
+        truth = rng.sample(users, n_cand)
+        cands = [_ocr_noise(rng, f"{u.first_name} {u.last_name}") for u in truth]
+
+        t0 = time.perf_counter()
+        index = build_user_index(users)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        new = match_names_to_users(cands, min_score=min_score, index=index)
+        t_new = time.perf_counter() - t0
+        new_ok = sum(1 for m, u in zip(new, truth) if m.user is u)
+
+        self.stdout.write(f"Kullanıcı: {n_users} | Aday: {n_cand} | min_score={min_score}")
+        self.stdout.write(f"İndeks kurulum: {t_build * 1000:.1f} ms")
+        self.stdout.write(f"İndeksli eşleştirme: {t_new * 1000:.1f} ms | doğru: {new_ok}/{n_cand}")
+
+        if opts["skip_legacy"]:
+            return
+        t0 = time.perf_counter()
+        old = _legacy_match(cands, users, min_score)
+        t_old = time.perf_counter() - t0
+        old_ok = sum(1 for (u, _), t in zip(old, truth) if u is t)
+        self.stdout.write(f"Eski döngü: {t_old * 1000:.1f} ms | doğru: {old_ok}/{n_cand}")
+        self.stdout.write(self.style.SUCCESS(f"Hızlanma (eşleştirme): {t_old / max(t_new, 1e-9):.0f}×"))
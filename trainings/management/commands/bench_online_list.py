@@ -0,0 +1,140 @@
+# trainings/management/commands/bench_online_list.py
+from __future__ import annotations
+
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from trainings.models import OnlineVideo, Training, VideoProgress
+from trainings.utils import video_catalog
+from trainings.views_online import _progress_maps, online_list
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_prepare(user):
+    """Eski online_list veri hazırlığı (karşılaştırma için)."""
+    videos = OnlineVideo.objects.filter(is_active=True).select_related("training").order_by("-created_at")
+    pct_map, sec_map = {}, {}
+    qs = VideoProgress.objects.filter(user=user, video__in=videos).values_list(
+        "video_id", "watched_percent", "watched_seconds"
+    )
+    for video_id, pct, secs in qs:
+        pct_map[video_id] = max(0, min(100, int(pct or 0)))
+        sec_map[video_id] = max(0.0, float(secs or 0))
+    for v in videos:
+        v.progress_percent = pct_map.get(v.id, 0)
+        v.progress_seconds = int(sec_map.get(v.id, 0))
+    return videos
+
+
+class Command(BaseCommand):
+    help = (
+        "online_list için sentetik veriyle (varsayılan 1k video, 100k ilerleme satırı) "
+        "eski ve önbellekli veri hazırlığını karşılaştırır. Veriler işlem sonunda geri alınır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--videos", type=int, default=1000)
+        parser.add_argument("--progress", type=int, default=100_000, help="Toplam VideoProgress satırı")
+        parser.add_argument("--repeat", type=int, default=20, help="Ölçüm tekrarı")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _timed(self, fn, repeat):
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self._run(opts)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        video_catalog.invalidate_catalog()
+
+    def _run(self, opts):
+        rng = random.Random(opts["seed"])
+        n_videos, n_progress, repeat = opts["videos"], opts["progress"], opts["repeat"]
+        User = get_user_model()
+
+        t0 = time.perf_counter()
+        trainings = Training.objects.bulk_create(
+            [Training(title=f"Bench Eğitim {i}", code=f"BENCH-{i}") for i in range(n_videos)], batch_size=500
+        )
+        videos = OnlineVideo.objects.bulk_create(
+            [
+                OnlineVideo(training=t, title=f"Video {i}", video=f"videos/bench_{i}.mp4",
+                            duration_seconds=rng.randint(60, 3600))
+                for i, t in enumerate(trainings)
+            ],
+            batch_size=500,
+        )
+        n_users = max(1, -(-n_progress // n_videos))
+        users = User.objects.bulk_create(
+            [User(username=f"bench_online_{i}") for i in range(n_users)], batch_size=500
+        )
+        rows, left = [], n_progress
+        for u in users:
+            for v in videos[: min(left, n_videos)]:
+                pct = rng.randint(0, 100)
+                rows.append(VideoProgress(user=u, video=v, watched_percent=pct,
+                                          watched_seconds=v.duration_seconds * pct // 100))
+            left -= min(left, n_videos)
+            if len(rows) >= 10_000:
+                VideoProgress.objects.bulk_create(rows, batch_size=2000)
+                rows = []
+        if rows:
+            VideoProgress.objects.bulk_create(rows, batch_size=2000)
+        self.stdout.write(
+            f"Veri: {n_videos} video, {n_users} kullanıcı, {n_progress} ilerleme "
+            f"({(time.perf_counter() - t0):.1f} sn)"
+        )
+
+        user = users[0]  # en kötü durum: tüm videolarda ilerlemesi var
+
+        with CaptureQueriesContext(connection) as q_old:
+            _legacy_prepare(user)
+        t_old = self._timed(lambda: _legacy_prepare(user), repeat)
+
+        video_catalog.invalidate_catalog()
+        rf = RequestFactory()
+
+        def view(u):
+            req = rf.get("/online/")
+            req.user = u
+            return online_list(req)
+
+        with CaptureQueriesContext(connection) as q_cold:
+            view(user)
+        with CaptureQueriesContext(connection) as q_warm:
+            view(user)
+        with CaptureQueriesContext(connection) as q_anon:
+            view(AnonymousUser())
+
+        def prepare_new():
+            catalog = video_catalog.get_catalog()
+            pct_map, sec_map = _progress_maps(user)
+            return [dict(v, progress_percent=pct_map.get(v["id"], 0), progress_seconds=sec_map.get(v["id"], 0))
+                    for v in catalog]
+
+        t_new = self._timed(prepare_new, repeat)
+        t_view = self._timed(lambda: view(user), max(1, repeat // 4))
+
+        self.stdout.write(f"Eski hazırlık:  {t_old * 1000:7.1f} ms | sorgu: {len(q_old)}")
+        self.stdout.write(f"Yeni hazırlık:  {t_new * 1000:7.1f} ms | sorgu (soğuk/sıcak/anonim): "
+                          f"{len(q_cold)}/{len(q_warm)}/{len(q_anon)}")
+        self.stdout.write(f"Yeni sayfa (render dahil): {t_view * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Hızlanma (hazırlık): {t_old / max(t_new, 1e-9):.1f}×"))
@@ -0,0 +1,40 @@
+# trainings/management/commands/escalate_overdue_needs.py
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trainings.utils.escalation import escalate_overdue
+
+
+class Command(BaseCommand):
+    help = (
+        "Hedef tarihi son çalıştırmadan bu yana geçen (ya da o zamandan beri geriye tarihli "
+        "girilen / hedefi öne çekilen) açık eğitim ihtiyaçlarını eskale eder: önceliği yükseltir, "
+        "eskalasyon zamanını işaretler (durum korunur) ve yöneticiye bildirim kuyruğa alır. "
+        "Günlük (cron) çalıştırılmak üzere tasarlanmıştır. Toplu güncellemeyle (updated_at "
+        "değişmeden) öne çekilen hedefler için --since kullanın."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", default="",
+                            help="Watermark yerine bu tarihten (hariç) sonrasını işle (YYYY-AA-GG)")
+        parser.add_argument("--today", default="", help="Bugün yerine kullanılacak tarih (YYYY-AA-GG)")
+        parser.add_argument("--dry-run", action="store_true", help="Yalnızca sayıları göster")
+
+    def handle(self, *args, **opts):
+        try:
+            since = date.fromisoformat(opts["since"]) if opts["since"] else None
+            today = date.fromisoformat(opts["today"]) if opts["today"] else None
+        except ValueError as e:
+            raise CommandError(f"Geçersiz tarih: {e}")
+
+        r = escalate_overdue(today=today, since=since, dry_run=opts["dry_run"])
+        span = f"{r.since or '-'} < hedef ≤ {r.until}"
+        if opts["dry_run"]:
+            self.stdout.write(f"DRY-RUN: {span}: {r.escalated} ihtiyaç eskale edilecek.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{span}: {r.escalated} ihtiyaç eskale edildi, {r.notified} bildirim kuyruğa alındı."
+        ))
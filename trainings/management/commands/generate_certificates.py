@@ -0,0 +1,73 @@
+# trainings/management/commands/generate_certificates.py
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from trainings.utils.certificate_pdf import render_job
+from trainings.utils.certificates import build_jobs, claim_batch, finish_jobs, requeue_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Kuyruktaki sertifika PDF'lerini süreç havuzunda üretir, dosyaları atomik yazar, "
+        "Certificate.file ve seri numarasını atar. Hatalı işler --max-attempts'e kadar yeniden denenir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Paralel süreç sayısı (varsayılan: CPU sayısı, 1 = sıralı)")
+        parser.add_argument("--batch-size", type=int, default=100, help="Tek seferde sahiplenilen iş sayısı")
+        parser.add_argument("--max-attempts", type=int, default=getattr(settings, "CERTIFICATE_MAX_ATTEMPTS", 3),
+                            help="Sertifika başına toplam deneme sınırı")
+        parser.add_argument("--stale-minutes", type=int, default=30,
+                            help="Bu süreden uzun 'Üretiliyor' kalan işler yeniden kuyruğa alınır")
+        parser.add_argument("--loop", action="store_true", help="Kuyruk boşalınca çıkma; --sleep aralıkla bekle")
+        parser.add_argument("--sleep", type=float, default=5.0, help="--loop modunda bekleme (sn)")
+
+    def handle(self, *args, **opts):
+        workers = opts["workers"] or os.cpu_count() or 1
+        batch_size = max(1, opts["batch_size"])
+        max_attempts = max(1, opts["max_attempts"])
+        total_ok = total_bad = 0
+
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while True:
+                stale = requeue_stale(opts["stale_minutes"])
+                if stale:
+                    self.stdout.write(self.style.WARNING(f"{stale} yarım kalmış iş yeniden kuyruğa alındı."))
+
+                ids = claim_batch(batch_size, max_attempts)
+                if not ids:
+                    if not opts["loop"]:
+                        break
+                    time.sleep(opts["sleep"])
+                    continue
+
+                t0 = time.perf_counter()
+                jobs = build_jobs(ids)
+                rel_paths = {j["id"]: j["rel"] for j in jobs}
+                if pool:
+                    chunk = max(1, len(jobs) // (workers * 4))
+                    results = list(pool.map(render_job, jobs, chunksize=chunk))
+                else:
+                    results = [render_job(j) for j in jobs]
+                ok, bad = finish_jobs(results, rel_paths)
+                total_ok += ok
+                total_bad += bad
+                self.stdout.write(
+                    f"{len(jobs)} sertifika: {ok} hazır, {bad} hatalı ({time.perf_counter() - t0:.2f} sn)"
+                )
+                for r in results:
+                    if not r["ok"]:
+                        self.stdout.write(self.style.ERROR(f"  #{r['id']}: {r['error']}"))
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"Bitti. Hazır: {total_ok} | Hatalı: {total_bad}"))
@@ -1,14 +1,17 @@
 # trainings/management/commands/import_attendance.py
 from __future__ import annotations
 
+import os
+
 from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
 
 from trainings.utils.attendance_ocr import (
     ocr_pdf_to_texts,
-    extract_name_candidates,
-    match_names_to_users,
-    add_attendees_to_plan,
+    create_import_session,
+    confirm_session,
 )
+from trainings.utils.ocr_cache import file_sha256
 
 class Command(BaseCommand):
     help = "El yazısı katılım listesini (PDF) OCR ile okuyup bir plana katılımcı olarak ekler."
@@ -18,6 +21,18 @@ class Command(BaseCommand):
         parser.add_argument("--file", type=str, required=True, help="Katılım listesi PDF yolu")
         parser.add_argument("--min-score", type=float, default=0.78, help="Eşleşme alt skoru (0-1)")
         parser.add_argument("--lang", type=str, default="tur+eng", help="Tesseract OCR dil kodu")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Paralel OCR süreç sayısı (varsayılan 1 = sıralı, ocr_pipeline ile aynı; "
+                                 "0 = CPU sayısı). Her işçi ayrı bir tesseract çalıştırır.")
+        parser.add_argument("--dpi", type=int, default=300, help="Rasterize çözünürlüğü")
+        parser.add_argument("--chunk-size", type=int, default=2,
+                            help="İşçi başına bir seferde rasterize edilen sayfa sayısı")
+        parser.add_argument("--no-cache", action="store_true",
+                            help="OCR önbelleğini kullanma (PDF'i yeniden OCR et)")
+        parser.add_argument("--review", action="store_true",
+                            help="Hiçbir şey yazma; sonuçları inceleme kuyruğuna bırak")
+        parser.add_argument("--complete-enrollments", action="store_true",
+                            help="Eşleşenlerin bu eğitimdeki katılımlarını da tamamlandı işaretle")
 
     def handle(self, *args, **opts):
         plan_id = opts["plan"]
@@ -26,27 +41,54 @@ class Command(BaseCommand):
         lang = opts["lang"]
 
         try:
-            texts = ocr_pdf_to_texts(pdf_path, lang=lang)
-        except RuntimeError as e:
+            texts = ocr_pdf_to_texts(
+                pdf_path,
+                lang=lang,
+                workers=opts["workers"] or None,  # 0 → CPU sayısı
+                dpi=opts["dpi"],
+                chunk_size=opts["chunk_size"],
+                use_cache=not opts["no_cache"],
+            )
+        except (RuntimeError, OSError) as e:
             raise CommandError(str(e))
 
-        cands = extract_name_candidates(texts)
-        self.stdout.write(self.style.WARNING(f"Aday isim satırı: {len(cands)}"))
-
-        matches = match_names_to_users(cands, min_score=min_score)
+        try:
+            session = create_import_session(
+                plan_id,
+                texts,
+                min_score=min_score,
+                lang=lang,
+                file_name=os.path.basename(pdf_path),
+                file_sha256=file_sha256(pdf_path),
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
 
-        ok = [m for m in matches if m.user is not None]
-        no = [m for m in matches if m.user is None]
+        lines = list(session.lines.all())
+        ok = [ln for ln in lines if ln.decision == "accepted"]
+        no = [ln for ln in lines if ln.decision != "accepted"]
+        in_plan = sum(1 for ln in ok if ln.tier == "plan")
 
-        self.stdout.write(self.style.SUCCESS(f"Eşleşen: {len(ok)}  | Eşleşmeyen: {len(no)}"))
+        self.stdout.write(self.style.WARNING(f"Aday isim satırı: {len(lines)}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Eşleşen: {len(ok)} (plan kitlesinden: {in_plan})  | Eşleşmeyen: {len(no)}"
+        ))
 
         # Eşleşmeyenleri göster
         if no:
             self.stdout.write("Eşleşmeyen örnekler:")
-            for m in no[:10]:
-                self.stdout.write(f"  - '{m.extracted}' (skor={m.score:.2f})")
+            for ln in no[:10]:
+                self.stdout.write(f"  - '{ln.extracted}' (skor={ln.score:.2f})")
+
+        review_url = reverse("attendance_import_review", args=[session.pk])
+        if opts["review"]:
+            self.stdout.write(self.style.WARNING(f"İnceleme oturumu #{session.pk}: {review_url}"))
+            return
 
-        added, skipped = add_attendees_to_plan(plan_id, ok)
-        self.stdout.write(self.style.SUCCESS(f"Eklendi: {added} | Zaten vardı: {skipped}"))
+        added, completed = confirm_session(session, complete_enrollments=opts["complete_enrollments"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Eklendi: {added} | Zaten vardı: {len({ln.user_id for ln in ok}) - added} | Tamamlanan katılım: {completed}"
+        ))
+        self.stdout.write(f"Oturum #{session.pk}: {review_url}")
 
         self.stdout.write(self.style.SUCCESS("Bitti."))
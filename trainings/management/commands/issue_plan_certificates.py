@@ -0,0 +1,51 @@
+# trainings/management/commands/issue_plan_certificates.py
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trainings.models import TrainingPlan
+from trainings.utils.certificates import issue_for_plan, iter_certificate_zip, iter_merged_pdf, not_ready
+
+
+class Command(BaseCommand):
+    help = (
+        "Eğitim planlarının tüm katılımcılarına sertifika düzenler (bulk_create), eksik PDF'leri "
+        "süreç havuzunda üretir; istenirse tek çok sayfalı PDF ya da ZIP dosyasına akıtır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("plan_ids", nargs="+", type=int, help="TrainingPlan id'leri")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Paralel süreç sayısı (varsayılan: CPU sayısı, 1 = sıralı)")
+        parser.add_argument("--output", default="", help="Çıktı dosyası (.pdf ya da .zip); boşsa yalnızca üretir")
+        parser.add_argument("--format", choices=("pdf", "zip"), default=None,
+                            help="Çıktı biçimi (varsayılan: --output uzantısı)")
+
+    def handle(self, *args, **opts):
+        plans = list(TrainingPlan.objects.filter(pk__in=opts["plan_ids"]).select_related("training"))
+        missing = set(opts["plan_ids"]) - {p.pk for p in plans}
+        if missing:
+            raise CommandError(f"Plan bulunamadı: {', '.join(map(str, sorted(missing)))}")
+
+        t0 = time.perf_counter()
+        certs, bad = issue_for_plan(plans, workers=opts["workers"])
+        ready = sum(1 for c in certs if c.status == "ready")
+        self.stdout.write(
+            f"{len(certs)} sertifika: {ready} hazır, {bad} hatalı ({time.perf_counter() - t0:.2f} sn)"
+        )
+
+        out = opts["output"]
+        skipped = not_ready(certs)
+        if out and skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} sertifika hazır olmadığı için dosyaya eklenmedi."))
+        if out and certs and skipped < len(certs):
+            fmt = opts["format"] or ("zip" if out.lower().endswith(".zip") else "pdf")
+            chunks = iter_certificate_zip(certs) if fmt == "zip" else iter_merged_pdf(certs)
+            size = 0
+            with open(out, "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    size += len(chunk)
+            self.stdout.write(self.style.SUCCESS(f"{out} yazıldı ({size / 1024:.1f} KB)."))
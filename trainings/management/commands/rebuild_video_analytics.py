@@ -0,0 +1,24 @@
+# trainings/management/commands/rebuild_video_analytics.py
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from trainings.utils.video_analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Video bırakma histogramlarını ve tamamlama sayılarını VideoProgress'ten "
+        "baştan hesaplar (ilk kurulum / süre değişikliği sonrası). Normalde özetler artımlı güncellenir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--video", type=int, action="append", default=[],
+                            help="Yalnızca bu video(lar) (tekrarlanabilir)")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        n = rebuild(opts["video"] or None)
+        self.stdout.write(self.style.SUCCESS(f"{n} video yeniden hesaplandı ({time.perf_counter() - t0:.1f} sn)."))
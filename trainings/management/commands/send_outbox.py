@@ -0,0 +1,70 @@
+# trainings/management/commands/send_outbox.py
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from trainings.utils.outbox import claim, merge_digests, requeue_stale, send_claimed
+from trainings.utils.reminders import Throttle
+
+
+class Command(BaseCommand):
+    help = (
+        "Giden e-posta kuyruğunu (OutboxMessage) işler: zamanı gelen özet bildirimlerini alıcı başına "
+        "birleştirir, bekleyenleri tek bağlantı üzerinden partiler halinde gönderir; hatalılar üstel "
+        "geri çekilmeyle yeniden denenir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Tek seferde sahiplenilen mesaj sayısı")
+        parser.add_argument("--max-attempts", type=int, default=5, help="Mesaj başına toplam deneme sınırı")
+        parser.add_argument("--rate", type=float, default=None,
+                            help="Saniyedeki en fazla mesaj (varsayılan: OUTBOX_RATE_PER_SECOND, 0 = sınırsız)")
+        parser.add_argument("--stale-minutes", type=int, default=15,
+                            help="Bu süreden uzun 'Gönderiliyor' kalan mesajlar yeniden kuyruğa alınır")
+        parser.add_argument("--loop", action="store_true", help="Kuyruk boşalınca çıkma; --sleep aralıkla bekle")
+        parser.add_argument("--sleep", type=float, default=10.0, help="--loop modunda bekleme (sn)")
+
+    def handle(self, *args, **opts):
+        rate = opts["rate"] if opts["rate"] is not None else getattr(settings, "OUTBOX_RATE_PER_SECOND", 10)
+        throttle = Throttle(rate)
+        max_attempts = max(1, opts["max_attempts"])
+        total = [0, 0, 0]
+
+        connection = None
+        try:
+            while True:
+                stale = requeue_stale(opts["stale_minutes"])
+                if stale:
+                    self.stdout.write(self.style.WARNING(f"{stale} yarım kalmış mesaj yeniden kuyruğa alındı."))
+                digests = merge_digests()
+                if digests:
+                    self.stdout.write(f"{digests} özet e-postası oluşturuldu.")
+
+                ids = claim(max(1, opts["batch_size"]))
+                if not ids:
+                    if connection is not None:  # boşta bağlantıyı açık tutma
+                        connection.close()
+                        connection = None
+                    if not opts["loop"]:
+                        break
+                    time.sleep(opts["sleep"])
+                    continue
+
+                if connection is None:
+                    connection = get_connection()
+                    connection.open()
+                sent, retry, dead = send_claimed(ids, connection, max_attempts, throttle)
+                for i, n in enumerate((sent, retry, dead)):
+                    total[i] += n
+                self.stdout.write(f"{len(ids)} mesaj: {sent} gönderildi, {retry} yeniden denenecek, {dead} hatalı")
+        finally:
+            if connection is not None:
+                connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Bitti. Gönderilen: {total[0]} | Ertelenen: {total[1]} | Hatalı: {total[2]}"
+        ))
@@ -0,0 +1,175 @@
+# trainings/management/commands/transcode_videos.py
+from __future__ import annotations
+
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from trainings.models import OnlineVideo, VideoProgress
+from trainings.utils.transcode import require_ffmpeg, transcode
+from trainings.utils.video_analytics import rebuild as rebuild_analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Online videoları ffmpeg ile dönüştürür: gerçek süre, küçük resim ve "
+        "çok bitrate'li HLS. İşler sınırlı bir havuzda çalışır, durum videoya yazılır, "
+        "hatalı işler --max-attempts'e kadar yeniden denenir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Aynı anda çalışan ffmpeg sayısı")
+        parser.add_argument("--threads", type=int, default=0,
+                            help="ffmpeg başına iş parçacığı (0 = ffmpeg karar verir)")
+        parser.add_argument("--max-attempts", type=int, default=3, help="Video başına toplam deneme sınırı")
+        parser.add_argument("--retry-delay", type=float, default=30.0,
+                            help="Hatalı bir işin yeniden denenmeden önce beklediği süre (sn)")
+        parser.add_argument("--timeout", type=float, default=None, help="Tek ffmpeg çağrısı için zaman aşımı (sn)")
+        parser.add_argument("--stale-minutes", type=int, default=180,
+                            help="Bu süreden uzun 'İşleniyor' kalan işler (çöken işçi) yeniden kuyruğa alınır")
+        parser.add_argument("--video", type=int, action="append", default=[],
+                            help="Yalnızca bu video(lar) (tekrarlanabilir)")
+        parser.add_argument("--force", action="store_true",
+                            help="--video ile seçilen videoları durumlarından bağımsız yeniden dönüştür")
+        parser.add_argument("--limit", type=int, default=None, help="Bu çalıştırmada en fazla kaç video")
+
+    # -------- Kuyruk --------
+    def _requeue_stale(self, minutes: int) -> int:
+        cutoff = timezone.now() - timedelta(minutes=minutes)
+        return OnlineVideo.objects.filter(hls_status="processing", transcode_started_at__lt=cutoff).update(
+            hls_status="failed", transcode_error="Zaman aşımı: işçi yanıt vermedi."
+        )
+
+    def _claim(self, pk: int, max_attempts: int) -> bool:
+        """Tek UPDATE ile işi sahiplen; aynı anda çalışan başka komut almışsa False."""
+        return bool(
+            OnlineVideo.objects.filter(
+                pk=pk, hls_status__in=["pending", "failed"], transcode_attempts__lt=max_attempts
+            ).update(
+                hls_status="processing",
+                transcode_attempts=F("transcode_attempts") + 1,
+                transcode_started_at=timezone.now(),
+            )
+        )
+
+    # -------- Sonuçlar --------
+    def _on_success(self, pk: int, result) -> None:
+        video = OnlineVideo.objects.get(pk=pk)
+        old_duration = video.duration_seconds
+        out_dir = os.path.join(settings.MEDIA_ROOT, video.hls_dir())
+        video.duration_seconds = max(1, int(math.ceil(result.duration)))
+        video.hls_master = f"{video.hls_dir()}/{result.master}"
+        video.hls_status = "ready"
+        video.transcode_error = ""
+        video.transcoded_at = timezone.now()
+        fields = ["duration_seconds", "hls_master", "hls_status", "transcode_error", "transcoded_at", "updated_at"]
+        # Elle yüklenmiş küçük resim korunur
+        if result.thumbnail and not video.thumbnail:
+            with open(os.path.join(out_dir, result.thumbnail), "rb") as fh:
+                video.thumbnail.save(f"video_{pk}.jpg", File(fh), save=False)
+            fields.append("thumbnail")
+        video.save(update_fields=fields)
+        # Gerçek süre farklıysa izlenme yüzdeleri ve bırakma dilimleri yeniden hesaplanır
+        if old_duration != video.duration_seconds:
+            VideoProgress.objects.filter(video_id=pk).update(
+                watched_percent=Least(F("watched_seconds") * 100 / video.duration_seconds, Value(100))
+            )
+            rebuild_analytics([pk])
+
+    def _on_failure(self, pk: int, exc: BaseException) -> None:
+        OnlineVideo.objects.filter(pk=pk).update(
+            hls_status="failed",
+            transcode_error=f"{type(exc).__name__}: {exc}"[:2000],
+        )
+
+    def handle(self, *args, **opts):
+        if opts["force"] and not opts["video"]:
+            raise CommandError("--force yalnızca --video ile birlikte kullanılabilir.")
+        try:
+            require_ffmpeg()
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        workers = max(1, opts["workers"])
+        max_attempts = max(1, opts["max_attempts"])
+        retry_delay = max(0.0, opts["retry_delay"])
+
+        stale = self._requeue_stale(opts["stale_minutes"])
+        if stale:
+            self.stdout.write(self.style.WARNING(f"{stale} yarım kalmış iş yeniden kuyruğa alındı."))
+
+        qs = OnlineVideo.objects.all()
+        if opts["video"]:
+            qs = qs.filter(pk__in=opts["video"])
+            if opts["force"]:
+                qs.exclude(hls_status="processing").update(hls_status="pending", transcode_attempts=0)
+        qs = qs.filter(
+            Q(hls_status="pending") | Q(hls_status="failed", transcode_attempts__lt=max_attempts)
+        ).exclude(video="")
+        ids = list(qs.order_by("created_at").values_list("pk", flat=True)[: opts["limit"]])
+        if not ids:
+            self.stdout.write("Dönüştürülecek video yok.")
+            return
+
+        self.stdout.write(f"{len(ids)} video, {workers} işçi ile dönüştürülüyor…")
+        queue = [(pk, 0.0) for pk in ids]   # (video, en erken başlama zamanı)
+        running = {}
+        ok = failed = 0
+
+        # ffmpeg alt süreçleri iş parçacıklarında bekler; DB yalnızca bu iş parçacığında
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcode") as pool:
+            while queue or running:
+                now = time.monotonic()
+                ready = [q for q in queue if q[1] <= now]
+                while ready and len(running) < workers:
+                    item = ready.pop(0)
+                    queue.remove(item)
+                    pk = item[0]
+                    if not self._claim(pk, max_attempts):
+                        continue
+                    video = OnlineVideo.objects.only("id", "video").get(pk=pk)
+                    fut = pool.submit(
+                        transcode, video.video.path, os.path.join(settings.MEDIA_ROOT, video.hls_dir()),
+                        threads=opts["threads"], timeout=opts["timeout"],
+                    )
+                    running[fut] = pk
+
+                if not running:
+                    if queue:
+                        time.sleep(max(0.0, min(q[1] for q in queue) - time.monotonic()))
+                    continue
+
+                done, _ = wait(list(running), timeout=1.0, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    pk = running.pop(fut)
+                    try:
+                        result = fut.result()
+                        self._on_success(pk, result)
+                        ok += 1
+                        self.stdout.write(self.style.SUCCESS(
+                            f"  #{pk} hazır ({', '.join(result.renditions)}; {result.duration:.0f} sn)"
+                        ))
+                    except Exception as e:
+                        self._on_failure(pk, e)
+                        attempts = OnlineVideo.objects.filter(pk=pk).values_list(
+                            "transcode_attempts", flat=True
+                        ).first() or 0
+                        if attempts < max_attempts:
+                            queue.append((pk, time.monotonic() + retry_delay))
+                            self.stdout.write(self.style.WARNING(
+                                f"  #{pk} hata (deneme {attempts}/{max_attempts}), yeniden denenecek: {e}"
+                            ))
+                        else:
+                            failed += 1
+                            self.stdout.write(self.style.ERROR(f"  #{pk} başarısız: {e}"))
+
+        self.stdout.write(self.style.SUCCESS(f"Bitti. Hazır: {ok} | Başarısız: {failed}"))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0008_jobroleassignmentquickadd_jobroleassignmentquicklist_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceImportLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Sıra')),
+                ('extracted', models.CharField(max_length=255, verbose_name='OCR Satırı')),
+                ('suggestions', models.JSONField(blank=True, default=list, verbose_name='Öneriler')),
+                ('score', models.FloatField(default=0.0, verbose_name='Skor')),
+                ('tier', models.CharField(blank=True, max_length=10, verbose_name='Katman')),
+                ('decision', models.CharField(choices=[('pending', 'Bekliyor'), ('accepted', 'Kabul'), ('rejected', 'Red')], default='pending', max_length=10, verbose_name='Karar')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Seçilen Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Katılım İçe Aktarma Satırı',
+                'verbose_name_plural': 'Katılım İçe Aktarma Satırları',
+                'ordering': ['session', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceImportSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(blank=True, max_length=255, verbose_name='Dosya')),
+                ('file_sha256', models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Dosya Özeti')),
+                ('lang', models.CharField(default='tur+eng', max_length=30, verbose_name='OCR Dili')),
+                ('min_score', models.FloatField(default=0.78, verbose_name='Eşleşme Alt Skoru')),
+                ('page_texts', models.JSONField(blank=True, default=list, verbose_name='OCR Sayfa Metinleri')),
+                ('status', models.CharField(choices=[('pending', 'İncelemede'), ('confirmed', 'Onaylandı'), ('cancelled', 'İptal')], default='pending', max_length=10, verbose_name='Durum')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='Onay')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Oluşturulma')),
+                ('confirmed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='confirmed_attendance_imports', to=settings.AUTH_USER_MODEL, verbose_name='Onaylayan')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_imports', to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_imports', to='trainings.trainingplan', verbose_name='Plan')),
+            ],
+            options={
+                'verbose_name': 'Katılım İçe Aktarma',
+                'verbose_name_plural': 'Katılım İçe Aktarmaları',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='attendanceimportline',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='trainings.attendanceimportsession', verbose_name='Oturum'),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceimportsession',
+            index=models.Index(fields=['plan', 'status'], name='trainings_a_plan_id_332c9d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceimportline',
+            index=models.Index(fields=['session', 'decision'], name='trainings_a_session_ebf644_idx'),
+        ),
+    ]
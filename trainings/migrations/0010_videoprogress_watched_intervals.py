@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0009_attendanceimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprogress',
+            name='watched_intervals',
+            field=models.JSONField(blank=True, default=list, verbose_name='İzlenen Aralıklar'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:14
+
+import math
+import sys
+from array import array
+
+from django.db import migrations, models
+
+# trainings.utils.coverage'a bağımlı kalmamak için kodlayıcının kopyası:
+# tam saniyeye yuvarla, çakışan/değen aralıkları birleştir, en fazla 32 parça
+# (fazlası için en kısa aralık atılır), küçük-endian uint32 çiftleri.
+MAX_INTERVALS = 32
+
+
+def encode(intervals):
+    spans = []
+    for s, e in sorted(
+        (int(math.floor(max(0.0, float(s)))), int(math.ceil(max(0.0, float(e)))))
+        for s, e in intervals
+    ):
+        if e <= s:
+            continue
+        if spans and s <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], e)
+        else:
+            spans.append([s, e])
+    while len(spans) > MAX_INTERVALS:
+        spans.remove(min(spans, key=lambda x: x[1] - x[0]))
+    a = array('I')
+    for s, e in spans:
+        a.append(s)
+        a.append(e)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes(), sum(e - s for s, e in spans)
+
+
+def forwards(apps, schema_editor):
+    """watched_intervals (JSON) → coverage (bayt); aralığı olmayanlar için [0, max]."""
+    VideoProgress = apps.get_model("trainings", "VideoProgress")
+    batch = []
+    qs = VideoProgress.objects.select_related("video").only(
+        "id", "max_position_seconds", "watched_intervals", "video__duration_seconds"
+    )
+    for vp in qs.iterator(chunk_size=2000):
+        intervals = [iv for iv in (vp.watched_intervals or []) if isinstance(iv, (list, tuple)) and len(iv) == 2]
+        if not intervals and vp.max_position_seconds:
+            intervals = [(0, vp.max_position_seconds)]
+        vp.coverage, vp.watched_seconds = encode(intervals)
+        duration = float(vp.video.duration_seconds or 0)
+        vp.watched_percent = max(0, min(100, int(vp.watched_seconds / duration * 100))) if duration else 0
+        batch.append(vp)
+        if len(batch) >= 2000:
+            VideoProgress.objects.bulk_update(batch, ["coverage", "watched_seconds", "watched_percent"])
+            batch = []
+    if batch:
+        VideoProgress.objects.bulk_update(batch, ["coverage", "watched_seconds", "watched_percent"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0010_videoprogress_watched_intervals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprogress',
+            name='coverage',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='İzlenen Aralıklar'),
+        ),
+        migrations.AddField(
+            model_name='videoprogress',
+            name='watched_percent',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='İzlenme (%)'),
+        ),
+        migrations.AddField(
+            model_name='videoprogress',
+            name='watched_seconds',
+            field=models.PositiveIntegerField(default=0, verbose_name='İzlenen (sn)'),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='videoprogress',
+            name='watched_intervals',
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0011_videoprogress_coverage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onlinevideo',
+            name='hls_master',
+            field=models.CharField(blank=True, max_length=255, verbose_name='HLS Ana Liste'),
+        ),
+        migrations.AddField(
+            model_name='onlinevideo',
+            name='hls_status',
+            field=models.CharField(choices=[('pending', 'Bekliyor'), ('processing', 'İşleniyor'), ('ready', 'Hazır'), ('failed', 'Hatalı')], default='pending', max_length=12, verbose_name='HLS Durumu'),
+        ),
+        migrations.AddField(
+            model_name='onlinevideo',
+            name='transcode_attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Deneme'),
+        ),
+        migrations.AddField(
+            model_name='onlinevideo',
+            name='transcode_error',
+            field=models.TextField(blank=True, verbose_name='Dönüştürme Hatası'),
+        ),
+        migrations.AddField(
+            model_name='onlinevideo',
+            name='transcode_started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Dönüştürme Başlangıcı'),
+        ),
+        migrations.AddField(
+            model_name='onlinevideo',
+            name='transcoded_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Dönüştürülme'),
+        ),
+        migrations.AddIndex(
+            model_name='onlinevideo',
+            index=models.Index(fields=['hls_status'], name='trainings_o_hls_sta_12161c_idx'),
+        ),
+    ]
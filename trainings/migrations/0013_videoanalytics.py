@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0012_onlinevideo_hls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoAnalytics',
+            fields=[
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analytics', serialize=False, to='trainings.onlinevideo', verbose_name='Video')),
+                ('buckets', models.JSONField(blank=True, default=list, verbose_name='Bırakma Histogramı')),
+                ('viewers', models.PositiveIntegerField(default=0, verbose_name='İzleyici')),
+                ('completed', models.PositiveIntegerField(default=0, verbose_name='Tamamlayan')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Video Analitiği',
+                'verbose_name_plural': 'Video Analitikleri',
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    # Dosyası olan mevcut sertifikalar yeniden üretilmesin
+    Certificate = apps.get_model("trainings", "Certificate")
+    Certificate.objects.exclude(file__isnull=True).exclude(file="").update(status="ready")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0013_videoanalytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Deneme'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='error',
+            field=models.TextField(blank=True, verbose_name='Hata'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='generated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Üretilme'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Üretim Başlangıcı'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Bekliyor'), ('processing', 'Üretiliyor'), ('ready', 'Hazır'), ('failed', 'Hatalı')], default='pending', max_length=12, verbose_name='PDF Durumu'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['status'], name='trainings_c_status_e52a01_idx'),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+
+def normalize_serials(apps, schema_editor):
+    # Boş seriler NULL olur, büyük harfe çekilir; tekrarlananlara pk eklenir
+    Certificate = apps.get_model("trainings", "Certificate")
+    seen = set()
+    for pk, serial in Certificate.objects.order_by("pk").values_list("pk", "serial"):
+        new = (serial or "").strip().upper() or None
+        if new in seen:
+            new = f"{new}-{pk}"
+        if new:
+            seen.add(new)
+        if new != serial:
+            Certificate.objects.filter(pk=pk).update(serial=new)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0014_certificate_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_serials, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='certificate',
+            name='serial',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True, verbose_name='Seri'),
+        ),
+    ]
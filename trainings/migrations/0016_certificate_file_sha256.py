@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0015_certificate_serial_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='file_sha256',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Dosya SHA-256'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0016_certificate_file_sha256'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingReminderLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days_before', models.PositiveSmallIntegerField(verbose_name='Kaç Gün Önce')),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Gönderilme')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_logs', to='trainings.trainingplan', verbose_name='Plan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Hatırlatma Kaydı',
+                'verbose_name_plural': 'Hatırlatma Kayıtları',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trainingreminderlog',
+            constraint=models.UniqueConstraint(fields=('plan', 'user', 'days_before'), name='uq_reminder_plan_user_days'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0017_trainingreminderlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(blank=True, max_length=30, verbose_name='Tür')),
+                ('key', models.CharField(blank=True, max_length=120, null=True, unique=True, verbose_name='Tekillik Anahtarı')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Alıcı')),
+                ('subject', models.CharField(max_length=255, verbose_name='Konu')),
+                ('body_text', models.TextField(verbose_name='Metin')),
+                ('body_html', models.TextField(blank=True, verbose_name='HTML')),
+                ('digest', models.BooleanField(default=False, verbose_name='Günlük Özete Eklenir')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('sending', 'Gönderiliyor'), ('sent', 'Gönderildi'), ('failed', 'Hatalı'), ('merged', 'Özete Eklendi')], default='pending', max_length=10, verbose_name='Durum')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Sonraki Deneme')),
+                ('last_error', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Oluşturulma')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Gönderilme')),
+                ('merged_into', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='parts', to='trainings.outboxmessage', verbose_name='Özet')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Giden E-posta',
+                'verbose_name_plural': 'Giden E-postalar',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['status', 'digest', 'next_attempt_at'], name='trainings_o_status_b26203_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['to_email', 'status'], name='trainings_o_to_emai_d8b1ca_idx'),
+        ),
+    ]
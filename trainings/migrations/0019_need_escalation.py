@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0018_outboxmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=60, unique=True, verbose_name='Ad')),
+                ('value', models.DateField(blank=True, null=True, verbose_name='Son İşlenen Tarih')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Zamanlayıcı Durumu',
+                'verbose_name_plural': 'Zamanlayıcı Durumları',
+            },
+        ),
+        migrations.AddField(
+            model_name='trainingneed',
+            name='escalated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Eskalasyon'),
+        ),
+        migrations.AlterField(
+            model_name='trainingneed',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Beklemede'), ('approved', 'Onaylandı'), ('rejected', 'Reddedildi'), ('planned', 'Planlandı'), ('overdue', 'Gecikti'), ('done', 'Tamamlandı'), ('cancelled', 'İptal')], default='pending', max_length=12, verbose_name='Durum'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingneed',
+            index=models.Index(fields=['is_open', 'due_date'], name='ix_need_open_due'),
+        ),
+    ]
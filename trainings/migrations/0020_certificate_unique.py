@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def dedupe(apps, schema_editor):
+    """Aynı (kullanıcı, eğitim) için fazla sertifikaları sil: hazır olan, yoksa en eski kalır."""
+    Certificate = apps.get_model('trainings', 'Certificate')
+    dups = (
+        Certificate.objects.values('user_id', 'training_id')
+        .annotate(n=Count('id')).filter(n__gt=1).order_by()
+    )
+    for row in dups:
+        rows = Certificate.objects.filter(user_id=row['user_id'], training_id=row['training_id'])
+        keep = (
+            rows.filter(status='ready').order_by('pk').first()
+            or rows.order_by('pk').first()
+        )
+        rows.exclude(pk=keep.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0019_need_escalation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='certificate',
+            constraint=models.UniqueConstraint(fields=('user', 'training'), name='uq_certificate_user_training'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def restore_status(apps, schema_editor):
+    """'overdue' durumundaki ihtiyaçlar onaylıysa 'approved', değilse 'pending'e döner (gecikme escalated_at'ta)."""
+    TrainingNeed = apps.get_model('trainings', 'TrainingNeed')
+    overdue = TrainingNeed.objects.filter(status='overdue')
+    overdue.filter(approved_by__isnull=False).update(status='approved')
+    overdue.update(status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0020_certificate_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_status, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='schedulerwatermark',
+            name='ran_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Son Çalıştırma'),
+        ),
+        migrations.AlterField(
+            model_name='trainingneed',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Beklemede'), ('approved', 'Onaylandı'), ('rejected', 'Reddedildi'), ('planned', 'Planlandı'), ('done', 'Tamamlandı'), ('cancelled', 'İptal')], default='pending', max_length=12, verbose_name='Durum'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingneed',
+            index=models.Index(fields=['is_open', 'updated_at'], name='ix_need_open_updated'),
+        ),
+    ]
@@ -79,10 +79,26 @@ class Certificate(models.Model):
         verbose_name="Eğitim",
     )
     file = models.FileField("Dosya (PDF)", upload_to=cert_upload_to, blank=True, null=True)
-    serial = models.CharField("Seri", max_length=50, blank=True, null=True)
+    # Benzersiz; /verify/<seri>/ tek indeksli okuma yapar. Atanmamışsa NULL.
+    serial = models.CharField("Seri", max_length=50, blank=True, null=True, unique=True)
     issued_at = models.DateTimeField("Düzenlenme", default=timezone.now)
     expires_at = models.DateTimeField("Geçerlilik Bitiş", null=True, blank=True)
 
+    # PDF üretim kuyruğu (generate_certificates komutu işler)
+    STATUS_CHOICES = (
+        ("pending", "Bekliyor"),
+        ("processing", "Üretiliyor"),
+        ("ready", "Hazır"),
+        ("failed", "Hatalı"),
+    )
+    status = models.CharField("PDF Durumu", max_length=12, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField("Deneme", default=0)
+    error = models.TextField("Hata", blank=True)
+    started_at = models.DateTimeField("Üretim Başlangıcı", null=True, blank=True)
+    generated_at = models.DateTimeField("Üretilme", null=True, blank=True)
+    # İndirmede güçlü ETag için (dosya üretilince yazılır)
+    file_sha256 = models.CharField("Dosya SHA-256", max_length=64, blank=True)
+
     created_at = models.DateTimeField("Oluşturulma", default=timezone.now)
 
     class Meta:
@@ -91,6 +107,11 @@ class Certificate(models.Model):
         indexes = [
             models.Index(fields=["user", "training"]),
             models.Index(fields=["issued_at"]),
+            models.Index(fields=["status"]),
+        ]
+        constraints = [
+            # Eşzamanlı tamamlanma sinyalleri (video + OCR onayı) çift sertifika açmasın
+            models.UniqueConstraint(fields=["user", "training"], name="uq_certificate_user_training"),
         ]
 
     def __str__(self):
@@ -253,6 +274,8 @@ class TrainingNeed(models.Model):
     due_date = models.DateField("Hedef Tarih", null=True, blank=True)
 
     is_open = models.BooleanField("Açık Kayıt", default=True)
+    # Dolu ise hedef tarihi geçmiş ve eskale edilmiştir (durum korunur)
+    escalated_at = models.DateTimeField("Eskalasyon", null=True, blank=True)
 
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
@@ -273,6 +296,8 @@ class TrainingNeed(models.Model):
             models.Index(fields=["user", "is_open"]),
             models.Index(fields=["training", "status"]),
             models.Index(fields=["source"]),
+            models.Index(fields=["is_open", "due_date"], name="ix_need_open_due"),
+            models.Index(fields=["is_open", "updated_at"], name="ix_need_open_updated"),
         ]
         constraints = [
             models.UniqueConstraint(fields=["user", "training", "is_open"], name="uq_open_need_per_user_training"),
@@ -374,6 +399,38 @@ class TrainingPlanAttendee(models.Model):
         return f"{self.user} @ {self.plan_id}"
 
 
+class TrainingReminderLog(models.Model):
+    """
+    Gönderilmiş plan hatırlatmaları defteri (send_training_reminders).
+    (plan, kullanıcı, gün) başına tek satır: komut tekrar çalışınca
+    gönderilmişleri tek sorguda eler.
+    """
+    plan = models.ForeignKey(
+        "trainings.TrainingPlan",
+        on_delete=models.CASCADE,
+        related_name="reminder_logs",
+        verbose_name="Plan",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Kullanıcı",
+    )
+    days_before = models.PositiveSmallIntegerField("Kaç Gün Önce")
+    sent_at = models.DateTimeField("Gönderilme", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Hatırlatma Kaydı"
+        verbose_name_plural = "Hatırlatma Kayıtları"
+        constraints = [
+            models.UniqueConstraint(fields=["plan", "user", "days_before"], name="uq_reminder_plan_user_days"),
+        ]
+
+    def __str__(self):
+        return f"{self.plan_id} / {self.user_id} (T-{self.days_before})"
+
+
 # =========================================================
 # 5) ONLINE VIDEO ve İLERLEME
 # =========================================================
@@ -392,6 +449,20 @@ class OnlineVideo(models.Model):
     duration_seconds = models.PositiveIntegerField("Süre (sn)", validators=[MinValueValidator(1)])
     is_active = models.BooleanField("Aktif mi?", default=True)
 
+    # HLS dönüştürme (transcode_videos komutu doldurur)
+    HLS_STATUS = [
+        ("pending", "Bekliyor"),
+        ("processing", "İşleniyor"),
+        ("ready", "Hazır"),
+        ("failed", "Hatalı"),
+    ]
+    hls_status = models.CharField("HLS Durumu", max_length=12, choices=HLS_STATUS, default="pending")
+    hls_master = models.CharField("HLS Ana Liste", max_length=255, blank=True)  # MEDIA_ROOT'a göre
+    transcode_attempts = models.PositiveSmallIntegerField("Deneme", default=0)
+    transcode_error = models.TextField("Dönüştürme Hatası", blank=True)
+    transcode_started_at = models.DateTimeField("Dönüştürme Başlangıcı", null=True, blank=True)
+    transcoded_at = models.DateTimeField("Dönüştürülme", null=True, blank=True)
+
     created_at = models.DateTimeField("Oluşturulma", default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -399,7 +470,10 @@ class OnlineVideo(models.Model):
         verbose_name = "Online Video"
         verbose_name_plural = "Online Videolar"
         ordering = ["-created_at"]
-        indexes = [models.Index(fields=["is_active"])]
+        indexes = [
+            models.Index(fields=["is_active"]),
+            models.Index(fields=["hls_status"]),
+        ]
 
     def __str__(self):
         return self.title or f"{self.training.title} (Online)"
@@ -413,12 +487,25 @@ class OnlineVideo(models.Model):
             return f"{h}s {m}d"
         return f"{m}d"
 
+    @property
+    def hls_ready(self) -> bool:
+        return self.hls_status == "ready" and bool(self.hls_master)
+
+    def hls_dir(self) -> str:
+        """HLS çıktısının MEDIA_ROOT'a göre dizini."""
+        return f"hls/{self.pk}"
+
 
 class VideoProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="video_progress")
     video = models.ForeignKey("trainings.OnlineVideo", on_delete=models.CASCADE, related_name="progress")
     last_position_seconds = models.FloatField("Son Konum (sn)", default=0.0)
     max_position_seconds = models.FloatField("Maks Konum (sn)", default=0.0)
+    # İzlenen aralıklar: uint32 (başlangıç, bitiş) çiftleri, bkz. utils/coverage.py
+    coverage = models.BinaryField("İzlenen Aralıklar", default=b"", blank=True)
+    # coverage'dan türetilen önbellek alanları (listeler aralık çözmeden okur)
+    watched_seconds = models.PositiveIntegerField("İzlenen (sn)", default=0)
+    watched_percent = models.PositiveSmallIntegerField("İzlenme (%)", default=0)
     completed = models.BooleanField("Tamamlandı", default=False)
     completed_at = models.DateTimeField("Tamamlanma", null=True, blank=True)
     created_at = models.DateTimeField("Oluşturulma", default=timezone.now)
@@ -437,7 +524,212 @@ class VideoProgress(models.Model):
         return f"{self.user} / {self.video}"
 
     def percent(self) -> int:
-        if not self.video_id or not self.video.duration_seconds:
-            return 0
-        p = int((self.max_position_seconds / float(self.video.duration_seconds)) * 100)
-        return max(0, min(100, p))
+        return int(self.watched_percent or 0)
+
+    def get_coverage(self):
+        from .utils.coverage import Coverage
+        return Coverage.from_bytes(self.coverage)
+
+    def set_coverage(self, cov, duration_seconds):
+        """
+        coverage baytlarını ve önbellek alanlarını birlikte günceller.
+        duration_seconds gerçek süre olmalı; bilinmiyorsa 0 verilir ve yüzde 0 kalır.
+        """
+        self.coverage = cov.to_bytes()
+        self.watched_seconds = cov.covered()
+        self.watched_percent = cov.percent(duration_seconds)
+
+
+class VideoAnalytics(models.Model):
+    """
+    Video başına izlenme özeti (utils/video_analytics.py artımlı günceller).
+    buckets[i]: max konumu sürenin i. dilimine düşen izleyici sayısı.
+    """
+    video = models.OneToOneField(
+        "trainings.OnlineVideo", on_delete=models.CASCADE, primary_key=True,
+        related_name="analytics", verbose_name="Video",
+    )
+    buckets = models.JSONField("Bırakma Histogramı", default=list, blank=True)
+    viewers = models.PositiveIntegerField("İzleyici", default=0)
+    completed = models.PositiveIntegerField("Tamamlayan", default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Video Analitiği"
+        verbose_name_plural = "Video Analitikleri"
+
+    def __str__(self):
+        return f"Analitik: {self.video_id}"
+
+
+# =========================================================
+# 6) KATILIM LİSTESİ İÇE AKTARMA (OCR İnceleme Kuyruğu)
+# =========================================================
+
+class AttendanceImportSession(models.Model):
+    """
+    Bir katılım listesi PDF'inin OCR sonucu ve eşleştirme önerileri.
+    Onaylanana kadar plana/katılımlara hiçbir şey yazılmaz; OCR tekrar gerekmez.
+    """
+    STATUS_CHOICES = (
+        ("pending", "İncelemede"),
+        ("confirmed", "Onaylandı"),
+        ("cancelled", "İptal"),
+    )
+
+    plan = models.ForeignKey(
+        "trainings.TrainingPlan",
+        on_delete=models.CASCADE,
+        related_name="attendance_imports",
+        verbose_name="Plan",
+    )
+    file_name = models.CharField("Dosya", max_length=255, blank=True)
+    file_sha256 = models.CharField("Dosya Özeti", max_length=64, blank=True, db_index=True)
+    lang = models.CharField("OCR Dili", max_length=30, default="tur+eng")
+    min_score = models.FloatField("Eşleşme Alt Skoru", default=0.78)
+    page_texts = models.JSONField("OCR Sayfa Metinleri", default=list, blank=True)
+    status = models.CharField("Durum", max_length=10, choices=STATUS_CHOICES, default="pending")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="attendance_imports",
+        verbose_name="Oluşturan",
+    )
+    confirmed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="confirmed_attendance_imports",
+        verbose_name="Onaylayan",
+    )
+    confirmed_at = models.DateTimeField("Onay", null=True, blank=True)
+    created_at = models.DateTimeField("Oluşturulma", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Katılım İçe Aktarma"
+        verbose_name_plural = "Katılım İçe Aktarmaları"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["plan", "status"])]
+
+    def __str__(self):
+        return f"İçe aktarma #{self.pk} → plan {self.plan_id} ({self.get_status_display()})"
+
+
+class AttendanceImportLine(models.Model):
+    DECISION_CHOICES = (
+        ("pending", "Bekliyor"),
+        ("accepted", "Kabul"),
+        ("rejected", "Red"),
+    )
+
+    session = models.ForeignKey(
+        "trainings.AttendanceImportSession",
+        on_delete=models.CASCADE,
+        related_name="lines",
+        verbose_name="Oturum",
+    )
+    position = models.PositiveIntegerField("Sıra", default=0)
+    extracted = models.CharField("OCR Satırı", max_length=255)
+    # [{"user_id": 5, "label": "Ad Soyad (kullanici)", "score": 0.93}, ...] skora göre azalan
+    suggestions = models.JSONField("Öneriler", default=list, blank=True)
+    score = models.FloatField("Skor", default=0.0)
+    tier = models.CharField("Katman", max_length=10, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="+",
+        verbose_name="Seçilen Kullanıcı",
+    )
+    decision = models.CharField("Karar", max_length=10, choices=DECISION_CHOICES, default="pending")
+
+    class Meta:
+        verbose_name = "Katılım İçe Aktarma Satırı"
+        verbose_name_plural = "Katılım İçe Aktarma Satırları"
+        ordering = ["session", "position"]
+        indexes = [models.Index(fields=["session", "decision"])]
+
+    def __str__(self):
+        return f"{self.extracted} → {self.user_id or '-'} ({self.get_decision_display()})"
+
+
+# =========================================================
+# 7) E-POSTA KUYRUĞU (Outbox)
+# =========================================================
+
+class OutboxMessage(models.Model):
+    """
+    Gönderilecek e-posta. İş kaydıyla aynı transaction içinde yazılır;
+    send_outbox işçisi partiler halinde tek bağlantıyla gönderir.
+    digest=True bildirimler tek tek gitmez: gönderim anı (next_attempt_at)
+    gelince alıcı başına tek özet e-postada birleştirilir.
+    """
+    STATUS_CHOICES = (
+        ("pending", "Bekliyor"),
+        ("sending", "Gönderiliyor"),
+        ("sent", "Gönderildi"),
+        ("failed", "Hatalı"),
+        ("merged", "Özete Eklendi"),
+    )
+
+    kind = models.CharField("Tür", max_length=30, blank=True)
+    key = models.CharField("Tekillik Anahtarı", max_length=120, unique=True, null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="+",
+        verbose_name="Kullanıcı",
+    )
+    to_email = models.EmailField("Alıcı")
+    subject = models.CharField("Konu", max_length=255)
+    body_text = models.TextField("Metin")
+    body_html = models.TextField("HTML", blank=True)
+    digest = models.BooleanField("Günlük Özete Eklenir", default=False)
+    merged_into = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="parts", verbose_name="Özet",
+    )
+
+    status = models.CharField("Durum", max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField("Deneme", default=0)
+    next_attempt_at = models.DateTimeField("Sonraki Deneme", default=timezone.now)
+    last_error = models.TextField("Son Hata", blank=True)
+    created_at = models.DateTimeField("Oluşturulma", default=timezone.now)
+    sent_at = models.DateTimeField("Gönderilme", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Giden E-posta"
+        verbose_name_plural = "Giden E-postalar"
+        indexes = [
+            models.Index(fields=["status", "digest", "next_attempt_at"]),
+            models.Index(fields=["to_email", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email}: {self.subject} ({self.get_status_display()})"
+
+
+# =========================================================
+# 8) ZAMANLAYICI DURUMU
+# =========================================================
+
+class SchedulerWatermark(models.Model):
+    """
+    Periyodik komutların kaldığı yer (ör. escalate_overdue_needs için
+    işlenmiş son hedef tarih ve son çalıştırmanın başlangıcı). Her çalıştırma
+    yalnızca bu noktadan sonrasını ve o zamandan beri değişen kayıtları okur.
+    """
+    name = models.CharField("Ad", max_length=60, unique=True)
+    value = models.DateField("Son İşlenen Tarih", null=True, blank=True)
+    ran_at = models.DateTimeField("Son Çalıştırma", null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Zamanlayıcı Durumu"
+        verbose_name_plural = "Zamanlayıcı Durumları"
+
+    def __str__(self):
+        return f"{self.name}: {self.value or '-'}"
@@ -1,6 +1,9 @@
 from django.urls import path
 from . import views
-from .views_online import online_list, online_watch, online_progress
+from .views_online import online_list, online_watch, online_progress, online_progress_v2, online_video_stream, online_video_hls
+from .views_attendance import attendance_import_review
+from .views_analytics import api_video_dropoff, api_video_funnel, video_analytics_report
+from .views_verify import verify_certificate
 from .views_plans import (
     plans_page,
     visual_plan,
@@ -21,13 +24,28 @@ urlpatterns = [
     path("certs/<int:pk>/", views.download_certificate, name="cert-download"),
     path("whoami/", views.whoami, name="whoami"),
 
+    # Herkese açık sertifika doğrulama (QR)
+    path("verify/<str:serial>/", verify_certificate, name="verify_certificate"),
+    path("verify/<str:serial>/", verify_certificate, name="verify-certificate"),
+
     # Online eğitimler
     path("online/", online_list, name="online"),
     path("online/", online_list, name="online-list"),
     path("online/<int:pk>/", online_watch, name="online_watch"),
     path("online/<int:pk>/", online_watch, name="online-watch"),
+    path("online/<int:pk>/stream/", online_video_stream, name="online_video_stream"),
+    path("online/<int:pk>/stream/", online_video_stream, name="online-video-stream"),
+    path("online/<int:pk>/hls/<path:name>", online_video_hls, name="online_video_hls"),
+    path("online/<int:pk>/hls/<path:name>", online_video_hls, name="online-video-hls"),
     path("online/<int:pk>/progress/", online_progress, name="online_progress"),
     path("online/<int:pk>/progress/", online_progress, name="online-progress"),
+    path("online/<int:pk>/progress/v2/", online_progress_v2, name="online_progress_v2"),
+    path("online/<int:pk>/progress/v2/", online_progress_v2, name="online-progress-v2"),
+
+    # Online video izlenme raporları (staff)
+    path("online/analytics/", video_analytics_report, name="video_analytics_report"),
+    path("api/online/funnel/", api_video_funnel, name="api_video_funnel"),
+    path("api/online/<int:pk>/dropoff/", api_video_dropoff, name="api_video_dropoff"),
 
     # Eğitim Planları
     path("plans/", plans_page, name="plans_page"),
@@ -39,6 +57,9 @@ urlpatterns = [
     path("api/plan-search/", api_plan_search, name="api_plan_search"),
     path("api/calendar-year/", api_calendar_year, name="api_calendar_year"),
 
+    # OCR katılım listesi inceleme kuyruğu (staff)
+    path("attendance/imports/<int:pk>/", attendance_import_review, name="attendance_import_review"),
+
     # Katılımcı yönetimi (AJAX)
     path("api/plans/<int:pk>/attendees/", api_plan_attendees, name="api_plan_attendees"),
     path("api/plans/<int:pk>/attendees/add/", api_plan_attendee_add, name="api_plan_attendee_add"),
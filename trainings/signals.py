@@ -1,11 +1,16 @@
 # trainings/signals.py
-from django.db.models.signals import post_save, post_migrate
-from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import Signal, receiver
 from django.apps import apps
+from django.contrib.auth import get_user_model
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sinyal tetiklemeyen toplu Enrollment yazımları (QuerySet.update / bulk_create)
+# yazan transaction içinde bunu gönderir; argümanlar: training_id, user_ids
+enrollments_bulk_changed = Signal()
+
 def M(name: str):
     try:
         return apps.get_model("trainings", name)
@@ -89,7 +94,69 @@ if TrainingRequirement and JobRoleAssignment and JobRole:
             logger.exception("TrainingRequirement post_save hata: %s", e)
 
 
-# 3) Migrasyonlardan sonra güvenli backfill (ilk kurulumda boş kalmasın)
+# 3) Kullanıcı adı değişince katılım eşleştirme indeksini sıfırla
+try:
+    from .utils.name_index import invalidate_user_index
+except Exception as e:
+    invalidate_user_index = None
+    logger.exception("utils.name_index import edilemedi: %s", e)
+
+if invalidate_user_index:
+    @receiver(post_save, sender=get_user_model())
+    def on_user_saved(sender, instance, created, update_fields=None, **kwargs):
+        # Girişte yalnızca last_login güncellenir; isim indeksi etkilenmez
+        if update_fields and set(update_fields) <= {"last_login"}:
+            return
+        invalidate_user_index()
+
+    @receiver(post_delete, sender=get_user_model())
+    def on_user_deleted(sender, instance, **kwargs):
+        invalidate_user_index()
+
+
+# 4) Video süresi/aktifliği değişince ilerleme tamponunun video önbelleğini
+#    ve online_list kataloğunu sıfırla
+OnlineVideo = M("OnlineVideo")
+if OnlineVideo:
+    @receiver(post_save, sender=OnlineVideo)
+    @receiver(post_delete, sender=OnlineVideo)
+    def on_online_video_changed(sender, instance, **kwargs):
+        from .utils.progress_buffer import invalidate_video_meta
+        from .utils.video_catalog import invalidate_catalog
+        invalidate_video_meta(instance.pk)
+        invalidate_catalog()
+
+    # Katalog eğitim başlığını da taşır
+    @receiver(post_save, sender=M("Training"))
+    def on_training_saved_catalog(sender, instance, **kwargs):
+        from .utils.video_catalog import invalidate_catalog
+        invalidate_catalog()
+
+
+# 5) Katılım tamamlanınca sertifika PDF'i kuyruğa alınır (generate_certificates üretir)
+Enrollment = M("Enrollment")
+if Enrollment:
+    @receiver(post_save, sender=Enrollment)
+    def on_enrollment_completed(sender, instance, update_fields=None, **kwargs):
+        if instance.status != "completed":
+            return
+        if update_fields and "status" not in update_fields:
+            return
+        from .utils.certificates import enqueue_certificate
+        enqueue_certificate(instance.user_id, instance.training_id)
+
+
+# Doğrulama LRU'su (/verify/) değişen ya da silinen seriyi düşürür
+Certificate = M("Certificate")
+if Certificate:
+    @receiver(post_save, sender=Certificate)
+    @receiver(post_delete, sender=Certificate)
+    def on_certificate_changed(sender, instance, **kwargs):
+        from .utils.cert_verify import invalidate
+        invalidate(instance.serial)
+
+
+# 6) Migrasyonlardan sonra güvenli backfill (ilk kurulumda boş kalmasın)
 @receiver(post_migrate)
 def on_post_migrate(sender, app_config, **kwargs):
     try:
@@ -1,3 +1,782 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import datetime, time, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    AttendanceImportLine, AttendanceImportSession, Certificate, Enrollment, OnlineVideo, OutboxMessage,
+    Training, TrainingNeed, TrainingPlan, TrainingPlanAttendee, TrainingReminderLog, VideoProgress,
+)
+from .utils import byteserve, cert_verify, certificate_pdf, certificates, outbox, progress_buffer, reminders
+from .utils.coverage import MAX_INTERVALS, Coverage, parse_intervals
+from .utils.attendance_ocr import confirm_session
+from .utils.escalation import escalate_overdue
+from .views_online import online_progress, online_progress_v2, online_video_stream
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="trainings-tests-")
+
+
+def _body(resp) -> bytes:
+    try:
+        return b"".join(resp.streaming_content) if resp.streaming else resp.content
+    finally:
+        resp.close()
+
+
+# -------- Video sunumu (byteserve) --------
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE=None)
+class ByteServeTests(TestCase):
+    DATA = bytes(range(256)) * 4  # 1024 bayt
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, "videos"), exist_ok=True)
+        cls.path = os.path.join(MEDIA_ROOT, "videos", "test.mp4")
+        with open(cls.path, "wb") as f:
+            f.write(cls.DATA)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("izleyici", password="x")
+        training = Training.objects.create(title="Video eğitimi")
+        cls.video = OnlineVideo.objects.create(training=training, video="videos/test.mp4", duration_seconds=60)
+
+    def setUp(self):
+        self.rf = RequestFactory()
+
+    def _serve(self, **headers):
+        return byteserve.serve_file(self.rf.get("/", **headers), self.path, content_type="video/mp4")
+
+    def test_full_response(self):
+        resp = self._serve()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Length"], str(len(self.DATA)))
+        self.assertEqual(resp["Accept-Ranges"], "bytes")
+        self.assertTrue(resp["ETag"])
+        self.assertEqual(_body(resp), self.DATA)
+
+    def test_range(self):
+        resp = self._serve(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp["Content-Range"], f"bytes 10-19/{len(self.DATA)}")
+        self.assertEqual(resp["Content-Length"], "10")
+        self.assertEqual(_body(resp), self.DATA[10:20])
+
+    def test_suffix_range(self):
+        resp = self._serve(HTTP_RANGE="bytes=-100")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp["Content-Range"], f"bytes 924-1023/{len(self.DATA)}")
+        self.assertEqual(_body(resp), self.DATA[-100:])
+
+    def test_open_ended_range(self):
+        resp = self._serve(HTTP_RANGE="bytes=1000-")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp["Content-Range"], f"bytes 1000-1023/{len(self.DATA)}")
+        self.assertEqual(_body(resp), self.DATA[1000:])
+
+    def test_unsatisfiable_range(self):
+        resp = self._serve(HTTP_RANGE="bytes=5000-")
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp["Content-Range"], f"bytes */{len(self.DATA)}")
+
+    def test_if_none_match(self):
+        etag = self._serve()["ETag"]
+        resp = self._serve(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_stale_if_range_sends_full_file(self):
+        resp = self._serve(HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"eski"')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(_body(resp), self.DATA)
+
+    def test_fresh_if_range(self):
+        etag = self._serve()["ETag"]
+        resp = self._serve(HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE=etag)
+        self.assertEqual(resp.status_code, 206)
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_x_sendfile(self):
+        resp = self._serve(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["X-Sendfile"], self.path)
+        self.assertEqual(resp.content, b"")
+
+    @override_settings(MEDIA_SENDFILE="x-accel-redirect", MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/")
+    def test_x_accel_redirect(self):
+        resp = self._serve()
+        self.assertEqual(resp["X-Accel-Redirect"], "/protected-media/videos/test.mp4")
+        self.assertEqual(resp.content, b"")
+
+    @override_settings(MEDIA_SENDFILE="x-accel-redirect")
+    def test_x_accel_redirect_outside_media_root_streams(self):
+        fd, other = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"disarida")
+        try:
+            resp = byteserve.serve_file(self.rf.get("/"), other)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn("X-Accel-Redirect", resp)
+            self.assertEqual(_body(resp), b"disarida")
+        finally:
+            os.remove(other)
+
+    def test_view_range_and_head(self):
+        req = self.rf.get("/", HTTP_RANGE="bytes=10-19")
+        req.user = self.user
+        resp = online_video_stream(req, self.video.pk)
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(_body(resp), self.DATA[10:20])
+
+        req = self.rf.head("/")
+        req.user = self.user
+        resp = online_video_stream(req, self.video.pk)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Length"], str(len(self.DATA)))
+        resp.close()
+
+
+# -------- Giden e-posta kuyruğu (outbox) --------
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise OSError("SMTP bağlantısı koptu")
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class OutboxTests(TestCase):
+    def _send(self, *args):
+        call_command("send_outbox", "--rate", "0", *args, stdout=StringIO())
+
+    def test_enqueue_dedupes_by_key(self):
+        self.assertEqual(outbox.enqueue("a@example.com", "Konu", "Metin", key="k1"), 1)
+        outbox.enqueue("a@example.com", "Konu", "Metin", key="k1")
+        outbox.enqueue("a@example.com", "Konu", "Metin", key="k2")
+        self.assertEqual(OutboxMessage.objects.filter(key="k1").count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+    def test_enqueue_skips_empty_address(self):
+        self.assertEqual(outbox.enqueue("", "Konu", "Metin"), 0)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_send_outbox_sends(self):
+        outbox.enqueue("a@example.com", "Merhaba", "Metin", body_html="<p>Metin</p>")
+        self._send()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["a@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "Merhaba")
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>Metin</p>")
+        msg = OutboxMessage.objects.get()
+        self.assertEqual(msg.status, "sent")
+        self.assertEqual(msg.attempts, 1)
+        self.assertIsNotNone(msg.sent_at)
+
+    @override_settings(EMAIL_BACKEND="trainings.tests.FailingEmailBackend")
+    def test_failure_backs_off_then_fails(self):
+        outbox.enqueue("a@example.com", "Konu", "Metin")
+        before = timezone.now()
+        self._send("--max-attempts", "2")
+        msg = OutboxMessage.objects.get()
+        self.assertEqual(msg.status, "pending")
+        self.assertEqual(msg.attempts, 1)
+        self.assertIn("SMTP", msg.last_error)
+        self.assertGreaterEqual(msg.next_attempt_at, before + outbox.backoff(1))
+
+        # Geri çekilme dolmadan yeniden denenmez
+        self._send("--max-attempts", "2")
+        self.assertEqual(OutboxMessage.objects.get().attempts, 1)
+
+        OutboxMessage.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self._send("--max-attempts", "2")
+        msg = OutboxMessage.objects.get()
+        self.assertEqual(msg.status, "failed")
+        self.assertEqual(msg.attempts, 2)
+
+    def test_merge_digests(self):
+        now = timezone.now()
+        for i in (1, 2):
+            outbox.enqueue("a@example.com", f"Bildirim {i}", f"Metin {i}", digest=True, send_at=now)
+        outbox.enqueue("b@example.com", "Tek bildirim", "Yalnız", digest=True, send_at=now)
+        outbox.enqueue("c@example.com", "Yarın", "Sonra", digest=True, send_at=now + timedelta(hours=1))
+
+        self.assertEqual(outbox.merge_digests(now), 1)
+        self._send()
+
+        by_to = {m.to[0]: m for m in mail.outbox}
+        self.assertEqual(sorted(by_to), ["a@example.com", "b@example.com"])
+        self.assertEqual(by_to["a@example.com"].subject, "Günlük özet: 2 bildirim")
+        self.assertIn("Bildirim 1", by_to["a@example.com"].body)
+        self.assertIn("Bildirim 2", by_to["a@example.com"].body)
+        self.assertEqual(by_to["b@example.com"].subject, "Tek bildirim")
+        self.assertEqual(by_to["b@example.com"].body, "Yalnız")
+
+        digest = OutboxMessage.objects.get(kind="digest")
+        self.assertEqual(digest.status, "sent")
+        self.assertEqual(
+            list(OutboxMessage.objects.filter(to_email="a@example.com", digest=True).values_list("status", flat=True)),
+            ["merged", "merged"],
+        )
+        self.assertEqual(OutboxMessage.objects.get(to_email="c@example.com").status, "pending")
+
+
+# -------- OCR katılım listesi onayı --------
+class AttendanceConfirmTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("yonetici", is_staff=True)
+        cls.users = [User.objects.create_user(f"katilimci{i}") for i in range(4)]
+        cls.training = Training.objects.create(title="Yangın eğitimi")
+        now = timezone.now()
+        cls.plan = TrainingPlan.objects.create(
+            training=cls.training, start_datetime=now, end_datetime=now + timedelta(hours=2)
+        )
+
+    def _session(self, decided=True):
+        session = AttendanceImportSession.objects.create(plan=self.plan)
+        for i, u in enumerate(self.users):
+            AttendanceImportLine.objects.create(
+                session=session, position=i + 1, extracted=u.username,
+                suggestions=[{"user_id": u.pk, "label": u.username, "score": 0.9}],
+                user=u if decided else None, decision="accepted" if decided else "pending",
+            )
+        return session
+
+    def test_confirm_skips_cancelled_and_counts_only_changed(self):
+        u = self.users
+        Enrollment.objects.create(user=u[0], training=self.training, status="cancelled")
+        Enrollment.objects.create(user=u[1], training=self.training, status="completed",
+                                  is_passed=True, completed_at=timezone.now())
+        Enrollment.objects.create(user=u[2], training=self.training)
+
+        added, completed = confirm_session(self._session())
+
+        self.assertEqual(added, 4)
+        self.assertEqual(completed, 2)  # u[2] güncellendi, u[3] oluşturuldu
+        status = dict(Enrollment.objects.filter(training=self.training).values_list("user_id", "status"))
+        self.assertEqual(status[u[0].pk], "cancelled")
+        self.assertEqual(status[u[2].pk], "completed")
+        self.assertEqual(status[u[3].pk], "completed")
+
+    def test_accept_rejects_user_outside_suggestions(self):
+        session = self._session(decided=False)
+        line = session.lines.get(position=1)
+        self.client.force_login(self.staff)
+        url = reverse("attendance_import_review", args=[session.pk])
+
+        self.client.post(url, {"action": "accept", "line": [line.pk], f"user_{line.pk}": "999999"})
+        line.refresh_from_db()
+        self.assertEqual(line.decision, "pending")
+        self.assertIsNone(line.user_id)
+
+        self.client.post(url, {"action": "accept", "line": [line.pk], f"user_{line.pk}": str(self.users[0].pk)})
+        line.refresh_from_db()
+        self.assertEqual(line.decision, "accepted")
+        self.assertEqual(line.user_id, self.users[0].pk)
+
+
+# -------- İzlenen aralıklar (coverage) --------
+class CoverageTests(SimpleTestCase):
+    def test_add_merges_overlapping_and_touching(self):
+        cov = Coverage()
+        cov.add(10, 20)
+        cov.add(30, 40)
+        cov.add(15, 25)
+        self.assertEqual(cov.intervals(), [(10, 25), (30, 40)])
+        cov.add(25, 30)  # uç uca değer
+        self.assertEqual(cov.intervals(), [(10, 40)])
+        self.assertEqual(cov.covered(), 30)
+
+    def test_gap_is_not_credited(self):
+        cov = Coverage([(0, 10), (11, 20)])
+        self.assertEqual(cov.intervals(), [(0, 10), (11, 20)])
+        self.assertEqual(cov.covered(), 19)
+
+    def test_rounds_outward_to_whole_seconds(self):
+        cov = Coverage()
+        cov.add(0.9, 1.1)
+        self.assertEqual(cov.intervals(), [(0, 2)])
+        cov.add(5, 5)  # boş aralık
+        cov.add(-3, 0.5)  # negatif kırpılır
+        self.assertEqual(cov.intervals(), [(0, 2)])
+
+    def test_compact_never_increases_covered(self):
+        cov = Coverage()
+        for i in range(MAX_INTERVALS + 5):
+            cov.add(i * 10, i * 10 + 1 + i % 3)
+            before = cov.covered()
+            self.assertLessEqual(len(cov), MAX_INTERVALS)
+        self.assertEqual(len(cov), MAX_INTERVALS)
+        cov.add(1000, 1001)  # en kısa parça düşer
+        self.assertLessEqual(cov.covered(), before + 1)
+        self.assertEqual(cov.covered(), sum(e - s for s, e in cov.intervals()))
+
+    def test_bytes_round_trip(self):
+        cov = Coverage([(0, 5), (7, 70000), (80000, 80001)])
+        data = cov.to_bytes()
+        self.assertEqual(len(data), 3 * 8)
+        self.assertEqual(data[:8], (0).to_bytes(4, "little") + (5).to_bytes(4, "little"))
+        self.assertEqual(Coverage.from_bytes(data).intervals(), cov.intervals())
+        self.assertEqual(Coverage.from_bytes(b"").intervals(), [])
+        self.assertEqual(Coverage.from_bytes(b"\x01\x02\x03").intervals(), [])
+
+    def test_percent(self):
+        cov = Coverage([(0, 45)])
+        self.assertEqual(cov.percent(100), 45)
+        self.assertEqual(cov.percent(0), 0)
+        self.assertEqual(cov.percent(10), 100)
+
+    def test_parse_intervals(self):
+        self.assertEqual(parse_intervals("[[0, 10.04], [5, 200], [50, 40], [-5, 3]]", 100),
+                         [[0.0, 10.0], [5.0, 100.0], [0.0, 3.0]])
+        self.assertEqual(parse_intervals([], 100), [])
+        for bad in ('{"a": 1}', "[[1]]", "[[1, 2, 3]]", '[["x", 2]]', "[" + ",".join(["[0,1]"] * 1001) + "]"):
+            with self.assertRaises(ValueError):
+                parse_intervals(bad, 100)
+
+
+# -------- Video tamamlanma (kapsama eşiği) --------
+class VideoCompletionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("izleyici2")
+        cls.training = Training.objects.create(title="Kapsama eğitimi")
+        cls.video = OnlineVideo.objects.create(training=cls.training, video="videos/x.mp4", duration_seconds=100)
+
+    def setUp(self):
+        self.rf = RequestFactory()
+        progress_buffer.invalidate_video_meta()
+
+    def _v2(self, intervals):
+        req = self.rf.post("/", {"intervals": intervals})
+        req.user = self.user
+        return online_progress_v2(req, self.video.pk)
+
+    def _progress(self, cov, max_position):
+        vp, _ = VideoProgress.objects.get_or_create(user=self.user, video=self.video)
+        vp.max_position_seconds = max_position
+        vp.set_coverage(cov, 100)
+        vp.save()
+        # ileri sarma sınırı geçen süreye bağlı: son kayıt eski olsun
+        VideoProgress.objects.filter(pk=vp.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def test_v2_completes_on_coverage_not_max_position(self):
+        self._progress(Coverage([(0, 30)]), 80)
+        self._v2("[[80, 100]]")
+        vp = VideoProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(vp.max_position_seconds, 100)
+        self.assertEqual(vp.watched_percent, 50)
+        self.assertFalse(vp.completed)
+        self.assertFalse(Enrollment.objects.filter(user=self.user, training=self.training).exists())
+
+        VideoProgress.objects.filter(pk=vp.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self._v2("[[30, 80]]")
+        vp.refresh_from_db()
+        self.assertEqual(vp.watched_percent, 100)
+        self.assertTrue(vp.completed)
+        self.assertEqual(Enrollment.objects.get(user=self.user, training=self.training).status, "completed")
+
+    @override_settings(VIDEO_PROGRESS_BUFFERED=False)
+    def test_v1_completes_on_coverage_not_max_position(self):
+        self._progress(Coverage([(0, 20)]), 88)
+        req = self.rf.post("/", {"position": "93"})
+        req.user = self.user
+        online_progress(req, self.video.pk)
+        vp = VideoProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(vp.max_position_seconds, 93)
+        self.assertFalse(vp.completed)
+
+
+
+# -------- Plan hatırlatmaları --------
+class PickyEmailBackend(LocmemEmailBackend):
+    """Adresinde 'red' geçen mesajı reddeder, 'hata' geçende bağlantı kopar."""
+
+    def send_messages(self, messages):
+        to = messages[0].to[0]
+        if "hata" in to:
+            raise OSError("SMTP bağlantısı koptu")
+        if "red" in to:
+            return 0
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class ReminderDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.training = Training.objects.create(title="Forklift <Operatör> Eğitimi")
+        start = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), time(10)))
+        cls.plan = TrainingPlan.objects.create(training=cls.training, start_datetime=start,
+                                               end_datetime=start + timedelta(hours=3))
+        cls.users = [
+            User.objects.create_user("ali", email="ali@example.com", first_name="Ali", last_name="<b>Veli</b>"),
+            User.objects.create_user("ayse", email="ayse@example.com", first_name="Ayşe", last_name="Kaya & Oğlu"),
+            User.objects.create_user("epostasiz"),
+        ]
+        for u in cls.users:
+            TrainingPlanAttendee.objects.create(plan=cls.plan, user=u)
+
+    def _dispatch(self, **kw):
+        return reminders.dispatch([1], rate=0, **kw)
+
+    def test_rerun_sends_nothing(self):
+        res = self._dispatch()
+        self.assertEqual((res.plans, res.sent, res.skipped_no_email, res.failed), (1, 2, 1, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(TrainingReminderLog.objects.filter(plan=self.plan, days_before=1).count(), 2)
+
+        res = self._dispatch()
+        self.assertEqual((res.plans, res.sent), (1, 0))  # yalnızca e-postasız katılımcı kalır
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_sends_are_not_logged(self):
+        self.users[0].email = "red@example.com"
+        self.users[0].save(update_fields=["email"])
+        self.users[1].email = "hata@example.com"
+        self.users[1].save(update_fields=["email"])
+        with override_settings(EMAIL_BACKEND=f"{__name__}.PickyEmailBackend"):
+            res = self._dispatch()
+        self.assertEqual((res.sent, res.failed), (0, 2))
+        self.assertTrue(any("OSError" in e for e in res.errors))
+        self.assertFalse(TrainingReminderLog.objects.exists())
+
+        # Düzelen adresler sonraki çalıştırmada gönderilir
+        self.users[0].email = "ali@example.com"
+        self.users[0].save(update_fields=["email"])
+        with override_settings(EMAIL_BACKEND=f"{__name__}.PickyEmailBackend"):
+            res = self._dispatch()
+        self.assertEqual((res.sent, res.failed), (1, 1))
+        self.assertEqual(list(TrainingReminderLog.objects.values_list("user_id", flat=True)), [self.users[0].pk])
+
+    def test_name_substitution_and_escaping(self):
+        self._dispatch()
+        by_to = {m.to[0]: m for m in mail.outbox}
+        msg = by_to["ali@example.com"]
+        self.assertIn("Ali <b>Veli</b>", msg.body)
+        self.assertNotIn(reminders.NAME_MARK, msg.body)
+        html = msg.alternatives[0][0]
+        self.assertIn("Ali &lt;b&gt;Veli&lt;/b&gt;", html)
+        self.assertNotIn("<b>Veli</b>", html)
+        self.assertIn("Forklift &lt;Operatör&gt; Eğitimi", html)
+        self.assertIn("Ayşe Kaya &amp; Oğlu", by_to["ayse@example.com"].alternatives[0][0])
+
+
+class ThrottleTests(SimpleTestCase):
+    def test_spaces_batches_by_rate(self):
+        now, slept = [100.0], []
+
+        def sleep(sec):
+            slept.append(sec)
+            now[0] += sec
+
+        throttle = reminders.Throttle(10, clock=lambda: now[0], sleep=sleep)
+        throttle.wait(5)   # ilk parti beklemez
+        throttle.wait(5)   # 5 mesaj / 10 msj/sn → 0.5 sn
+        now[0] += 2.0      # yeterince zaman geçti
+        throttle.wait(10)
+        throttle.wait(1)
+        self.assertEqual(slept, [0.5, 1.0])
+
+    def test_zero_rate_never_sleeps(self):
+        throttle = reminders.Throttle(0, clock=lambda: 0.0, sleep=lambda s: self.fail("uyudu"))
+        for _ in range(3):
+            throttle.wait(100)
+
+
+# -------- İhtiyaç eskalasyonu --------
+class NeedEscalationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.manager = User.objects.create_user("mudur", email="mudur@example.com")
+        cls.users = [User.objects.create_user(f"calisan{i}") for i in range(3)]
+        cls.trainings = [Training.objects.create(title=f"Eğitim {i}") for i in range(3)]
+        cls.today = timezone.localdate()
+
+    def _need(self, i, due_days, **kw):
+        return TrainingNeed.objects.create(user=self.users[i], training=self.trainings[i],
+                                           due_date=self.today + timedelta(days=due_days), **kw)
+
+    def test_keeps_status_and_marks_escalated(self):
+        need = self._need(0, -10, status="approved", approved_by=self.manager, priority=3)
+        res = escalate_overdue(today=self.today)
+        self.assertEqual((res.escalated, res.notified), (1, 1))
+        need.refresh_from_db()
+        self.assertEqual(need.status, "approved")
+        self.assertEqual(need.priority, 2)
+        self.assertIsNotNone(need.escalated_at)
+        self.assertEqual(escalate_overdue(today=self.today).escalated, 0)
+
+    def test_backdated_and_moved_needs_behind_watermark(self):
+        self._need(0, -3)
+        moved = self._need(1, 30)
+        escalate_overdue(today=self.today)
+
+        # Watermark (dün) gerisinde kalan hedefler: geriye tarihli yeni kayıt ve öne çekilen hedef
+        self._need(2, -20)
+        moved.due_date = self.today - timedelta(days=5)
+        moved.save()
+        res = escalate_overdue(today=self.today)
+        self.assertEqual(res.escalated, 2)
+        self.assertFalse(TrainingNeed.objects.filter(escalated_at__isnull=True).exists())
+        self.assertEqual(escalate_overdue(today=self.today).escalated, 0)
+
+# -------- Sertifika kuyruğu --------
+class CertificateQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp(prefix="trainings-certs-")
+        cls._media = override_settings(MEDIA_ROOT=cls.media)
+        cls._media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._media.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.users = [
+            User.objects.create_user(f"sertifika{i}", email=f"s{i}@example.com", first_name="Ayşe", last_name=f"Öz{i}")
+            for i in range(3)
+        ]
+        cls.training = Training.objects.create(title="İş güvenliği")
+
+    def _enqueue(self):
+        return certificates.enqueue_certificates((u.pk, self.training.pk) for u in self.users)
+
+    def test_enqueue_is_idempotent(self):
+        self.assertEqual(self._enqueue(), 3)
+        self.assertEqual(self._enqueue(), 0)
+        self.assertEqual(Certificate.objects.count(), 3)
+
+    def test_unique_constraint_with_ignore_conflicts(self):
+        self._enqueue()
+        # Varlık kontrolünü atlayan eşzamanlı bir yazıcıyı taklit et
+        Certificate.objects.bulk_create(
+            [Certificate(user=self.users[0], training=self.training, issued_at=timezone.now())],
+            ignore_conflicts=True,
+        )
+        self.assertEqual(Certificate.objects.filter(user=self.users[0]).count(), 1)
+
+    def test_claim_batch_transitions(self):
+        self._enqueue()
+        a, b, c = Certificate.objects.order_by("pk")
+        Certificate.objects.filter(pk=b.pk).update(status="failed", attempts=3)
+        Certificate.objects.filter(pk=c.pk).update(status="failed", attempts=1)
+
+        ids = certificates.claim_batch(10, max_attempts=3)
+        self.assertEqual(sorted(ids), [a.pk, c.pk])
+        rows = {r.pk: r for r in Certificate.objects.all()}
+        self.assertEqual((rows[a.pk].status, rows[a.pk].attempts), ("processing", 1))
+        self.assertEqual((rows[c.pk].status, rows[c.pk].attempts), ("processing", 2))
+        self.assertEqual(rows[b.pk].status, "failed")
+        self.assertIsNotNone(rows[a.pk].started_at)
+        self.assertEqual(certificates.claim_batch(10, max_attempts=3), [])
+
+    def test_build_jobs_assigns_serials_and_avoids_collisions(self):
+        self._enqueue()
+        a, b, c = Certificate.objects.order_by("pk")
+        # Elle girilmiş eski bir seri, b için üretilecek seriyle çakışıyor
+        Certificate.objects.filter(pk=c.pk).update(serial=certificates.make_serial(b))
+        jobs = certificates.build_jobs([a.pk, b.pk])
+        serials = dict(Certificate.objects.values_list("pk", "serial"))
+        self.assertEqual(serials[a.pk], certificates.make_serial(a))
+        self.assertEqual(serials[b.pk], f"{certificates.make_serial(b)}-{b.pk}")
+        job = next(j for j in jobs if j["id"] == a.pk)
+        self.assertEqual(job["serial"], serials[a.pk])
+        self.assertEqual(job["fullname"], "Ayşe Öz0")
+        self.assertIn(f"{serials[a.pk]}/?s=", job["qr"])
+        self.assertTrue(job["path"].startswith(self.media))
+
+    def test_finish_jobs_marks_ready_and_failed(self):
+        self._enqueue()
+        ids = certificates.claim_batch(10, max_attempts=3)
+        jobs = certificates.build_jobs(ids)
+        results = certificates.render_jobs(jobs[:2], workers=1) + [
+            {"id": jobs[2]["id"], "ok": False, "error": "RuntimeError: çizilemedi"}
+        ]
+        ok, bad = certificates.finish_jobs(results, {j["id"]: j["rel"] for j in jobs})
+        self.assertEqual((ok, bad), (2, 1))
+
+        ready = Certificate.objects.filter(status="ready")
+        self.assertEqual(ready.count(), 2)
+        for cert in ready:
+            self.assertTrue(os.path.exists(cert.file.path))
+            self.assertEqual(len(cert.file_sha256), 64)
+            self.assertIsNotNone(cert.generated_at)
+        failed = Certificate.objects.get(status="failed")
+        self.assertIn("çizilemedi", failed.error)
+        self.assertEqual(OutboxMessage.objects.filter(kind="certificate").count(), 2)
+
+    def test_merged_pdf_prints_only_ready(self):
+        self._enqueue()
+        ids = certificates.claim_batch(1, max_attempts=3)
+        jobs = certificates.build_jobs(ids)
+        certificates.finish_jobs(certificates.render_jobs(jobs, workers=1), {j["id"]: j["rel"] for j in jobs})
+        # Biri beklemede, biri hatalı kalır
+        Certificate.objects.filter(pk=Certificate.objects.exclude(pk__in=ids).first().pk).update(status="failed")
+
+        certs = list(Certificate.objects.select_related("user", "training"))
+        self.assertEqual(certificates.not_ready(certs), 2)
+        data = b"".join(certificates.iter_merged_pdf(certs))
+        self.assertEqual(data.count(b"/Type /Page\n"), 1)
+
+
+
+# -------- Sertifika indirme --------
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE=None, CERTIFICATE_MAX_ATTEMPTS=3)
+class CertificateDownloadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user("katilimci", first_name="Işıl", last_name="Güneş")
+        cls.staff = User.objects.create_user("yonetici", is_staff=True)
+        cls.training = Training.objects.create(title="Yangın Güvenliği")
+        cls.cert = Certificate.objects.create(user=cls.user, training=cls.training, issued_at=timezone.now())
+
+    def setUp(self):
+        self.url = reverse("cert-download", args=[self.cert.pk])
+        self.client.force_login(self.user)
+
+    def test_missing_file_returns_202(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp["Retry-After"], "30")
+        self.assertEqual(Certificate.objects.get(pk=self.cert.pk).status, "pending")
+
+    def test_other_users_get_404(self):
+        self.client.force_login(get_user_model().objects.create_user("baskasi"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_exhausted_attempts_return_500(self):
+        Certificate.objects.filter(pk=self.cert.pk).update(status="failed", attempts=3, error="ValueError: glif yok")
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 500)
+        self.assertNotContains(resp, "glif yok", status_code=500)
+
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get(self.url), "glif yok", status_code=500)
+
+        # Hakkı kalan hatalı kayıt yeniden denenmek üzere bekler
+        Certificate.objects.filter(pk=self.cert.pk).update(attempts=1)
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+
+    @override_settings(CERTIFICATE_ON_DEMAND=True)
+    def test_on_demand_render_then_304(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertTrue(_body(resp).startswith(b"%PDF-"))
+        cert = Certificate.objects.get(pk=self.cert.pk)
+        self.assertEqual(cert.status, "ready")
+        self.assertIn(cert.serial, resp["Content-Disposition"])
+
+        etag = resp["ETag"]
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(_body(again), b"")
+        other = self.client.get(self.url, HTTP_IF_NONE_MATCH='"baska"')
+        self.assertEqual(other.status_code, 200)
+        other.close()
+
+# -------- Sertifika PDF --------
+class CertificatePdfTests(SimpleTestCase):
+    def test_merged_pdf_shares_background_form(self):
+        tpl = certificate_pdf.get_template()
+        records = [("Işıl Güneş", "Yangın", "19.10.2026", f"CRT-2026-{i:06d}", f"https://x/verify/{i}/") for i in range(5)]
+        data = b"".join(tpl.iter_merged(records))
+        self.assertTrue(data.startswith(b"%PDF-"))
+        self.assertEqual(data.count(b"/Subtype /Form"), 1)
+        self.assertEqual(data.count(b"/Type /Page\n"), 5)
+
+    def test_render_is_deterministic(self):
+        tpl = certificate_pdf.get_template()
+        args = ("Çağrı Şenol", "İş Güvenliği", "19.10.2026", "CRT-2026-000001", "https://x/verify/1/")
+        self.assertEqual(tpl.render(*args), tpl.render(*args))
+
+    def test_missing_glyphs_fail_loudly(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "c.pdf")
+            res = certificate_pdf.render_job({"id": 7, "path": path, "fullname": "Ёж", "title": "T", "date": "d"})
+            self.assertFalse(res["ok"])
+            self.assertIn("Ёж", res["error"])
+            self.assertFalse(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            certificate_pdf.get_template(chars="Жук")
+
+
+# -------- Sertifika doğrulama --------
+class CertificateVerifyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user("dogrulama", first_name="Şule", last_name="Güç")
+        training = Training.objects.create(title="İlk Yardım")
+        cls.cert = Certificate.objects.create(user=user, training=training, issued_at=timezone.now(),
+                                              serial="CRT-2026-000042", status="ready")
+
+    def setUp(self):
+        cache.clear()
+        cert_verify.invalidate()
+
+    def _get(self, serial, sig=None):
+        url = reverse("verify_certificate", args=[serial])
+        return self.client.get(url, {"s": sig} if sig is not None else {})
+
+    def test_signed_link_shows_full_name(self):
+        resp = self._get(self.cert.serial, cert_verify.sign_serial(self.cert.serial))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.context["signed"])
+        self.assertEqual(resp.context["holder"], "Şule Güç")
+
+    def test_unsigned_or_forged_link_masks_name(self):
+        for sig in (None, "bozuk-imza"):
+            resp = self._get(self.cert.serial.lower(), sig)
+            self.assertEqual(resp.status_code, 200)
+            self.assertFalse(resp.context["signed"])
+            self.assertEqual(resp.context["holder"], "Ş*** G***")
+            self.assertNotContains(resp, "Şule Güç")
+
+    def test_pending_and_failed_serials_are_not_verifiable(self):
+        for status in ("pending", "processing", "failed"):
+            Certificate.objects.filter(pk=self.cert.pk).update(status=status)
+            cert_verify.invalidate()
+            resp = self._get(self.cert.serial, cert_verify.sign_serial(self.cert.serial))
+            self.assertEqual(resp.status_code, 404, status)
+
+    @override_settings(CERTIFICATE_VERIFY_RATE=(3, 60))
+    def test_rate_limit_returns_429(self):
+        codes = [self._get(self.cert.serial).status_code for _ in range(4)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+        resp = self._get(self.cert.serial)
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp["Retry-After"], "60")
+        # Başka IP etkilenmez
+        other = self.client.get(reverse("verify_certificate", args=[self.cert.serial]), REMOTE_ADDR="10.0.0.9")
+        self.assertEqual(other.status_code, 200)
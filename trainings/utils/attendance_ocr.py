@@ -3,12 +3,18 @@ from __future__ import annotations
 
 import re
 import unicodedata
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Tuple, Iterable, Optional
 
 from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .name_index import NameIndex, get_user_index
+from .ocr_cache import cached_ocr_pages
+from .ocr_pipeline import DEFAULT_DPI, ocr_pages
+
 User = get_user_model()
 
 def M(name: str):
@@ -19,19 +25,12 @@ def M(name: str):
 
 TrainingPlan = M("TrainingPlan")
 TrainingPlanAttendee = M("TrainingPlanAttendee")
-
-# -------- OCR Bağımlılıklarını isteğe bağlı import (uygun hata iletisi) --------
-def _require_ocr():
-    try:
-        from pdf2image import convert_from_path  # noqa
-        import pytesseract  # noqa
-        from PIL import Image, ImageFilter, ImageOps  # noqa
-    except Exception as e:
-        raise RuntimeError(
-            "OCR için 'pytesseract', 'pdf2image' ve 'Pillow' gerekli.\n"
-            "Ayrıca sistemde Tesseract kurulu olmalı (lang: tur + eng).\n"
-            f"Detay: {e}"
-        )
+AttendanceImportSession = M("AttendanceImportSession")
+AttendanceImportLine = M("AttendanceImportLine")
+Enrollment = M("Enrollment")
+TrainingNeed = M("TrainingNeed")
+TrainingRequirement = M("TrainingRequirement")
+JobRoleAssignment = M("JobRoleAssignment")
 
 # -------- Yardımcılar --------
 def _normalize(s: str) -> str:
@@ -69,24 +68,27 @@ def _split_lines(text: str) -> List[str]:
     return lines
 
 # -------- OCR Çekirdeği --------
-def ocr_pdf_to_texts(pdf_path: str, lang: str = "tur+eng") -> List[str]:
-    """PDF'i sayfa sayfa OCR edip metin listesi döndürür."""
-    _require_ocr()
-    from pdf2image import convert_from_path
-    import pytesseract
-    from PIL import Image, ImageFilter, ImageOps
-
-    pages = convert_from_path(pdf_path, dpi=300)
-    texts = []
-    for img in pages:
-        # Basit ön işleme: gri, kontrast, threshold, hafif blur
-        g = ImageOps.grayscale(img)
-        g = g.filter(ImageFilter.MedianFilter(size=3))
-        # adaptive threshold benzeri:
-        g = ImageOps.autocontrast(g)
-        text = pytesseract.image_to_string(g, lang=lang)
-        texts.append(text or "")
-    return texts
+def ocr_pdf_to_texts(
+    pdf_path: str,
+    lang: str = "tur+eng",
+    workers: Optional[int] = 1,
+    dpi: int = DEFAULT_DPI,
+    chunk_size: int = 2,
+    use_cache: bool = True,
+) -> List[str]:
+    """
+    PDF'i sayfa sayfa OCR edip metin listesi döndürür (sayfa sırasıyla).
+    Sayfalar tembel rasterize edilir (geçici klasör, 'chunk_size' sayfalık
+    aralıklar); workers > 1 ise aralıklar süreç havuzunda paralel işlenir.
+    use_cache=True ise aynı içerikli PDF için sayfa metinleri diskten okunur.
+    """
+    def run(pages=None):
+        return ocr_pages(pdf_path, lang=lang, dpi=dpi, workers=workers,
+                         chunk_size=chunk_size, pages=pages)
+
+    if not use_cache:
+        return run()
+    return cached_ocr_pages(pdf_path, lang=lang, dpi=dpi, ocr_fn=run)
 
 def extract_name_candidates(texts: Iterable[str]) -> List[str]:
     """OCR metinlerinden muhtemel isim satırlarını çıkarır."""
@@ -114,6 +116,10 @@ class MatchResult:
     extracted: str
     user: Optional[User]
     score: float
+    # En iyi k öneri: [(user, skor), ...] (skora göre azalan)
+    candidates: List[Tuple[User, float]] = field(default_factory=list)
+    # Eşleşmenin geldiği katman: "plan" (beklenen katılımcılar) / "global"
+    tier: str = "global"
 
 def _user_display_name(u: User) -> str:
     parts = []
@@ -126,30 +132,109 @@ def _user_display_name(u: User) -> str:
         parts.append(getattr(u, "username", "") or "")
     return _normalize(" ".join(p for p in parts if p))
 
-def _ratio(a: str, b: str) -> float:
-    # Basit difflib benzeri skor (0..1)
-    from difflib import SequenceMatcher
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+def build_user_index(users=None) -> NameIndex:
+    """Verilen (veya tüm) kullanıcılardan isim indeksi kurar."""
+    if users is None:
+        users = User.objects.only("id", "username", "first_name", "last_name").iterator()
+    return NameIndex((_user_display_name(u), u) for u in users)
 
-def match_names_to_users(candidates: List[str], min_score: float = 0.75) -> List[MatchResult]:
-    users = list(User.objects.all())
-    user_keys = [(_user_display_name(u), u) for u in users]
+def match_names_to_users(
+    candidates: List[str],
+    min_score: float = 0.75,
+    top_k: int = 5,
+    index: Optional[NameIndex] = None,
+) -> List[MatchResult]:
+    """
+    Her aday satırı için n-gram indeksinden kısa liste alır, SequenceMatcher
+    ile puanlar ve en iyi 'top_k' öneriyi döndürür. index verilmezse tüm
+    kullanıcılar için süreç içi önbellekli indeks kullanılır.
+    """
+    if index is None:
+        index = get_user_index(build_user_index)
 
     results: List[MatchResult] = []
     for ext in candidates:
-        ext_n = _normalize(ext)
-        best = (None, 0.0, None)  # (user, score, key)
-        for key, u in user_keys:
-            if not key:
-                continue
-            sc = _ratio(ext_n, key)
-            if sc > best[1]:
-                best = (u, sc, key)
-        u, sc, _ = best
+        top = index.search(_normalize(ext), k=top_k)
+        u, sc = top[0] if top else (None, 0.0)
         if u and sc >= min_score:
-            results.append(MatchResult(extracted=ext, user=u, score=sc))
+            results.append(MatchResult(extracted=ext, user=u, score=sc, candidates=top))
         else:
-            results.append(MatchResult(extracted=ext, user=None, score=sc))
+            results.append(MatchResult(extracted=ext, user=None, score=sc, candidates=top))
+    return results
+
+def plan_population_user_ids(plan) -> set:
+    """
+    Planın muhtemel katılımcıları (birkaç küme sorgusuyla):
+      - plana eklenmiş katılımcılar
+      - planın eğitimine kayıtlı (iptal edilmemiş) kullanıcılar
+      - bu eğitim için açık TrainingNeed'i olanlar
+      - bu eğitimi zorunlu kılan aktif görevlerin sahipleri
+    """
+    ids = set()
+    if TrainingPlanAttendee:
+        ids.update(TrainingPlanAttendee.objects.filter(plan=plan).values_list("user_id", flat=True))
+    training_id = getattr(plan, "training_id", None)
+    if not training_id:
+        return ids
+    if Enrollment:
+        ids.update(
+            Enrollment.objects.filter(training_id=training_id)
+            .exclude(status="cancelled")
+            .values_list("user_id", flat=True)
+        )
+    if TrainingNeed:
+        ids.update(
+            TrainingNeed.objects.filter(training_id=training_id, is_open=True)
+            .values_list("user_id", flat=True)
+        )
+    if TrainingRequirement and JobRoleAssignment:
+        role_ids = (
+            TrainingRequirement.objects.filter(training_id=training_id, is_active=True)
+            .values("job_role_id")
+        )
+        ids.update(
+            JobRoleAssignment.objects.filter(job_role_id__in=role_ids, is_active=True)
+            .values_list("user_id", flat=True)
+        )
+    return ids
+
+def match_names_for_plan(
+    plan_id: int,
+    candidates: List[str],
+    min_score: float = 0.75,
+    top_k: int = 5,
+) -> List[MatchResult]:
+    """
+    Katmanlı eşleştirme: önce planın beklenen katılımcı kümesi, yalnızca
+    orada 'min_score' altında kalan satırlar için tüm kullanıcı indeksi.
+    """
+    if TrainingPlan is None:
+        raise RuntimeError("TrainingPlan modeli bulunamadı.")
+    try:
+        plan = TrainingPlan.objects.get(pk=plan_id)
+    except TrainingPlan.DoesNotExist:
+        raise RuntimeError(f"Plan #{plan_id} bulunamadı.")
+
+    results: List[Optional[MatchResult]] = [None] * len(candidates)
+    pending = list(range(len(candidates)))
+
+    pop_ids = plan_population_user_ids(plan)
+    if pop_ids:
+        pop_users = User.objects.filter(pk__in=pop_ids).only("id", "username", "first_name", "last_name")
+        local = match_names_to_users(candidates, min_score=min_score, top_k=top_k,
+                                     index=build_user_index(pop_users))
+        pending = []
+        for i, m in enumerate(local):
+            if m.user is not None:
+                m.tier = "plan"
+                results[i] = m
+            else:
+                pending.append(i)
+
+    if pending:
+        rest = match_names_to_users([candidates[i] for i in pending], min_score=min_score, top_k=top_k)
+        for i, m in zip(pending, rest):
+            results[i] = m
     return results
 
 # -------- İçe Aktarma --------
@@ -184,3 +269,129 @@ def add_attendees_to_plan(plan_id: int, matches: List[MatchResult]) -> Tuple[int
     if bulk:
         TrainingPlanAttendee.objects.bulk_create(bulk, ignore_conflicts=True)
     return add, skip
+
+
+# -------- İnceleme Kuyruğu (OCR bir kez, onay toplu) --------
+def _suggestion_rows(m: MatchResult) -> List[dict]:
+    return [
+        {"user_id": u.pk, "label": f"{_user_display_name(u)} ({u.get_username()})", "score": round(sc, 4)}
+        for u, sc in m.candidates
+    ]
+
+def _lines_for(session, texts: List[str]) -> list:
+    cands = extract_name_candidates(texts)
+    matches = match_names_for_plan(session.plan_id, cands, min_score=session.min_score)
+    lines = []
+    for i, m in enumerate(matches):
+        lines.append(AttendanceImportLine(
+            session=session,
+            position=i,
+            extracted=m.extracted[:255],
+            suggestions=_suggestion_rows(m),
+            score=m.score,
+            tier=m.tier if m.user else "",
+            user=m.user,
+            # Eşik üstü eşleşmeler ön-kabul; gerisi insan incelemesine kalır
+            decision="accepted" if m.user else "pending",
+        ))
+    return lines
+
+@transaction.atomic
+def create_import_session(
+    plan_id: int,
+    texts: List[str],
+    min_score: float = 0.78,
+    lang: str = "tur+eng",
+    file_name: str = "",
+    file_sha256: str = "",
+    created_by=None,
+):
+    """OCR metinlerini ve eşleştirme önerilerini bir inceleme oturumuna kaydeder."""
+    if AttendanceImportSession is None or AttendanceImportLine is None:
+        raise RuntimeError("AttendanceImportSession/AttendanceImportLine modelleri bulunamadı.")
+    if not TrainingPlan.objects.filter(pk=plan_id).exists():
+        raise RuntimeError(f"Plan #{plan_id} bulunamadı.")
+    session = AttendanceImportSession.objects.create(
+        plan_id=plan_id,
+        file_name=file_name[:255],
+        file_sha256=file_sha256,
+        lang=lang,
+        min_score=min_score,
+        page_texts=list(texts),
+        created_by=created_by,
+    )
+    AttendanceImportLine.objects.bulk_create(_lines_for(session, texts))
+    return session
+
+@transaction.atomic
+def rematch_session(session, min_score: Optional[float] = None) -> int:
+    """Kayıtlı OCR metinlerinden eşleştirmeyi yeniden yapar (OCR yok). Dönüş: satır sayısı."""
+    if session.status != "pending":
+        raise RuntimeError("Yalnızca incelemedeki oturumlar yeniden eşleştirilebilir.")
+    if min_score is not None:
+        session.min_score = min_score
+        session.save(update_fields=["min_score"])
+    session.lines.all().delete()
+    lines = _lines_for(session, session.page_texts or [])
+    AttendanceImportLine.objects.bulk_create(lines)
+    return len(lines)
+
+@transaction.atomic
+def confirm_session(session, user=None, complete_enrollments: bool = True) -> Tuple[int, int]:
+    """
+    Kabul edilen satırları tek işlemde uygular:
+      - TrainingPlanAttendee bulk_create (ignore_conflicts)
+      - (isteğe bağlı) eğitimin Enrollment kayıtlarını toplu 'completed' yap,
+        olmayanları bulk_create ile tamamlanmış olarak oluştur
+    Dönüş: (eklenen_katılımcı, tamamlanan_katılım)
+    """
+    session = AttendanceImportSession.objects.select_for_update().select_related("plan").get(pk=session.pk)
+    if session.status != "pending":
+        raise RuntimeError(f"Oturum #{session.pk} zaten {session.get_status_display()}.")
+    plan = session.plan
+
+    user_ids = set(
+        session.lines.filter(decision="accepted", user__isnull=False).values_list("user_id", flat=True)
+    )
+    existing = set(
+        TrainingPlanAttendee.objects.filter(plan=plan, user_id__in=user_ids).values_list("user_id", flat=True)
+    )
+    new_ids = user_ids - existing
+    TrainingPlanAttendee.objects.bulk_create(
+        [TrainingPlanAttendee(plan=plan, user_id=uid) for uid in sorted(new_ids)],
+        ignore_conflicts=True,
+    )
+
+    completed = 0
+    if complete_enrollments and Enrollment and user_ids and plan.training_id:
+        when = getattr(plan, "end_datetime", None) or timezone.now()
+        qs = Enrollment.objects.filter(training_id=plan.training_id, user_id__in=user_ids)
+        enrolled = set(qs.values_list("user_id", flat=True))
+        # İptal edilmiş katılımlara dokunulmaz; zaten tamamlanmış olanlar sayılmaz
+        active = qs.exclude(status="cancelled")
+        todo = Enrollment.objects.filter(pk__in=list(
+            active.exclude(status="completed", is_passed=True, completed_at__isnull=False).values_list("pk", flat=True)
+        ))
+        todo.filter(completed_at__isnull=True).update(completed_at=when)
+        completed = todo.update(status="completed", is_passed=True)
+        missing = user_ids - enrolled
+        Enrollment.objects.bulk_create([
+            Enrollment(user_id=uid, training_id=plan.training_id, status="completed",
+                       is_passed=True, completed_at=when)
+            for uid in sorted(missing)
+        ])
+        completed += len(missing)
+        # Toplu güncellemeler sinyal tetiklemez: sertifikaları doğrudan kuyruğa al
+        # ve bağımlılara (ör. vekalet uyum raporu) aynı transaction içinde bildir
+        from ..signals import enrollments_bulk_changed
+        from .certificates import enqueue_certificates
+        done_ids = set(active.values_list("user_id", flat=True)) | missing
+        enqueue_certificates((uid, plan.training_id) for uid in sorted(done_ids))
+        if completed:
+            enrollments_bulk_changed.send(sender=Enrollment, training_id=plan.training_id, user_ids=sorted(done_ids))
+
+    session.status = "confirmed"
+    session.confirmed_by = user
+    session.confirmed_at = timezone.now()
+    session.save(update_fields=["status", "confirmed_by", "confirmed_at"])
+    return len(new_ids), completed
@@ -0,0 +1,211 @@
+# trainings/utils/byteserve.py
+"""
+Korumalı dosya sunumu: ETag/If-None-Match, Range/If-Range (206) ve
+ön sunucuya devretme (X-Sendfile / X-Accel-Redirect).
+
+Ayarlar:
+  MEDIA_SENDFILE = None | "x-sendfile" | "x-accel-redirect"
+  MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"   (nginx internal location)
+
+Devretme yoksa FileResponse döner; dosya nesnesi yalnızca istenen aralığı
+gösteren _RangeFile'dır. WSGI sunucusu wsgi.file_wrapper'ı os.sendfile ile
+uyguluyorsa (ör. gunicorn) aralık kopyasız gönderilir; değilse parça parça
+okunur.
+"""
+from __future__ import annotations
+
+import io
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(st: os.stat_result) -> str:
+    """Boyut + mtime(ns) tabanlı ETag (dosya değişirse değişir)."""
+    return quote_etag(f"{st.st_size:x}-{st.st_mtime_ns:x}")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Tek aralıklı 'bytes=a-b' / 'bytes=a-' / 'bytes=-n' başlığını çözer.
+    Dönüş: (başlangıç, bitiş) kapsayıcı; tatmin edilemezse ValueError;
+    desteklenmeyen biçimde (çoklu aralık vb.) None → tüm dosya gönderilir.
+    """
+    m = _RANGE_RE.match((header or "").strip())
+    if not m:
+        return None
+    a, b = m.groups()
+    if a == "" and b == "":
+        return None
+    if a == "":
+        n = int(b)
+        if n == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - n), size - 1
+    start = int(a)
+    end = int(b) if b else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [t.strip() for t in (header or "").split(",")]
+    return "*" in tags or etag in tags
+
+
+class _RangeFile(io.RawIOBase):
+    """
+    Dosyanın [start, end] aralığını ayrı bir dosyaymış gibi gösterir.
+    Gerçek dosya tanıtıcısı 'start' konumunda tutulur; böylece sendfile
+    kullanan file_wrapper ofseti lseek ile, uzunluğu Content-Length'ten alır.
+    """
+
+    def __init__(self, path, start: int, end: int):
+        self._f = open(path, "rb")
+        self._f.seek(start)
+        self.name = str(path)
+        self._start = start
+        self._end = end + 1
+        self._pos = start
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # Yalnızca sanal konum; gerçek tanıtıcı read() sırasında ilerler
+        if whence == io.SEEK_END:
+            self._pos = self._end + offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = offset
+        self._pos = max(self._start, min(self._pos, self._end))
+        return self._pos
+
+    def read(self, n=-1):
+        left = self._end - self._pos
+        if left <= 0:
+            return b""
+        n = left if n is None or n < 0 else min(n, left)
+        if self._f.tell() != self._pos:
+            self._f.seek(self._pos)
+        data = self._f.read(n)
+        self._pos += len(data)
+        return data
+
+    def close(self):
+        try:
+            self._f.close()
+        finally:
+            super().close()
+
+
+def _offload(path: Path, response: HttpResponse) -> bool:
+    mode = (getattr(settings, "MEDIA_SENDFILE", None) or "").lower()
+    if mode == "x-sendfile":
+        response["X-Sendfile"] = str(path)
+        return True
+    if mode == "x-accel-redirect":
+        prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+        try:
+            rel = path.resolve().relative_to(Path(settings.MEDIA_ROOT).resolve()).as_posix()
+        except ValueError:
+            return False  # MEDIA_ROOT dışında: nginx eşleyemez, doğrudan gönder
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + rel
+        return True
+    return False
+
+
+def serve_file(
+    request,
+    path,
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    as_attachment: bool = False,
+    etag: Optional[str] = None,
+    cache_control: str = "private, max-age=0, must-revalidate",
+) -> HttpResponse:
+    """
+    Yetki kontrolü yapılmış bir dosyayı koşullu GET + Range desteğiyle sunar.
+    'etag' verilmezse boyut+mtime'dan üretilir.
+    """
+    path = Path(path)
+    st = path.stat()
+    size = st.st_size
+    etag = etag or file_etag(st)
+    last_modified = http_date(st.st_mtime)
+    content_type = content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    def _common(resp):
+        resp["ETag"] = etag
+        resp["Last-Modified"] = last_modified
+        resp["Accept-Ranges"] = "bytes"
+        resp["Cache-Control"] = cache_control
+        return resp
+
+    # 1) Koşullu GET
+    inm = request.META.get("HTTP_IF_NONE_MATCH")
+    if inm is not None:
+        if _etag_matches(inm, etag):
+            return _common(HttpResponseNotModified())
+    else:
+        ims = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE") or "")
+        if ims is not None and int(st.st_mtime) <= ims:
+            return _common(HttpResponseNotModified())
+
+    # 2) Ön sunucuya devret (Range/ETag'i o işler)
+    resp = HttpResponse(content_type=content_type)
+    if _offload(path, resp):
+        if filename:
+            disp = "attachment" if as_attachment else "inline"
+            resp["Content-Disposition"] = f'{disp}; filename="{filename}"'
+        return _common(resp)
+
+    # 3) Range / If-Range
+    rng = None
+    range_header = request.META.get("HTTP_RANGE")
+    if range_header and request.method in ("GET", "HEAD"):
+        if_range = (request.META.get("HTTP_IF_RANGE") or "").strip()
+        fresh = (
+            not if_range
+            or if_range == etag
+            or parse_http_date_safe(if_range) == int(st.st_mtime)
+        )
+        if fresh:
+            try:
+                rng = parse_range(range_header, size)
+            except ValueError:
+                resp = HttpResponse(status=416)
+                resp["Content-Range"] = f"bytes */{size}"
+                return _common(resp)
+
+    start, end = rng if rng else (0, size - 1)
+    if size == 0:
+        resp = FileResponse(open(path, "rb"), content_type=content_type,
+                            as_attachment=as_attachment, filename=filename or path.name)
+    else:
+        resp = FileResponse(_RangeFile(path, start, end), content_type=content_type,
+                            as_attachment=as_attachment, filename=filename or path.name)
+    if rng:
+        resp.status_code = 206
+        resp["Content-Range"] = f"bytes {start}-{end}/{size}"
+    resp["Content-Length"] = str(end - start + 1 if size else 0)
+    return _common(resp)
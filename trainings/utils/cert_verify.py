@@ -0,0 +1,156 @@
+# trainings/utils/cert_verify.py
+"""
+Sertifika doğrulama (herkese açık /verify/<seri>/).
+
+- Arama tek indeksli okumadır (Certificate.serial UNIQUE) ve sık sorulan
+  seriler için süreç içi küçük bir LRU'da tutulur. Certificate kaydı
+  değişince trainings.signals ilgili seriyi düşürür; diğer süreçler en geç
+  VERIFY_CACHE_TTL sonra tazelenir.
+- PDF'teki QR, seri numarasının imzasını taşır (?s=...). İmza geçerliyse ad
+  soyad tam, değilse maskeli gösterilir; böylece ardışık seriler
+  denenerek kişi listesi çıkarılamaz.
+- İstemci IP'si başına sabit pencereli istek sınırı (Django cache). Sayaç
+  varsayılan cache'te tutulur; birden çok işçi süreçte paylaşımlı bir cache
+  (Redis/Memcached/veritabanı) ŞARTTIR, LocMemCache ile her süreç kendi
+  sayacını tutar ve N işçi sınırın N katına izin verir (bkz. settings.CACHES).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+
+VERIFY_CACHE_SIZE = 1024
+VERIFY_CACHE_TTL = 300.0
+
+_SALT = "trainings.certificate.verify"
+_MISSING = object()
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+def normalize_serial(serial: str) -> str:
+    return (serial or "").strip().upper()
+
+
+# -------- İmza / QR --------
+def sign_serial(serial: str) -> str:
+    return signing.Signer(salt=_SALT).signature(normalize_serial(serial))
+
+
+def check_signature(serial: str, sig: str) -> bool:
+    return bool(sig) and constant_time_compare(sign_serial(serial), sig)
+
+
+def verify_url(serial: str) -> str:
+    """QR'a basılan mutlak doğrulama adresi (imzalı)."""
+    base = getattr(settings, "SITE_URL", "").rstrip("/")
+    return f"{base}{reverse('verify_certificate', args=[serial])}?s={sign_serial(serial)}"
+
+
+# -------- LRU --------
+class _LRU:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize, self.ttl = maxsize, ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None or time.monotonic() - hit[0] >= self.ttl:
+                return _MISSING
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU(VERIFY_CACHE_SIZE, VERIFY_CACHE_TTL)
+
+
+def invalidate(serial: Optional[str] = None):
+    if serial:
+        _lru.discard(normalize_serial(serial))
+    else:
+        _lru.clear()
+
+
+def lookup(serial: str) -> Optional[dict]:
+    """
+    Seri numarasının kaydı (yoksa None); yalnızca üretimi tamamlanmış (ready)
+    sertifikalar geçerlidir. Tek indeksli sorgu, bulunanlar LRU'da.
+    """
+    serial = normalize_serial(serial)
+    hit = _lru.get(serial)
+    if hit is not _MISSING:
+        return hit
+    row = (
+        M("Certificate").objects.filter(serial=serial, status="ready")
+        .values("serial", "issued_at", "expires_at", "training__title",
+                "user__first_name", "user__last_name", "user__username")
+        .first()
+    )
+    if row is None:
+        return None  # bilinmeyen/hazır olmayan seriler önbelleğe alınmaz (hazır olunca hemen görünsün)
+    row = {
+        "serial": row["serial"],
+        "issued_at": row["issued_at"],
+        "expires_at": row["expires_at"],
+        "training": row["training__title"],
+        "fullname": f"{row['user__first_name']} {row['user__last_name']}".strip() or row["user__username"],
+    }
+    _lru.put(serial, row)
+    return row
+
+
+def mask_name(fullname: str) -> str:
+    """'Şule Güç' → 'Ş*** G***'"""
+    return " ".join(f"{part[0]}***" for part in fullname.split() if part)
+
+
+# -------- İstek sınırı --------
+def rate_limited(request) -> bool:
+    """
+    IP başına CERTIFICATE_VERIFY_RATE = (istek, saniye) penceresi.
+    Ters vekil arkasında REMOTE_ADDR'ın gerçek istemci olacak şekilde
+    ayarlanması gerekir (X-Forwarded-For'a burada güvenilmez). Sayaç
+    süreçler arasında ancak paylaşımlı cache ile ortaktır; LocMemCache
+    yalnızca tek süreçli kurulumda (geliştirme) doğru sınır verir.
+    """
+    limit, window = getattr(settings, "CERTIFICATE_VERIFY_RATE", (30, 60))
+    ip = request.META.get("REMOTE_ADDR", "")
+    key = f"cert-verify:{ip}:{int(time.time() // window)}"
+    if cache.add(key, 1, timeout=window):
+        return False
+    try:
+        return cache.incr(key) > limit
+    except ValueError:  # anahtar bu arada düştü
+        cache.add(key, 1, timeout=window)
+        return False
@@ -0,0 +1,273 @@
+# trainings/utils/certificate_pdf.py
+"""
+Sertifika PDF çizimi (ReportLab).
+
+Django'ya bağımlı değildir; generate_certificates komutunun süreç havuzu
+(Windows'ta spawn dahil) işleri buradan çalıştırır. Dosya önce aynı dizinde
+geçici ada yazılır, sonra os.replace ile yerine konur; yarım PDF görünmez.
+
+Şablon önbelleği: fontlar, logo (ImageReader) ve fontların glif tabloları
+süreç başına BİR KEZ hazırlanır. Sabit katman (çerçeve, logo, başlık, alt
+bilgi) her belgede bir kez form XObject olarak çizilir (canvas.beginForm) ve
+sayfalarda doForm ile kullanılır; çok sayfalı birleşik PDF'te logo ve çizimler
+yalnızca bir kez yazılır. Yalnızca ReportLab'ın belgelenmiş API'si kullanılır.
+
+Fontta glifi olmayan bir karakter (ör. Vera'da Kiril harfleri) boş kutu
+olarak basılmaz: çizim ValueError ile durur, iş 'failed' olur ve hata
+mesajında eksik karakterler yazar. Bu karakterleri içeren bir TTF'i
+CERTIFICATE_FONT / CERTIFICATE_FONT_BOLD ile seçin.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, Optional
+
+import reportlab
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+PAGE_W, PAGE_H = A4
+
+# ReportLab ile gelen Bitstream Vera Türkçe karakterleri (ğĞşŞıİ...) içerir;
+# Kiril, Yunan vb. için CERTIFICATE_FONT ile başka bir TTF verilmelidir.
+_RL_FONTS = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+DEFAULT_FONT = os.path.join(_RL_FONTS, "Vera.ttf")
+DEFAULT_FONT_BOLD = os.path.join(_RL_FONTS, "VeraBd.ttf")
+
+_BACKGROUND = "certBackground"   # belge içi form adı
+_CHUNK = 64 * 1024
+
+_fonts: Dict[str, str] = {}   # ttf yolu -> kayıtlı font adı
+_templates: Dict[tuple, "CertificateTemplate"] = {}
+
+
+# -------- Fontlar --------
+def register_font(path: Optional[str] = None, bold: bool = False) -> str:
+    """TTF'i süreç başına bir kez kaydeder; ReportLab font adını döndürür."""
+    path = os.path.abspath(path or (DEFAULT_FONT_BOLD if bold else DEFAULT_FONT))
+    name = _fonts.get(path)
+    if name is None:
+        name = f"Cert{len(_fonts)}-{os.path.splitext(os.path.basename(path))[0]}"
+        pdfmetrics.registerFont(TTFont(name, path))
+        _fonts[path] = name
+    return name
+
+
+def missing_glyphs(font_name: str, text: str) -> str:
+    """Kayıtlı TTF fontunda glifi olmayan karakterler (sıralı, tekrarsız)."""
+    cmap = pdfmetrics.getFont(font_name).face.charToGlyph
+    return "".join(sorted({ch for ch in text if ord(ch) not in cmap and not ch.isspace()}))
+
+
+def _draw_background(c, regular: str, bold: str, logo, org_name: str):
+    """Her sertifikada aynı olan katman."""
+    c.saveState()
+    c.setStrokeColorRGB(0.13, 0.30, 0.55)
+    c.setLineWidth(3)
+    c.rect(28, 28, PAGE_W - 56, PAGE_H - 56)
+    c.setLineWidth(0.8)
+    c.rect(38, 38, PAGE_W - 76, PAGE_H - 76)
+    if logo:
+        c.drawImage(logo if isinstance(logo, ImageReader) else ImageReader(logo),
+                    PAGE_W / 2 - 45, PAGE_H - 130, width=90, height=60,
+                    preserveAspectRatio=True, anchor="c", mask="auto")
+    c.setFillColorRGB(0.13, 0.30, 0.55)
+    c.setFont(bold, 22)
+    c.drawCentredString(PAGE_W / 2, PAGE_H - 150, "KATILIM SERTİFİKASI")
+    c.setFillGray(0.35)
+    if org_name:
+        c.setFont(regular, 11)
+        c.drawCentredString(PAGE_W / 2, PAGE_H - 172, org_name)
+    c.setFont(regular, 9)
+    c.drawCentredString(PAGE_W / 2, 80, "Bu belge otomatik olarak oluşturulmuştur.")
+    c.restoreState()
+
+
+def _fit(text: str, font: str, size: float, max_width: float, min_size: float = 8) -> float:
+    width = pdfmetrics.stringWidth(text, font, size)
+    if width > max_width:
+        size = max(min_size, size * max_width / width)
+    return size
+
+
+# Değişken alanların yerleşimi: (anahtar, font, punto, y)
+_LAYOUT = (
+    ("name", "bold", 18, PAGE_H - 225),
+    ("title", "regular", 14, PAGE_H - 262),
+    ("date", "regular", 12, PAGE_H - 300),
+    ("serial", "regular", 9, 100),
+)
+_MAX_TEXT_WIDTH = PAGE_W - 120
+_QR_SIZE = 72
+
+
+def _lines(fullname: str, training_title: str, date_str: str, serial: str) -> Dict[str, str]:
+    return {
+        "name": f"Sayın {fullname},",
+        "title": f"'{training_title}' eğitimini başarıyla tamamlamıştır.",
+        "date": f"Tarih: {date_str}",
+        "serial": f"Seri No: {serial}" if serial else "",
+    }
+
+
+def _draw_fields(c, fonts: Dict[str, str], fullname: str, training_title: str, date_str: str,
+                 serial: str = "", qr: str = ""):
+    """Değişken alanlar; fontta olmayan karakter varsa hiçbir şey çizmeden ValueError."""
+    lines = _lines(fullname, training_title, date_str, serial)
+    for key, face, _, _ in _LAYOUT:
+        bad = missing_glyphs(fonts[face], lines[key])
+        if bad:
+            raise ValueError(
+                f"'{fonts[face]}' fontunda glifi olmayan karakter: {bad!r} "
+                "(CERTIFICATE_FONT / CERTIFICATE_FONT_BOLD ile bu karakterleri içeren bir TTF seçin)"
+            )
+    c.saveState()
+    c.setFillGray(0)
+    for key, face, size, y in _LAYOUT:
+        if lines[key]:
+            size = _fit(lines[key], fonts[face], size, _MAX_TEXT_WIDTH)
+            c.setFont(fonts[face], size)
+            c.drawCentredString(PAGE_W / 2, y, lines[key])
+    c.restoreState()
+    if qr:
+        d = Drawing(_QR_SIZE, _QR_SIZE)
+        d.add(QrCodeWidget(qr, barWidth=_QR_SIZE, barHeight=_QR_SIZE, barBorder=0))
+        renderPDF.draw(d, c, PAGE_W - 60 - _QR_SIZE, 60)
+
+
+# -------- Tam çizim (referans) --------
+def render_full(fullname: str, training_title: str, date_str: str, serial: str = "",
+                qr: str = "", font: Optional[str] = None, font_bold: Optional[str] = None,
+                logo: Optional[str] = None, org_name: str = "") -> bytes:
+    """Tüm sayfayı önbelleksiz, form kullanmadan çizer (karşılaştırma için)."""
+    fonts = {"regular": register_font(font), "bold": register_font(font_bold, bold=True)}
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    _draw_background(c, fonts["regular"], fonts["bold"], logo, org_name)
+    _draw_fields(c, fonts, fullname, training_title, date_str, serial, qr)
+    c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+# -------- Şablon --------
+class CertificateTemplate:
+    """Süreç başına hazırlanan font/logo + belge başına bir kez çizilen sabit katman formu."""
+
+    def __init__(self, font: Optional[str] = None, font_bold: Optional[str] = None,
+                 logo: Optional[str] = None, org_name: str = ""):
+        self.fonts = {"regular": register_font(font), "bold": register_font(font_bold, bold=True)}
+        # Görsel bir kez çözülür; aynı ImageReader her belgede yeniden kullanılır
+        self.logo = ImageReader(logo) if logo else None
+        self.org_name = org_name or ""
+
+    def missing(self, text: str) -> str:
+        """İki fonttan en az birinde glifi olmayan karakterler."""
+        return "".join(sorted({ch for name in self.fonts.values() for ch in missing_glyphs(name, text)}))
+
+    def _canvas(self, buf) -> canvas.Canvas:
+        # invariant: aynı girdiler aynı baytları verir (sha256 indirmede ETag'dir)
+        c = canvas.Canvas(buf, pagesize=A4, invariant=1)
+        c.beginForm(_BACKGROUND)
+        _draw_background(c, self.fonts["regular"], self.fonts["bold"], self.logo, self.org_name)
+        c.endForm()
+        return c
+
+    def _page(self, c, fullname: str, training_title: str, date_str: str,
+              serial: str = "", qr: str = ""):
+        c.doForm(_BACKGROUND)
+        _draw_fields(c, self.fonts, fullname, training_title, date_str, serial, qr)
+        c.showPage()
+
+    def render(self, fullname: str, training_title: str, date_str: str,
+               serial: str = "", qr: str = "") -> bytes:
+        """Tek sayfalık sertifika."""
+        buf = io.BytesIO()
+        c = self._canvas(buf)
+        self._page(c, fullname, training_title, date_str, serial, qr)
+        c.save()
+        return buf.getvalue()
+
+    def iter_merged(self, records: Iterable[tuple]) -> Iterator[bytes]:
+        """
+        Çok sayfalı tek PDF; her kayıt bir sayfa
+        (fullname, training_title, date_str[, serial[, qr]]). Sabit katman
+        belgeye bir kez yazılır, sayfalar onu doForm ile çizer. Belge çağrı
+        anında bütünüyle üretilir (hata akış başlamadan yükselir), sonra
+        parça parça döndürülür.
+        """
+        buf = io.BytesIO()
+        c = self._canvas(buf)
+        for rec in records:
+            self._page(c, *rec)
+        c.save()
+        data = buf.getbuffer()
+        return (bytes(data[i:i + _CHUNK]) for i in range(0, len(data), _CHUNK))
+
+
+def get_template(font: Optional[str] = None, font_bold: Optional[str] = None,
+                 logo: Optional[str] = None, org_name: str = "", chars: str = "") -> CertificateTemplate:
+    """
+    Aynı ayarlar için süreç başına tek şablon. 'chars' verilirse (basılacak
+    metinler) fontlarda glifi olmayan karakterler için baştan ValueError verir.
+    """
+    key = (font, font_bold, logo, org_name or "")
+    tpl = _templates.get(key)
+    if tpl is None:
+        tpl = _templates[key] = CertificateTemplate(font, font_bold, logo, org_name)
+    bad = tpl.missing(chars)
+    if bad:
+        raise ValueError(
+            f"Sertifika fontunda glifi olmayan karakter: {bad!r} "
+            "(CERTIFICATE_FONT / CERTIFICATE_FONT_BOLD ile bu karakterleri içeren bir TTF seçin)"
+        )
+    return tpl
+
+
+# -------- Dosyaya yazma --------
+def _write_atomic(out_path: str, data: bytes) -> str:
+    out_dir = os.path.dirname(out_path)
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".cert-", suffix=".pdf", dir=out_dir)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, out_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return out_path
+
+
+def render_certificate(out_path: str, user_fullname: str, training_title: str,
+                       date_str: str, serial: str = "", qr: str = "",
+                       template: Optional[dict] = None) -> str:
+    tpl = get_template(**(template or {}))
+    return _write_atomic(out_path, tpl.render(user_fullname, training_title, date_str, serial, qr))
+
+
+def render_job(job: dict) -> dict:
+    """
+    Havuz işçisi: {'id', 'path', 'fullname', 'title', 'date', 'serial'[, 'qr', 'template']}
+    → {'id', 'ok', 'sha256' | 'error'}. Özet, indirmede ETag olarak kullanılır.
+    Fontta olmayan karakterler 'error' içinde raporlanır.
+    """
+    try:
+        tpl = get_template(**(job.get("template") or {}))
+        data = tpl.render(job["fullname"], job["title"], job["date"], job.get("serial", ""), job.get("qr", ""))
+        _write_atomic(job["path"], data)
+        return {"id": job["id"], "ok": True, "sha256": hashlib.sha256(data).hexdigest()}
+    except Exception as e:
+        return {"id": job["id"], "ok": False, "error": f"{type(e).__name__}: {e}"}
@@ -0,0 +1,297 @@
+# trainings/utils/certificates.py
+"""
+Sertifika üretim kuyruğu.
+
+Kuyruk, Certificate satırının kendisidir (status=pending). Tamamlanma
+olayları (Enrollment 'completed', video %90, OCR katılım onayı)
+enqueue_certificates ile satır açar; PDF'i web isteği değil
+generate_certificates komutunun süreç havuzu üretir (bkz. certificate_pdf.py).
+İstisna: plan bazında toplu düzenleme (issue_for_plan) personelin beklediği
+partiyi doğrudan havuzda üretir ve birleşik PDF / ZIP olarak akıtır.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .cert_verify import verify_url
+from .certificate_pdf import get_template, render_certificate, render_job
+from .zipstream import iter_zip
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+def template_config() -> dict:
+    """Şablon ayarları; havuz işlerine taşınır (işçi süreç Django ayarı okumaz)."""
+    return {
+        "font": getattr(settings, "CERTIFICATE_FONT", None),
+        "font_bold": getattr(settings, "CERTIFICATE_FONT_BOLD", None),
+        "logo": getattr(settings, "CERTIFICATE_LOGO", None),
+        "org_name": getattr(settings, "CERTIFICATE_ORG_NAME", "") or "",
+    }
+
+
+def generate_certificate_pdf(user_fullname, training_title, date_str, outfile_name):
+    """Eski eşzamanlı API (betikler için): MEDIA_ROOT/certificates/<ad>."""
+    outpath = os.path.join(settings.MEDIA_ROOT, "certificates", outfile_name)
+    return render_certificate(outpath, user_fullname, training_title, date_str, template=template_config())
+
+
+# -------- Kuyruğa alma --------
+def enqueue_certificates(pairs: Iterable[Tuple[int, int]], issued_at=None) -> int:
+    """
+    (user_id, training_id) çiftleri için henüz sertifikası olmayanlara
+    'pending' satır açar. Dönüş: kuyruğa alınan (bu çağrıda yoktu görünen) sayı.
+    Eşzamanlı çağrılar aynı çifti yazmaya çalışırsa benzersiz kısıt
+    (uq_certificate_user_training) + ignore_conflicts ikinciyi atlar.
+    """
+    Certificate = M("Certificate")
+    pairs = {(int(u), int(t)) for u, t in pairs if u and t}
+    if not pairs:
+        return 0
+    user_ids = {u for u, _ in pairs}
+    training_ids = {t for _, t in pairs}
+    existing = set(
+        Certificate.objects.filter(user_id__in=user_ids, training_id__in=training_ids)
+        .values_list("user_id", "training_id")
+    )
+    missing = sorted(pairs - existing)
+    Certificate.objects.bulk_create(
+        [Certificate(user_id=u, training_id=t, status="pending", issued_at=issued_at or timezone.now())
+         for u, t in missing],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    return len(missing)
+
+
+def enqueue_certificate(user_id: int, training_id: int) -> int:
+    return enqueue_certificates([(user_id, training_id)])
+
+
+# -------- İşçi tarafı --------
+def make_serial(cert) -> str:
+    """pk'dan türetildiği için çakışmaz (Certificate.serial UNIQUE)."""
+    return f"CRT-{cert.issued_at:%Y}-{cert.pk:06d}"
+
+
+def relative_path(cert) -> str:
+    """MEDIA_ROOT'a göre PDF yolu (seri numarası dosya adıdır)."""
+    return f"certificates/{cert.user_id}/{cert.serial}.pdf"
+
+
+def requeue_stale(minutes: int) -> int:
+    Certificate = M("Certificate")
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return Certificate.objects.filter(status="processing", started_at__lt=cutoff).update(
+        status="failed", error="Zaman aşımı: işçi yanıt vermedi."
+    )
+
+
+def claim_batch(limit: int, max_attempts: int, ids: Optional[Iterable[int]] = None) -> List[int]:
+    """
+    Bekleyen/yeniden denenebilir işlerden en fazla 'limit' tanesini sahiplenir
+    ('ids' verilirse yalnızca onlar arasından).
+    SKIP LOCKED destekleyen veritabanlarında aynı anda çalışan işçiler
+    birbirinin satırlarını atlar; SQLite yazmaları zaten sıralar.
+    """
+    Certificate = M("Certificate")
+    ready = Q(status="pending") | Q(status="failed", attempts__lt=max_attempts)
+    with transaction.atomic():
+        qs = Certificate.objects.filter(ready).order_by("created_at", "pk")
+        if ids is not None:
+            qs = qs.filter(pk__in=list(ids))
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        ids = list(qs.values_list("pk", flat=True)[:limit])
+        if ids:
+            Certificate.objects.filter(pk__in=ids).update(
+                status="processing", attempts=F("attempts") + 1, started_at=timezone.now()
+            )
+    return ids
+
+
+@transaction.atomic
+def build_jobs(ids: List[int]) -> List[dict]:
+    """Sahiplenilen satırlar için seri atar ve havuz işlerini hazırlar."""
+    Certificate = M("Certificate")
+    certs = list(Certificate.objects.filter(pk__in=ids).select_related("user", "training"))
+    fresh = [c for c in certs if not c.serial]
+    for c in fresh:
+        c.serial = make_serial(c)
+    # Elle girilmiş eski bir seri üretilenle çakışırsa pk eklenerek ayrılır
+    taken = set(
+        Certificate.objects.filter(serial__in=[c.serial for c in fresh])
+        .exclude(pk__in=ids).values_list("serial", flat=True)
+    )
+    for c in fresh:
+        if c.serial in taken:
+            c.serial = f"{c.serial}-{c.pk}"
+    Certificate.objects.bulk_update(fresh, ["serial"])
+    template = template_config()
+    return [
+        dict(certificate_fields(c), id=c.pk, path=os.path.join(settings.MEDIA_ROOT, relative_path(c)),
+             rel=relative_path(c), template=template)
+        for c in certs
+    ]
+
+
+def certificate_fields(cert) -> dict:
+    """PDF'e basılan değişken alanlar (user ve training yüklenmiş olmalı)."""
+    u = cert.user
+    return {
+        "fullname": (u.get_full_name() or u.get_username()).strip(),
+        "title": cert.training.title,
+        "date": timezone.localtime(cert.issued_at).strftime("%d.%m.%Y"),
+        "serial": cert.serial or "",
+        "qr": verify_url(cert.serial) if cert.serial else "",
+    }
+
+
+def render_jobs(jobs: List[dict], workers: Optional[int] = None) -> List[dict]:
+    """İşleri süreç havuzunda çizer; küçük partilerde havuz açma maliyetine girmez."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) < 2 * workers:
+        return [render_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def _notify_ready(certs) -> None:
+    """Hazır sertifika bildirimi; aynı transaction içinde günlük özete eklenir."""
+    from .outbox import enqueue_many, message
+
+    base = getattr(settings, "SITE_URL", "").rstrip("/")
+    msgs = []
+    for c in certs:
+        if not c.user.email:
+            continue
+        msgs.append(message(
+            c.user.email, f"Sertifikanız hazır: {c.training.title}",
+            f"{c.training.title} eğitimi sertifikanız ({c.serial}) hazır.\n"
+            f"İndirmek için: {base}{reverse('cert-download', args=[c.pk])}",
+            user=c.user, kind="certificate", key=f"certificate:{c.pk}", digest=True,
+        ))
+    enqueue_many(msgs)
+
+
+def finish_jobs(results: List[dict], rel_paths: dict) -> Tuple[int, int]:
+    """Sonuçları toplu yazar. Dönüş: (hazır, hatalı)."""
+    Certificate = M("Certificate")
+    now = timezone.now()
+    ok = {r["id"]: r for r in results if r["ok"]}
+    bad = [r for r in results if not r["ok"]]
+    with transaction.atomic():
+        certs = list(Certificate.objects.filter(pk__in=ok).select_related("user", "training"))
+        for c in certs:
+            c.file.name = rel_paths[c.pk]
+            c.file_sha256 = ok[c.pk].get("sha256", "")
+            c.status = "ready"
+            c.error = ""
+            c.generated_at = now
+        Certificate.objects.bulk_update(certs, ["file", "file_sha256", "status", "error", "generated_at"])
+        _notify_ready(certs)
+        for r in bad:
+            Certificate.objects.filter(pk=r["id"]).update(status="failed", error=r["error"][:2000])
+    return len(certs), len(bad)
+
+
+# -------- Plan bazında toplu düzenleme --------
+def issue_for_plan(plans, workers: Optional[int] = None, max_attempts: int = 3) -> Tuple[list, int]:
+    """
+    Planların tüm katılımcıları için sertifika satırlarını bulk_create ile açar
+    (düzenlenme tarihi = plan bitişi), eksik PDF'leri süreç havuzunda hemen
+    üretir. Dönüş: (sertifikalar, hatalı sayısı).
+    """
+    Certificate = M("Certificate")
+    TrainingPlanAttendee = M("TrainingPlanAttendee")
+    pairs = set()
+    for plan in plans:
+        user_ids = list(TrainingPlanAttendee.objects.filter(plan=plan).values_list("user_id", flat=True))
+        pairs.update((u, plan.training_id) for u in user_ids)
+        enqueue_certificates([(u, plan.training_id) for u in user_ids], issued_at=plan.end_datetime)
+    if not pairs:
+        return [], 0
+
+    q = Q()
+    for t in {t for _, t in pairs}:
+        q |= Q(training_id=t, user_id__in=[u for u, tt in pairs if tt == t])
+    certs = Certificate.objects.filter(q)
+
+    bad = 0
+    ids = claim_batch(len(pairs), max_attempts, ids=certs.values_list("pk", flat=True))
+    if ids:
+        jobs = build_jobs(ids)
+        _, bad = finish_jobs(render_jobs(jobs, workers), {j["id"]: j["rel"] for j in jobs})
+    certs = list(
+        certs.select_related("user", "training").order_by("training__title", "user__last_name",
+                                                          "user__first_name", "user__username")
+    )
+    return certs, bad
+
+
+def iter_merged_pdf(certs) -> Iterator[bytes]:
+    """
+    Hazır ('ready') sertifikaları tek çok sayfalı PDF olarak akıtır (diskten
+    okumaz). ZIP ile aynı küme basılır; atlananları çağıran not_ready ile bildirir.
+    """
+    records = [
+        (f["fullname"], f["title"], f["date"], f["serial"], f["qr"])
+        for f in map(certificate_fields, (c for c in certs if c.status == "ready"))
+    ]
+    # Fontta olmayan karakterler akış başlamadan ValueError verir
+    return get_template(**template_config()).iter_merged(records)
+
+
+def not_ready(certs) -> int:
+    """Birleşik PDF/ZIP'e girmeyecek (hazır olmayan) sertifika sayısı."""
+    return sum(1 for c in certs if c.status != "ready" or not c.file)
+
+
+def iter_certificate_zip(certs) -> Iterator[bytes]:
+    """Hazır sertifika dosyalarını ZIP olarak akıtır."""
+    files = []
+    for c in certs:
+        if c.status == "ready" and c.file:
+            name = (c.user.get_full_name() or c.user.get_username()).strip()
+            files.append((f"{c.serial} - {name}.pdf".replace("/", "-"), c.file.path))
+    return iter_zip(files)
+
+
+# -------- İndirme --------
+def max_attempts() -> int:
+    return max(1, getattr(settings, "CERTIFICATE_MAX_ATTEMPTS", 3))
+
+
+def generate_now(cert_id: int, attempts: Optional[int] = None) -> bool:
+    """Tek sertifikayı istek içinde üretir (CERTIFICATE_ON_DEMAND). Başka işçi üzerindeyse False."""
+    ids = claim_batch(1, attempts or max_attempts(), ids=[cert_id])
+    if not ids:
+        return False
+    jobs = build_jobs(ids)
+    ok, _ = finish_jobs(render_jobs(jobs, workers=1), {j["id"]: j["rel"] for j in jobs})
+    return ok == 1
+
+
+def file_digest(cert) -> str:
+    """Dosya özeti; eski (özetsiz) kayıtlarda bir kez hesaplanıp yazılır."""
+    if not cert.file_sha256:
+        with open(cert.file.path, "rb") as fh:
+            cert.file_sha256 = hashlib.file_digest(fh, "sha256").hexdigest()
+        M("Certificate").objects.filter(pk=cert.pk).update(file_sha256=cert.file_sha256)
+    return cert.file_sha256
@@ -0,0 +1,127 @@
+# trainings/utils/coverage.py
+"""
+İzlenen aralık (coverage) yapısı.
+
+Aralıklar tam saniyeye dışa doğru yuvarlanır (başlangıç aşağı, bitiş
+yukarı; ardışık kalp atışlarının sınırları böylece boşluksuz birleşir) ve
+sıralı, çakışmasız iki dizi (başlangıçlar / bitişler) olarak tutulur.
+Ekleme bisect ile O(log n) arama + yerinde birleştirme yapar; yalnızca
+çakışan ya da uç uca değen aralıklar birleşir, boşluklar izlenmiş
+sayılmaz. Yuvarlama yüzünden covered() saklanan aralık başına en fazla
+2 sn fazla olabilir (ör. add(0.9, 1.1) → [0, 2]); üst sınır
+MAX_INTERVALS * 2 sn, yüzde 100 ile kırpılır. Saklama biçimi:
+küçük-endian uint32 çiftleri (aralık başına 8 bayt; büyük-endian
+makinelerde byteswap ile çevrilir).
+
+Parça sayısı MAX_INTERVALS'ı aşarsa EN KISA aralık atılır (boşluk
+kapatılmaz). covered() böylece hiçbir zaman gerçek izlenenden büyük olmaz;
+hata yalnızca eksik yöndedir ve atılan parçalar kadardır (kullanıcı o
+bölümü yeniden izlerse geri gelir). Satır başına en fazla
+MAX_INTERVALS * 8 bayt tutulur.
+"""
+from __future__ import annotations
+
+import json
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Sequence, Tuple
+
+MAX_INTERVALS = 32  # 256 bayt
+# Yalnızca çakışan/değen aralıklar birleşir (boşluk izlenmiş sayılmaz)
+JOIN_GAP = 0
+
+_SWAP = sys.byteorder != "little"
+
+
+def parse_intervals(raw, duration: float) -> List[List[float]]:
+    """
+    İstemciden gelen JSON'u doğrular: [[s, e], ...] → süreye kırpılmış,
+    s < e olan, 0.1 sn hassasiyetli aralıklar. Hatalıysa ValueError.
+    """
+    data = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    if not isinstance(data, list) or len(data) > 1000:
+        raise ValueError("intervals must be a list")
+    out = []
+    for item in data:
+        if not isinstance(item, (list, tuple)) or len(item) != 2:
+            raise ValueError("interval must be [start, end]")
+        s, e = float(item[0]), float(item[1])
+        s = max(0.0, min(s, duration))
+        e = max(0.0, min(e, duration))
+        if e > s:
+            out.append([round(s, 1), round(e, 1)])
+    return out
+
+
+class Coverage:
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: Iterable[Sequence[float]] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for s, e in intervals:
+            self.add(s, e)
+
+    # ---- serileştirme ----
+    @classmethod
+    def from_bytes(cls, data) -> "Coverage":
+        cov = cls()
+        data = bytes(data or b"")
+        if data and len(data) % 8 == 0:  # bozuk/kesik blob → boş kapsama
+            a = array("I")
+            a.frombytes(data)
+            if _SWAP:
+                a.byteswap()
+            cov.starts = list(a[0::2])
+            cov.ends = list(a[1::2])
+        return cov
+
+    def to_bytes(self) -> bytes:
+        a = array("I")
+        for s, e in zip(self.starts, self.ends):
+            a.append(s)
+            a.append(e)
+        if _SWAP:
+            a.byteswap()
+        return a.tobytes()
+
+    # ---- işlemler ----
+    def add(self, start: float, end: float) -> None:
+        s, e = int(math.floor(max(0.0, start))), int(math.ceil(max(0.0, end)))
+        if e <= s:
+            return
+        # s'den önce JOIN_GAP içinde biten ilk aralık ile e'den sonra JOIN_GAP
+        # içinde başlayan son aralık arası [i, j) birleşir
+        i = bisect_left(self.ends, s - JOIN_GAP)
+        j = bisect_right(self.starts, e + JOIN_GAP)
+        if i < j:
+            s = min(s, self.starts[i])
+            e = max(e, self.ends[j - 1])
+        self.starts[i:j] = [s]
+        self.ends[i:j] = [e]
+        if len(self.starts) > MAX_INTERVALS:
+            self._compact()
+
+    def _compact(self) -> None:
+        """En kısa aralığı atarak parça sayısını sınırda tut (covered() asla artmaz)."""
+        while len(self.starts) > MAX_INTERVALS:
+            lengths = [e - s for s, e in zip(self.starts, self.ends)]
+            k = lengths.index(min(lengths))
+            del self.starts[k]
+            del self.ends[k]
+
+    def covered(self) -> int:
+        return sum(e - s for s, e in zip(self.starts, self.ends))
+
+    def percent(self, duration: float) -> int:
+        if not duration:
+            return 0
+        return max(0, min(100, int(self.covered() / float(duration) * 100)))
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        return list(zip(self.starts, self.ends))
+
+    def __len__(self) -> int:
+        return len(self.starts)
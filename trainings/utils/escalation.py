@@ -0,0 +1,142 @@
+# trainings/utils/escalation.py
+"""
+Hedef tarihi geçen eğitim ihtiyaçlarının eskalasyonu (escalate_overdue_needs).
+
+- Okuma (is_open, due_date) indeksinde aralık sorgusudur:
+  watermark < due_date < bugün. Watermark SchedulerWatermark'ta tutulur;
+  her çalıştırma yalnızca son çalıştırmadan bu yana eşiği geçen dilimi
+  okur, açık ihtiyaçların tamamı yeniden taranmaz.
+- Watermark'ın gerisinde kalan hedefler de kaçmaz: son çalıştırmadan
+  (SchedulerWatermark.ran_at) bu yana oluşturulan ya da değiştirilen
+  (updated_at; ör. geriye tarihli girilen veya hedefi öne çekilen) ve henüz
+  eskale edilmemiş ihtiyaçlar (is_open, updated_at) indeksinden eklenir.
+  QuerySet.update ile updated_at'ı değiştirmeden yapılan toplu hedef
+  değişiklikleri yalnızca --since ile geriye dönük çalıştırmada yakalanır.
+- Dilim tek transaction içinde işlenir: öncelik bir kademe yükseltilir,
+  escalated_at doldurulur (gecikme işareti; durum, ör. 'approved',
+  korunur), yöneticilere bildirim outbox'a yazılır ve watermark ilerletilir.
+  Hata olursa hiçbiri kalıcı olmaz; sonraki çalıştırma aynı dilimi yeniden dener.
+- escalated_at dolu kayıtlar atlanır; --since ile geriye dönük yeniden
+  çalıştırma aynı ihtiyacı ikinci kez yükseltmez.
+- Yönetici: ihtiyacı onaylayan, yoksa oluşturan kullanıcı (kişinin kendisi
+  değilse); bulunamazsa NEED_ESCALATION_EMAILS adresleri.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection as db_connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+WATERMARK = "need_escalation"
+CHUNK = 500  # UPDATE ... WHERE pk IN (...) parça boyu
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+@dataclass
+class EscalationResult:
+    since: Optional[object] = None
+    until: Optional[object] = None
+    escalated: int = 0
+    notified: int = 0
+
+
+def _manager(row) -> Optional[int]:
+    for key in ("approved_by_id", "created_by_id"):
+        if row[key] and row[key] != row["user_id"]:
+            return row[key]
+    return None
+
+
+def _notify(rows, today) -> int:
+    """Yönetici başına tek bildirim (ihtiyaç listesiyle)."""
+    from .outbox import enqueue_many, message
+
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    groups = defaultdict(list)
+    for r in rows:
+        groups[_manager(r)].append(r)
+    managers = User.objects.in_bulk([pk for pk in groups if pk])
+
+    msgs = []
+    for pk, items in groups.items():
+        lines = "\n".join(
+            f"- {r['user__first_name']} {r['user__last_name']}".rstrip() + f" ({r['user__username']}): "
+            f"{r['training__title']} — hedef {r['due_date']:%d.%m.%Y}"
+            for r in items
+        )
+        subject = f"Gecikmiş eğitim ihtiyaçları: {len(items)} kayıt"
+        body = f"Hedef tarihi geçen ve önceliği yükseltilen eğitim ihtiyaçları:\n\n{lines}\n"
+        key = f"need-escalation:{today:%Y%m%d}:{pk or 0}"
+        user = managers.get(pk)
+        if user is not None and user.email:
+            msgs.append(message(user.email, subject, body, user=user, kind="need_escalation", key=key))
+        else:
+            for i, email in enumerate(getattr(settings, "NEED_ESCALATION_EMAILS", ())):
+                msgs.append(message(email, subject, body, kind="need_escalation", key=f"{key}:{i}"))
+    return enqueue_many(msgs)
+
+
+def escalate_overdue(today=None, since=None, dry_run: bool = False) -> EscalationResult:
+    """
+    Hedef tarihi (since, today) aralığına düşen ya da son çalıştırmadan bu
+    yana değişmiş, hedefi geçmiş açık ihtiyaçları eskale eder. since
+    verilmezse watermark kullanılır (ilk çalıştırmada alt sınır yok).
+    """
+    TrainingNeed = M("TrainingNeed")
+    SchedulerWatermark = M("SchedulerWatermark")
+    today = today or timezone.localdate()
+    until = today - timedelta(days=1)  # bugün hedefli olanlar henüz gecikmedi
+    started = timezone.now()
+
+    with transaction.atomic():
+        wm, _ = SchedulerWatermark.objects.get_or_create(name=WATERMARK)
+        if db_connection.features.has_select_for_update:
+            wm = SchedulerWatermark.objects.select_for_update().get(pk=wm.pk)  # eşzamanlı çalıştırmaya karşı
+        lower = since if since is not None else wm.value
+        result = EscalationResult(since=lower, until=until)
+
+        qs = TrainingNeed.objects.filter(is_open=True, due_date__lte=until, escalated_at__isnull=True)
+        if lower is not None:
+            window = Q(due_date__gt=lower)
+            if wm.ran_at is not None:
+                window |= Q(updated_at__gte=wm.ran_at)  # geriye tarihli / öne çekilmiş hedefler
+            qs = qs.filter(window)
+        rows = list(qs.values(
+            "pk", "user_id", "approved_by_id", "created_by_id", "due_date",
+            "user__username", "user__first_name", "user__last_name", "training__title",
+        ).order_by("due_date", "pk"))
+
+        if dry_run:
+            result.escalated = len(rows)
+            transaction.set_rollback(True)
+            return result
+
+        now = timezone.now()
+        for i in range(0, len(rows), CHUNK):
+            result.escalated += TrainingNeed.objects.filter(pk__in=[r["pk"] for r in rows[i:i + CHUNK]]).update(
+                priority=Greatest(F("priority") - 1, Value(1)),
+                escalated_at=now,
+            )
+        if rows:
+            result.notified = _notify(rows, today)
+
+        if wm.value is None or until > wm.value:
+            wm.value = until
+        # Okumadan önceki an: okuma sırasında değişen kayıtlar sonraki çalıştırmada görülür
+        wm.ran_at = started
+        wm.save(update_fields=["value", "ran_at", "updated_at"])
+    return result
@@ -0,0 +1,124 @@
+# trainings/utils/name_index.py
+"""
+Katılım listesi isim eşleştirmesi için karakter n-gram indeksi.
+
+Her kullanıcı adı Türkçe katlanmış (ç→c, ı/İ→i, ş→s ...) biçimde
+trigramlara bölünür ve ters indekse yazılır. Sorguda yalnızca ortak
+trigram sayısı en yüksek kısa liste SequenceMatcher ile puanlanır;
+böylece her aday tüm User tablosuyla karşılaştırılmaz.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NGRAM = 3
+DEFAULT_SHORTLIST = 50
+
+_TR_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_TR_FOLD = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+    "â": "a", "î": "i", "û": "u",
+})
+
+
+def fold(s: str) -> str:
+    """Türkçe kurallarıyla küçült, aksanları at, harf/boşluk dışını temizle."""
+    s = unicodedata.normalize("NFKC", s or "").translate(_TR_LOWER).lower()
+    s = s.translate(_TR_FOLD)
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = re.sub(r"[^a-z0-9\s]", " ", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def ngrams(folded: str, n: int = NGRAM) -> set:
+    """Kelime sınırları korunarak (her token ayrı, boşlukla dolgulu) n-gram kümesi."""
+    grams = set()
+    for tok in folded.split():
+        padded = f" {tok} "
+        if len(padded) <= n:
+            grams.add(padded)
+            continue
+        for i in range(len(padded) - n + 1):
+            grams.add(padded[i:i + n])
+    return grams
+
+
+def score(a_folded: str, b_folded: str) -> float:
+    """0..1 benzerlik; katlanmış iki ad üzerinde SequenceMatcher oranı."""
+    return SequenceMatcher(None, a_folded, b_folded).ratio()
+
+
+class NameIndex:
+    """
+    (anahtar, nesne) çiftlerinden kurulan n-gram indeksi.
+    search() en iyi k eşleşmeyi (nesne, skor) olarak, skora göre azalan döndürür.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, object]], shortlist: int = DEFAULT_SHORTLIST):
+        self.shortlist = shortlist
+        self.keys: List[str] = []
+        self.objs: List[object] = []
+        self.postings: Dict[str, List[int]] = {}
+        for key, obj in items:
+            folded = fold(key)
+            if not folded:
+                continue
+            idx = len(self.keys)
+            self.keys.append(folded)
+            self.objs.append(obj)
+            for g in ngrams(folded):
+                self.postings.setdefault(g, []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _shortlist(self, folded: str) -> List[int]:
+        hits: Counter = Counter()
+        for g in ngrams(folded):
+            plist = self.postings.get(g)
+            if plist:
+                hits.update(plist)
+        return [i for i, _ in hits.most_common(self.shortlist)]
+
+    def search(self, name: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[object, float]]:
+        folded = fold(name)
+        if not folded:
+            return []
+        sm = SequenceMatcher(None, "", folded)  # b tarafı sabit → önbellekli
+        scored = []
+        for i in self._shortlist(folded):
+            sm.set_seq1(self.keys[i])
+            sc = sm.ratio()
+            if sc >= min_score:
+                scored.append((sc, i))
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        return [(self.objs[i], sc) for sc, i in scored[:k]]
+
+    def best(self, name: str) -> Tuple[Optional[object], float]:
+        top = self.search(name, k=1)
+        return top[0] if top else (None, 0.0)
+
+
+# -------- Süreç içi önbellek (User kaydında geçersiz kılınır) --------
+_user_index: Optional[NameIndex] = None
+
+
+def invalidate_user_index():
+    global _user_index
+    _user_index = None
+
+
+def get_user_index(build) -> NameIndex:
+    """
+    Tüm kullanıcılar için indeks; ilk çağrıda build() ile kurulur ve
+    trainings.signals içindeki User post_save/post_delete ile sıfırlanır.
+    """
+    global _user_index
+    if _user_index is None:
+        _user_index = build()
+    return _user_index
@@ -86,6 +86,18 @@ def is_completed(user, training) -> bool:
     return q.filter(done).exists()
 
 
+def _notify_need(user, training, need, reason: str) -> None:
+    """Yeni ihtiyaç bildirimi; çağıranın transaction'ı içinde günlük özete eklenir."""
+    from .outbox import notify_user
+
+    title = getattr(training, "title", "") or str(training)
+    notify_user(
+        user, f"Yeni eğitim ihtiyacı: {title}",
+        f"Size '{title}' eğitimi için bir eğitim ihtiyacı tanımlandı ({reason}).",
+        kind="need", key=f"need:{need.pk}",
+    )
+
+
 @transaction.atomic
 def create_needs_for_assignment(assignment) -> int:
     """
@@ -173,7 +185,8 @@ def create_needs_for_assignment(assignment) -> int:
         if has_field(TrainingNeed, "created_at"):
             fields["created_at"] = timezone.now()
 
-        TrainingNeed.objects.create(**fields)
+        need = TrainingNeed.objects.create(**fields)
         created += 1
+        _notify_need(user, training, need, text)
 
     return created
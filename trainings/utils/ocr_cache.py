@@ -0,0 +1,151 @@
+# trainings/utils/ocr_cache.py
+"""
+PDF içerik özetine (sha256) göre disk üzerinde OCR sonuç önbelleği.
+
+Anahtar: (pdf_sha256, sayfa_no, dpi, lang, PREPROCESS_VERSION)
+Yerleşim:
+    <OCR_CACHE_DIR>/<sha[:2]>/<sha>-<dpi>-<lang>-v<ver>.json      → {"pages": N}
+    <OCR_CACHE_DIR>/<sha[:2]>/<sha>-<dpi>-<lang>-v<ver>-p0001.txt → sayfa metni
+Boyut sınırı aşılınca en eski erişilen (mtime) dosyalar silinir.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from .ocr_pipeline import PREPROCESS_VERSION
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+
+def cache_dir() -> Path:
+    return Path(getattr(settings, "OCR_CACHE_DIR", Path(settings.BASE_DIR) / ".ocr_cache"))
+
+
+def max_bytes() -> int:
+    return int(getattr(settings, "OCR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def file_sha256(path: str, block: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class OcrCache:
+    """Tek bir PDF (içerik özeti) + dpi + lang için sayfa metni önbelleği."""
+
+    def __init__(self, sha: str, dpi: int, lang: str, root: Optional[Path] = None):
+        self.sha = sha
+        self.dpi = int(dpi)
+        self.lang = lang
+        self.root = Path(root) if root else cache_dir()
+        safe_lang = re.sub(r"[^\w+]", "_", lang)
+        self.prefix = f"{sha}-{self.dpi}-{safe_lang}-v{PREPROCESS_VERSION}"
+        self.folder = self.root / sha[:2]
+
+    @classmethod
+    def for_pdf(cls, pdf_path: str, dpi: int, lang: str) -> "OcrCache":
+        return cls(file_sha256(pdf_path), dpi, lang)
+
+    # ---- yollar ----
+    def _manifest_path(self) -> Path:
+        return self.folder / f"{self.prefix}.json"
+
+    def _page_path(self, page_no: int) -> Path:
+        return self.folder / f"{self.prefix}-p{page_no:04d}.txt"
+
+    # ---- okuma ----
+    def page_count(self) -> Optional[int]:
+        p = self._manifest_path()
+        try:
+            data = json.loads(p.read_text(encoding="utf-8"))
+            os.utime(p)
+            return int(data["pages"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def get_pages(self, page_count: int) -> Dict[int, str]:
+        """Önbellekte bulunan sayfalar: {sayfa_no(1 tabanlı): metin}"""
+        found: Dict[int, str] = {}
+        for n in range(1, page_count + 1):
+            p = self._page_path(n)
+            try:
+                found[n] = p.read_text(encoding="utf-8")
+                os.utime(p)  # LRU için erişim zamanını tazele
+            except OSError:
+                continue
+        return found
+
+    # ---- yazma ----
+    def _write_atomic(self, path: Path, text: str):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def put_pages(self, page_count: int, pages: Dict[int, str]):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        for n, text in pages.items():
+            self._write_atomic(self._page_path(n), text or "")
+        self._write_atomic(self._manifest_path(), json.dumps({"pages": int(page_count)}))
+        evict(self.root, max_bytes())
+
+
+def evict(root: Path, limit: int) -> int:
+    """Toplam boyut 'limit'i aşıyorsa en eski erişilen dosyaları siler. Dönüş: silinen dosya sayısı."""
+    if not root.exists():
+        return 0
+    entries = []
+    total = 0
+    for p in root.rglob("*"):
+        if not p.is_file():
+            continue
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+        total += st.st_size
+    if total <= limit:
+        return 0
+    removed = 0
+    for _mtime, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= limit:
+            break
+        try:
+            p.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def cached_ocr_pages(pdf_path: str, lang: str, dpi: int, ocr_fn) -> List[str]:
+    """
+    Önbellekten sayfa metinlerini döndürür; eksik sayfalar için
+    ocr_fn(pages=[...]) çağrılır (sayfa sırasıyla metin listesi döndürmeli).
+    Tüm sayfalar önbellekteyse rasterize/Tesseract hiç çalışmaz.
+    """
+    from .ocr_pipeline import pdf_page_count
+
+    cache = OcrCache.for_pdf(pdf_path, dpi, lang)
+    count = cache.page_count()
+    if count is None:
+        count = pdf_page_count(pdf_path)
+    found = cache.get_pages(count)
+
+    missing = [n for n in range(1, count + 1) if n not in found]
+    if missing:
+        fresh = dict(zip(missing, ocr_fn(pages=missing)))
+        cache.put_pages(count, fresh)
+        found.update(fresh)
+    return [found.get(n, "") for n in range(1, count + 1)]
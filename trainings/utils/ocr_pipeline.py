@@ -0,0 +1,132 @@
+# trainings/utils/ocr_pipeline.py
+"""
+Sayfa bazlı, paralel OCR boru hattı.
+
+Bu modül bilerek Django'ya bağımlı DEĞİLDİR: Windows'ta ProcessPoolExecutor
+'spawn' ile çalışır ve alt süreçler bu modülü Django ayarları yüklenmeden
+import eder. (attendance_ocr modül seviyesinde get_user_model() çağırır.)
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+DEFAULT_DPI = 300
+# preprocess() değişirse artırın; OCR önbelleği anahtarının parçasıdır.
+PREPROCESS_VERSION = 1
+
+
+def require_ocr():
+    try:
+        from pdf2image import convert_from_path  # noqa
+        import pytesseract  # noqa
+        from PIL import Image, ImageFilter, ImageOps  # noqa
+    except Exception as e:
+        raise RuntimeError(
+            "OCR için 'pytesseract', 'pdf2image' ve 'Pillow' gerekli.\n"
+            "Ayrıca sistemde Tesseract kurulu olmalı (lang: tur + eng).\n"
+            f"Detay: {e}"
+        )
+
+
+def pdf_page_count(pdf_path: str) -> int:
+    """PDF sayfa sayısı (rasterize etmeden, pdfinfo ile)."""
+    require_ocr()
+    from pdf2image import pdfinfo_from_path
+    try:
+        info = pdfinfo_from_path(pdf_path)
+    except Exception as e:
+        raise RuntimeError(f"PDF okunamadı ({pdf_path}): {e}")
+    return int(info.get("Pages") or 0)
+
+
+def preprocess(img):
+    """Basit ön işleme: gri, hafif median blur, kontrast."""
+    from PIL import ImageFilter, ImageOps
+    g = ImageOps.grayscale(img)
+    g = g.filter(ImageFilter.MedianFilter(size=3))
+    # adaptive threshold benzeri:
+    g = ImageOps.autocontrast(g)
+    return g
+
+
+def ocr_page_range(args: Tuple[str, int, int, int, str]) -> List[str]:
+    """
+    [first, last] aralığındaki sayfaları geçici klasöre rasterize edip
+    tek tek OCR eder. Bellekte aynı anda yalnızca bir sayfa bitmap'i tutulur.
+    (Süreç havuzu işçisi; picklable olması için modül seviyesinde.)
+    """
+    pdf_path, first, last, dpi, lang = args
+    from pdf2image import convert_from_path
+    import pytesseract
+    from PIL import Image
+
+    texts: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="ocr_") as tmp:
+        paths = convert_from_path(
+            pdf_path, dpi=dpi, first_page=first, last_page=last,
+            output_folder=tmp, fmt="png", paths_only=True,
+        )
+        for p in sorted(paths):
+            with Image.open(p) as img:
+                text = pytesseract.image_to_string(preprocess(img), lang=lang)
+            texts.append(text or "")
+            os.remove(p)
+    return texts
+
+
+def page_chunks(page_count: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """1 tabanlı, kapsayıcı (first, last) sayfa aralıkları."""
+    chunk_size = max(1, int(chunk_size or 1))
+    return [
+        (first, min(first + chunk_size - 1, page_count))
+        for first in range(1, page_count + 1, chunk_size)
+    ]
+
+
+def ocr_pages(
+    pdf_path: str,
+    lang: str = "tur+eng",
+    dpi: int = DEFAULT_DPI,
+    workers: Optional[int] = 1,
+    chunk_size: int = 2,
+    pages: Optional[List[int]] = None,
+) -> List[str]:
+    """
+    PDF'i sayfa aralıkları halinde OCR eder; sonuçlar sayfa sırasıyla döner.
+      - workers <= 1  → aynı süreçte, aralık aralık (yine tembel rasterize)
+      - workers > 1   → ProcessPoolExecutor; her işçi bir seferde en fazla
+                        'chunk_size' sayfalık aralığı diske rasterize eder
+      - workers None  → os.cpu_count()
+    'pages' verilirse yalnızca o sayfalar (1 tabanlı) OCR edilir; dönüş sırası
+    'pages' sırasıdır.
+    """
+    require_ocr()
+    if pages is None:
+        pages = list(range(1, pdf_page_count(pdf_path) + 1))
+    if not pages:
+        return []
+
+    if pages == list(range(pages[0], pages[-1] + 1)):
+        ranges = [(pages[0] + a - 1, pages[0] + b - 1) for a, b in page_chunks(len(pages), chunk_size)]
+    else:
+        ranges = [(p, p) for p in pages]
+    jobs = [(pdf_path, a, b, dpi, lang) for a, b in ranges]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(jobs)))
+
+    texts: List[str] = []
+    if workers == 1:
+        for job in jobs:
+            texts.extend(ocr_page_range(job))
+        return texts
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() sonuçları iş sırasıyla verir → sayfa sırası korunur
+        for chunk in pool.map(ocr_page_range, jobs):
+            texts.extend(chunk)
+    return texts
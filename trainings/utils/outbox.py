@@ -0,0 +1,194 @@
+# trainings/utils/outbox.py
+"""
+Giden e-posta kuyruğu (OutboxMessage) ve send_outbox işçisi.
+
+- Bildirimler iş kaydıyla AYNI transaction içinde kuyruğa yazılır; işlem
+  geri alınırsa e-posta da gitmez, gönderim isteği yavaşlatmaz.
+- İşçi bekleyenleri sahiplenir, tek (havuzlanmış) bağlantı üzerinden
+  gönderir; hata alan mesaj üstel geri çekilmeyle (OUTBOX_BACKOFF_*)
+  yeniden denenir, --max-attempts sonunda 'failed' olur.
+- digest=True bildirimler bir sonraki OUTBOX_DIGEST_HOUR anına ertelenir;
+  o an gelince aynı alıcının bekleyenleri tek özet e-postada birleşir.
+- Testlerde EMAIL_BACKEND = locmem/console ile çalışır (get_connection).
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from itertools import groupby
+from typing import Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection as db_connection, transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .reminders import Throttle
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+# -------- Kuyruğa alma --------
+def next_digest_at(now=None):
+    """Bir sonraki özet anı (yerel saatle OUTBOX_DIGEST_HOUR)."""
+    now = timezone.localtime(now or timezone.now())
+    slot = now.replace(hour=_setting("OUTBOX_DIGEST_HOUR", 8), minute=0, second=0, microsecond=0)
+    return slot if slot > now else slot + timedelta(days=1)
+
+
+def message(to_email: str, subject: str, body_text: str, body_html: str = "", *, user=None,
+            kind: str = "", key: Optional[str] = None, digest: bool = False, send_at=None):
+    """Kaydedilmemiş OutboxMessage (enqueue_many ile toplu yazmak için)."""
+    OutboxMessage = M("OutboxMessage")
+    return OutboxMessage(
+        to_email=to_email, subject=subject[:255], body_text=body_text, body_html=body_html,
+        user=user, kind=kind, key=key, digest=digest,
+        next_attempt_at=send_at or (next_digest_at() if digest else timezone.now()),
+    )
+
+
+def enqueue_many(messages: Iterable) -> int:
+    """Adresi olanları yazar; aynı 'key' ile daha önce kuyruğa alınmış olan atlanır."""
+    rows = [m for m in messages if m.to_email]
+    if rows:
+        M("OutboxMessage").objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+    return len(rows)
+
+
+def enqueue(to_email: str, subject: str, body_text: str, body_html: str = "", **kwargs) -> int:
+    return enqueue_many([message(to_email, subject, body_text, body_html, **kwargs)])
+
+
+def notify_user(user, subject: str, body_text: str, *, kind: str = "", key: Optional[str] = None,
+                digest: bool = True) -> int:
+    """Kullanıcıya bildirim (varsayılan: günlük özete eklenir)."""
+    email = getattr(user, "email", "")
+    if not email:
+        return 0
+    return enqueue(email, subject, body_text, user=user, kind=kind, key=key, digest=digest)
+
+
+# -------- Özet --------
+def merge_digests(now=None) -> int:
+    """Zamanı gelmiş özet bildirimlerini alıcı başına tek mesajda birleştirir. Dönüş: oluşan mesaj."""
+    OutboxMessage = M("OutboxMessage")
+    now = now or timezone.now()
+    due = list(
+        OutboxMessage.objects.filter(status="pending", digest=True, next_attempt_at__lte=now)
+        .order_by("to_email", "created_at", "pk")
+    )
+    created = 0
+    for to_email, items in groupby(due, key=lambda m: m.to_email):
+        items = list(items)
+        ids = [m.pk for m in items]
+        with transaction.atomic():
+            if len(items) == 1:
+                # Tek bildirim: özet sarmalayıcısı olmadan kendisi gider
+                OutboxMessage.objects.filter(pk=ids[0], status="pending").update(digest=False)
+                continue
+            ctx = {"items": items, "count": len(items), "date": timezone.localtime(now)}
+            digest = OutboxMessage.objects.create(
+                kind="digest", to_email=to_email, user_id=items[0].user_id,
+                subject=f"Günlük özet: {len(items)} bildirim",
+                body_text=render_to_string("emails/outbox_digest.txt", ctx),
+                body_html=render_to_string("emails/outbox_digest.html", ctx),
+                next_attempt_at=now,
+            )
+            n = OutboxMessage.objects.filter(pk__in=ids, status="pending").update(
+                status="merged", merged_into=digest
+            )
+            if n != len(ids):  # başka işçi araya girdi; özeti at
+                transaction.set_rollback(True)
+                continue
+            created += 1
+    return created
+
+
+# -------- İşçi --------
+def requeue_stale(minutes: int) -> int:
+    OutboxMessage = M("OutboxMessage")
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return OutboxMessage.objects.filter(status="sending", next_attempt_at__lt=cutoff).update(status="pending")
+
+
+def claim(limit: int) -> List[int]:
+    """Gönderim zamanı gelmiş (özet olmayan) mesajlardan en fazla 'limit' tanesini sahiplenir."""
+    OutboxMessage = M("OutboxMessage")
+    now = timezone.now()
+    with transaction.atomic():
+        qs = OutboxMessage.objects.filter(status="pending", digest=False, next_attempt_at__lte=now) \
+            .order_by("next_attempt_at", "pk")
+        if db_connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        ids = list(qs.values_list("pk", flat=True)[:limit])
+        if ids:
+            OutboxMessage.objects.filter(pk__in=ids).update(
+                status="sending", attempts=F("attempts") + 1, next_attempt_at=now
+            )
+    return ids
+
+
+def backoff(attempts: int) -> timedelta:
+    base = _setting("OUTBOX_BACKOFF_BASE_SECONDS", 60)
+    cap = _setting("OUTBOX_BACKOFF_MAX_SECONDS", 6 * 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def send_claimed(ids: List[int], connection, max_attempts: int,
+                 throttle: Optional[Throttle] = None) -> Tuple[int, int, int]:
+    """
+    Sahiplenilmiş mesajları açık bağlantı üzerinden gönderir.
+    Dönüş: (gönderilen, yeniden denenecek, kalıcı hatalı).
+    """
+    OutboxMessage = M("OutboxMessage")
+    from_email = _setting("DEFAULT_FROM_EMAIL", None)
+    sent, errors = [], {}
+    msgs = list(OutboxMessage.objects.filter(pk__in=ids).order_by("pk"))
+    for m in msgs:
+        if throttle:
+            throttle.wait(1)
+        email = EmailMultiAlternatives(m.subject, m.body_text, from_email, [m.to_email], connection=connection)
+        if m.body_html:
+            email.attach_alternative(m.body_html, "text/html")
+        try:
+            # Tek mesajlık çağrı: hangi mesajın gittiği kesin bilinir, bağlantı aynı kalır
+            if connection.send_messages([email]):
+                sent.append(m.pk)
+            else:
+                errors[m.pk] = "Gönderilemedi."
+        except Exception as e:
+            errors[m.pk] = f"{type(e).__name__}: {e}"
+            connection.close()  # bozuk oturumu bırak; sonraki mesaj yeniden bağlanır
+            try:
+                connection.open()
+            except Exception:
+                pass
+
+    now = timezone.now()
+    if sent:
+        OutboxMessage.objects.filter(pk__in=sent).update(status="sent", sent_at=now, last_error="")
+    retry = dead = 0
+    for m in msgs:
+        if m.pk not in errors:
+            continue
+        if m.attempts >= max_attempts:
+            dead += 1
+            OutboxMessage.objects.filter(pk=m.pk).update(status="failed", last_error=errors[m.pk][:2000])
+        else:
+            retry += 1
+            OutboxMessage.objects.filter(pk=m.pk).update(
+                status="pending", last_error=errors[m.pk][:2000], next_attempt_at=now + backoff(m.attempts)
+            )
+    return len(sent), retry, dead
+
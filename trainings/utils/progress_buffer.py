@@ -0,0 +1,313 @@
+# trainings/utils/progress_buffer.py
+"""
+Online video ilerleme kalp atışları için süreç içi tampon.
+
+online_progress her birkaç saniyede bir çağrılır; her çağrıda satır
+güncellemek yerine (user, video) başına en büyük konum bellekte birleştirilir
+ve VIDEO_PROGRESS_FLUSH_SECONDS aralıkla tek bir toplu upsert ile yazılır.
+
+Kurallar tampon içinde uygulanır:
+  - İleri sarma sınırı: yeni_max = min(konum, önceki_max + MAX_FORWARD_SECONDS)
+  - Max konum %90'ı geçince satır beklemeden yazılır; kapsama (izlenen
+    aralıklar, watched_percent) da %90'ı tutuyorsa video ve Enrollment
+    tamamlanır. Tutmuyorsa max ilerledikçe yeniden denenir.
+Önceki max bilinmiyorsa DB'den bir kez okunur. Birden fazla süreçte tampon
+eskiyse sınır yalnızca daha katı olur; yazarken DB'deki değerle max alınır,
+böylece ilerleme hiçbir zaman geri gitmez.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .coverage import Coverage
+from .video_analytics import AnalyticsBatch
+
+logger = logging.getLogger(__name__)
+
+MAX_FORWARD_SECONDS = 5.0
+COMPLETION_RATIO = 0.90
+COMPLETION_PERCENT = int(COMPLETION_RATIO * 100)  # watched_percent eşiği
+VIDEO_META_TTL = 60.0
+IDLE_EVICT_FACTOR = 6
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+def flush_interval() -> float:
+    return float(getattr(settings, "VIDEO_PROGRESS_FLUSH_SECONDS", 10))
+
+
+@dataclass
+class Pending:
+    last: float
+    max: float
+    completed: bool
+    dirty: bool = False
+    seen: float = 0.0
+    checked: float = 0.0  # kapsama eşiği en son bu max ile denendi
+
+
+_lock = threading.Lock()
+_buf: Dict[Tuple[int, int], Pending] = {}
+# video_id → (zaman, (süre|1, eğitim) ya da None, gerçek süre|0)
+_video_meta: Dict[int, Tuple[float, Optional[Tuple[float, Optional[int]]], float]] = {}
+_flusher: Optional[threading.Thread] = None
+
+
+# -------- Video bilgisi (süre, eğitim) kısa süreli önbellek --------
+def video_meta(video_id: int) -> Optional[Tuple[float, Optional[int]]]:
+    """(duration_seconds, training_id) ya da video yok/pasifse None."""
+    now = time.monotonic()
+    hit = _video_meta.get(video_id)
+    if hit and now - hit[0] < VIDEO_META_TTL:
+        return hit[1]
+    OnlineVideo = M("OnlineVideo")
+    row = (
+        OnlineVideo.objects.filter(pk=video_id, is_active=True)
+        .values_list("duration_seconds", "training_id")
+        .first()
+    )
+    meta = (float(row[0] or 1), row[1]) if row else None
+    _video_meta[video_id] = (now, meta, float(row[0] or 0) if row else 0.0)
+    return meta
+
+
+def known_duration(video_id: int) -> float:
+    """
+    Gerçek süre; bilinmiyorsa 0. video_meta() süre yokken kırpma ve eşik
+    için 1 döndürür; izlenme yüzdesi o değerle değil bununla hesaplanır
+    (süre yokken %0 kalır, %100 görünmez).
+    """
+    video_meta(video_id)
+    hit = _video_meta.get(video_id)
+    return hit[2] if hit else 0.0
+
+
+def invalidate_video_meta(video_id: Optional[int] = None):
+    if video_id is None:
+        _video_meta.clear()
+    else:
+        _video_meta.pop(video_id, None)
+
+
+# -------- Tampon --------
+def _seed(user_id: int, video_id: int) -> Pending:
+    VideoProgress = M("VideoProgress")
+    row = (
+        VideoProgress.objects.filter(user_id=user_id, video_id=video_id)
+        .values_list("last_position_seconds", "max_position_seconds", "completed")
+        .first()
+    )
+    if row:
+        return Pending(last=float(row[0] or 0.0), max=float(row[1] or 0.0), completed=bool(row[2]))
+    return Pending(last=0.0, max=0.0, completed=False)
+
+
+def buffered_state(user_id: int, video_id: int) -> Optional[Pending]:
+    """Henüz yazılmamış tampon durumu (sayfa açılışında DB yerine kullanılır)."""
+    with _lock:
+        p = _buf.get((user_id, video_id))
+        return Pending(p.last, p.max, p.completed) if p else None
+
+
+def record(user_id: int, video_id: int, position: float, duration: float, training_id: Optional[int]) -> dict:
+    """
+    Kalp atışını tampona işler; gerekiyorsa (tamamlanma) hemen yazar.
+    Dönüş: online_progress JSON yanıtı için alanlar.
+    """
+    key = (user_id, video_id)
+    seeded = None
+    while True:
+        # Arama/ekleme ve birleştirme tek kilit alımında: flush'taki boşta
+        # kalan girdi temizliği araya girip güncellenen girdiyi düşüremez
+        with _lock:
+            p = _buf.get(key)
+            if p is None and seeded is not None:
+                p = _buf[key] = seeded
+            if p is not None:
+                allowed_new_max = min(position, p.max + MAX_FORWARD_SECONDS)
+                p.max = max(p.max, allowed_new_max)
+                p.last = min(position, p.max)
+                p.dirty = True
+                p.seen = time.monotonic()
+                try_complete = (
+                    not p.completed and p.max >= COMPLETION_RATIO * duration and p.max > p.checked
+                )
+                if try_complete:
+                    p.checked = p.max
+                new_max, completed = p.max, p.completed
+                break
+        seeded = _seed(user_id, video_id)  # kilit dışında DB okuması
+
+    just_completed = try_complete and _complete_now(user_id, video_id, training_id)
+    if just_completed:
+        with _lock:
+            p.completed = completed = True
+
+    _ensure_flusher()
+    return {
+        "allowed_max": new_max,
+        "completed": completed,
+        "just_completed": just_completed,
+        "percent": max(0, min(100, int((new_max / duration) * 100))) if duration else 0,
+        "watched_seconds": int(new_max),
+    }
+
+
+@transaction.atomic
+def _complete_now(user_id: int, video_id: int, training_id: Optional[int]) -> bool:
+    """
+    Tamponu beklemeden satırı yazar; kapsama eşiği tutuyorsa videoyu ve
+    Enrollment'ı tamamlar. Kapsama yetersizse False.
+    """
+    flush(keys=[(user_id, video_id)])
+    VideoProgress = M("VideoProgress")
+    now = timezone.now()
+    qs = VideoProgress.objects.filter(user_id=user_id, video_id=video_id, watched_percent__gte=COMPLETION_PERCENT)
+    n = qs.filter(completed=False).update(completed=True, completed_at=now, updated_at=now)
+    if n:
+        batch = AnalyticsBatch()
+        batch.complete(video_id, n)
+        batch.apply()
+    elif not qs.exists():
+        return False
+    complete_enrollment(user_id, training_id, now)
+    return True
+
+
+def complete_enrollment(user_id: int, training_id: Optional[int], now=None):
+    """Videonun eğitimi için Enrollment'ı tamamlandı yap (yoksa oluştur)."""
+    if not training_id:
+        return
+    Enrollment = M("Enrollment")
+    now = now or timezone.now()
+    enr, _ = Enrollment.objects.get_or_create(
+        user_id=user_id,
+        training_id=training_id,
+        defaults={"status": "enrolled"},
+    )
+    enr.status = "completed"
+    enr.is_passed = True
+    if not enr.completed_at:
+        enr.completed_at = now
+    enr.save(update_fields=["status", "is_passed", "completed_at"])
+
+
+def flush(keys=None) -> int:
+    """
+    Kirli tampon girdilerini tek SELECT + tek toplu upsert ile yazar.
+    Dönüş: yazılan satır sayısı.
+    """
+    with _lock:
+        items = [
+            (k, Pending(p.last, p.max, p.completed))
+            for k, p in _buf.items()
+            if p.dirty and (keys is None or k in keys)
+        ]
+        for k, _ in items:
+            _buf[k].dirty = False
+    if not items:
+        return 0
+
+    VideoProgress = M("VideoProgress")
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            user_ids = {u for (u, _v), _ in items}
+            video_ids = {v for (_u, v), _ in items}
+            current = {
+                (u, v): (m, c)
+                for u, v, m, c in VideoProgress.objects.filter(user_id__in=user_ids, video_id__in=video_ids)
+                .values_list("user_id", "video_id", "max_position_seconds", "coverage")
+            }
+            rows = []
+            analytics = AnalyticsBatch()
+            for (u, v), p in items:
+                existing = current.get((u, v))
+                db_max, db_cov = existing or (0.0, b"")
+                db_max = float(db_max or 0.0)
+                mx = max(p.max, db_max)
+                row = VideoProgress(
+                    user_id=u, video_id=v,
+                    last_position_seconds=min(p.last, mx),
+                    max_position_seconds=mx,
+                    updated_at=now,
+                )
+                # v1 yalnızca max bilir: [eski_max, yeni_max] izlenmiş sayılır
+                cov = Coverage.from_bytes(db_cov)
+                cov.add(db_max, mx)
+                meta = video_meta(v)
+                row.set_coverage(cov, known_duration(v))
+                rows.append(row)
+                if meta:
+                    analytics.move(v, meta[0], db_max if existing else None, mx)
+            VideoProgress.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["user", "video"],
+                update_fields=[
+                    "last_position_seconds", "max_position_seconds",
+                    "coverage", "watched_seconds", "watched_percent", "updated_at",
+                ],
+            )
+            analytics.apply()
+    except Exception:
+        # Yazılamadıysa tekrar denenmek üzere kirli işaretle
+        with _lock:
+            for k, _ in items:
+                if k in _buf:
+                    _buf[k].dirty = True
+        raise
+
+    # Uzun süredir kalp atışı gelmeyen temiz girdileri bellekten at
+    idle = time.monotonic() - IDLE_EVICT_FACTOR * flush_interval()
+    with _lock:
+        for k in [k for k, p in _buf.items() if not p.dirty and p.seen < idle]:
+            del _buf[k]
+    return len(rows)
+
+
+# -------- Arka plan yazıcı --------
+def _flush_loop():
+    while True:
+        time.sleep(flush_interval())
+        try:
+            flush()
+        except Exception:
+            logger.exception("[video-progress] toplu yazma hatası")
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="video-progress-flush", daemon=True)
+        _flusher.start()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("[video-progress] çıkışta yazma hatası")
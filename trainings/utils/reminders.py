@@ -0,0 +1,219 @@
+# trainings/utils/reminders.py
+"""
+Eğitim planı hatırlatmaları (send_training_reminders).
+
+- Kaynak: TrainingPlan.start_datetime (T-d günü) + TrainingPlanAttendee.
+- Şablonlar plan başına BİR KEZ, alıcı adı yerine bir işaretçiyle çizilir;
+  kişiye özel gövde yalnızca str.replace ile üretilir.
+- Tek SMTP bağlantısı açılır; mesajlar partiler halinde, parti içinde
+  tek tek aynı bağlantıdan gider (hangi mesajın gittiği kesin bilinir).
+  Partiler arası bekleme saniyedeki mesaj sınırını korur.
+- Her partide yalnızca gerçekten gönderilen mesajlar TrainingReminderLog
+  defterine yazılır; tekrar çalıştırma gönderilmişleri tek sorguda eler,
+  gidemeyenleri yeniden dener.
+- use_outbox=True: gönderim send_outbox işçisine bırakılır (bkz. outbox.py).
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+
+# Şablonda {{ recipient_name }} yerine geçer; kişiye özel değer sonra konur
+NAME_MARK = "RECIPIENTNAMEMARK"
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+@dataclass
+class DispatchResult:
+    plans: int = 0
+    sent: int = 0
+    skipped_no_email: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def _day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()), tz)
+    return start, start + timedelta(days=1)
+
+
+def due_plans(days_before: int, today=None):
+    """Başlangıcı bugün + days_before gününe düşen, iptal edilmemiş planlar."""
+    TrainingPlan = M("TrainingPlan")
+    today = today or timezone.localdate()
+    start, end = _day_bounds(today + timedelta(days=days_before))
+    return (
+        TrainingPlan.objects.filter(start_datetime__gte=start, start_datetime__lt=end)
+        .exclude(status__in=("cancelled", "completed"))
+        .select_related("training")
+        .order_by("start_datetime", "pk")
+    )
+
+
+def pending_recipients(plan, days_before: int):
+    """Bu plan/gün için henüz hatırlatma almamış katılımcılar (tek sorgu)."""
+    TrainingPlanAttendee = M("TrainingPlanAttendee")
+    TrainingReminderLog = M("TrainingReminderLog")
+    sent = TrainingReminderLog.objects.filter(
+        plan_id=plan.pk, user_id=OuterRef("user_id"), days_before=days_before
+    )
+    return (
+        TrainingPlanAttendee.objects.filter(plan=plan)
+        .exclude(Exists(sent))
+        .select_related("user")
+        .order_by("user_id")
+    )
+
+
+class PlanMessage:
+    """Plan başına önceden çizilmiş konu + metin + HTML gövde."""
+
+    def __init__(self, plan, days_before: int):
+        ctx = {
+            "plan": plan,
+            "training": plan.training,
+            "start": timezone.localtime(plan.start_datetime),
+            "end": timezone.localtime(plan.end_datetime),
+            "days_before": days_before,
+            "recipient_name": NAME_MARK,
+        }
+        self.subject = f"[Hatırlatma] {plan.training.title} - {ctx['start']:%d.%m.%Y %H:%M}"
+        self.text = render_to_string("emails/training_reminder.txt", ctx)
+        self.html = render_to_string("emails/training_reminder.html", ctx)
+
+    def bodies(self, user):
+        name = (user.get_full_name() or user.get_username()).strip()
+        return self.text.replace(NAME_MARK, name), self.html.replace(NAME_MARK, escape(name))
+
+    def build(self, user, from_email=None, connection=None) -> EmailMultiAlternatives:
+        text, html = self.bodies(user)
+        msg = EmailMultiAlternatives(self.subject, text, from_email, [user.email], connection=connection)
+        msg.attach_alternative(html, "text/html")
+        return msg
+
+
+class Throttle:
+    """Saniyedeki mesaj sınırı (0 → sınırsız)."""
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic, sleep=time.sleep):
+        self.rate, self.clock, self.sleep = rate, clock, sleep
+        self._next = clock()
+
+    def wait(self, n: int):
+        if self.rate <= 0:
+            return
+        now = self.clock()
+        if self._next > now:
+            self.sleep(self._next - now)
+            now = self._next
+        self._next = now + n / self.rate
+
+
+def dispatch(days: Iterable[int], rate: Optional[float] = None, batch_size: Optional[int] = None,
+             dry_run: bool = False, today=None, log: Callable[[str], None] = lambda s: None,
+             use_outbox: bool = False) -> DispatchResult:
+    """
+    use_outbox=True: mesajlar doğrudan gönderilmez, defter satırlarıyla aynı
+    transaction içinde OutboxMessage kuyruğuna yazılır (send_outbox gönderir).
+    """
+    TrainingReminderLog = M("TrainingReminderLog")
+    rate = getattr(settings, "REMINDER_RATE_PER_SECOND", 10) if rate is None else rate
+    batch_size = max(1, batch_size or getattr(settings, "REMINDER_BATCH_SIZE", 50))
+    result = DispatchResult()
+    throttle = Throttle(rate)
+    connection = None if (dry_run or use_outbox) else get_connection()
+    if connection is not None:
+        connection.open()  # tüm planlar için tek bağlantı
+
+    try:
+        for d in days:
+            for plan in due_plans(d, today):
+                attendees = list(pending_recipients(plan, d))
+                if not attendees:
+                    continue
+                result.plans += 1
+                tpl = PlanMessage(plan, d)
+                label = f"{plan.training.title} @ {timezone.localtime(plan.start_datetime):%d.%m.%Y %H:%M} (T-{d})"
+                users = []
+                for a in attendees:
+                    if a.user.email:
+                        users.append(a.user)
+                    else:
+                        result.skipped_no_email += 1
+                if dry_run:
+                    log(f"DRY-RUN: {label} → {len(users)} alıcı")
+                    result.sent += len(users)
+                    continue
+                if use_outbox:
+                    _enqueue_plan(plan, d, tpl, users)
+                    result.sent += len(users)
+                    log(f"{label}: {len(users)} alıcı kuyruğa alındı")
+                    continue
+
+                for i in range(0, len(users), batch_size):
+                    batch = users[i:i + batch_size]
+                    throttle.wait(len(batch))
+                    sent = []
+                    for u in batch:
+                        try:
+                            # Tek mesajlık çağrı, ortak bağlantı (bkz. outbox.send_claimed)
+                            if connection.send_messages([tpl.build(u, connection=connection)]):
+                                sent.append(u)
+                                continue
+                            error = "Gönderilemedi."
+                        except Exception as e:
+                            error = f"{type(e).__name__}: {e}"
+                            connection.close()  # bozuk oturumu bırak; sonraki mesaj yeniden bağlanır
+                            try:
+                                connection.open()
+                            except Exception:
+                                pass
+                        # Deftere yazılmaz; sonraki çalıştırma yeniden dener
+                        result.failed += 1
+                        result.errors.append(f"{label}: {u.email}: {error}")
+                    if sent:
+                        TrainingReminderLog.objects.bulk_create(
+                            [TrainingReminderLog(plan=plan, user=u, days_before=d) for u in sent],
+                            ignore_conflicts=True,
+                        )
+                    result.sent += len(sent)
+                log(f"{label}: {len(users)} alıcı")
+    finally:
+        if connection is not None:
+            connection.close()
+    return result
+
+
+def _enqueue_plan(plan, days_before: int, tpl: PlanMessage, users) -> None:
+    from .outbox import enqueue_many, message
+
+    TrainingReminderLog = M("TrainingReminderLog")
+    msgs = []
+    for u in users:
+        text, html = tpl.bodies(u)
+        msgs.append(message(u.email, tpl.subject, text, html, user=u, kind="reminder",
+                            key=f"reminder:{plan.pk}:{u.pk}:{days_before}"))
+    with transaction.atomic():
+        enqueue_many(msgs)
+        TrainingReminderLog.objects.bulk_create(
+            [TrainingReminderLog(plan=plan, user=u, days_before=days_before) for u in users],
+            ignore_conflicts=True,
+        )
@@ -0,0 +1,200 @@
+# trainings/utils/transcode.py
+"""
+Online video dönüştürme (ffmpeg/ffprobe alt süreçleri).
+
+Django'ya bağımlı değildir; transcode_videos komutu işleri bir havuzda
+çalıştırır, sonuçları (süre, küçük resim, HLS ana listesi) modele yazar.
+
+Çıktı düzeni (out_dir):
+  master.m3u8
+  360p/index.m3u8, 360p/seg_00000.ts, ...
+  540p/...  720p/...
+  thumb.jpg
+Kaynaktan yüksek çözünürlükler üretilmez (en düşük rendition her zaman kalır).
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+HLS_SEGMENT_SECONDS = 6
+THUMBNAIL_AT_RATIO = 0.10  # sürenin %10'undaki kare
+
+
+@dataclass(frozen=True)
+class Rendition:
+    name: str
+    height: int
+    video_kbps: int
+    audio_kbps: int
+
+
+# Yavaş hatlı sahalar için düşükten yükseğe
+RENDITIONS: Sequence[Rendition] = (
+    Rendition("360p", 360, 800, 96),
+    Rendition("540p", 540, 1400, 128),
+    Rendition("720p", 720, 2800, 128),
+)
+
+
+@dataclass
+class ProbeInfo:
+    duration: float
+    width: int
+    height: int
+    has_audio: bool
+
+
+@dataclass
+class TranscodeResult:
+    duration: float
+    thumbnail: Optional[str]   # out_dir içindeki dosya adı
+    master: str                # out_dir içindeki dosya adı
+    renditions: List[str]
+
+
+def require_ffmpeg():
+    for exe in ("ffmpeg", "ffprobe"):
+        if not shutil.which(exe):
+            raise RuntimeError(f"'{exe}' bulunamadı. ffmpeg kurulu ve PATH'te olmalı.")
+
+
+def _run(cmd: List[str], timeout: Optional[float] = None) -> str:
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if proc.returncode != 0:
+        tail = (proc.stderr or "").strip().splitlines()[-5:]
+        raise RuntimeError(f"{cmd[0]} başarısız ({proc.returncode}): " + " | ".join(tail))
+    return proc.stdout
+
+
+def probe(path: str) -> ProbeInfo:
+    """ffprobe ile gerçek süre, boyut ve ses akışı bilgisi."""
+    out = _run([
+        "ffprobe", "-v", "error", "-print_format", "json",
+        "-show_entries", "format=duration:stream=codec_type,width,height,duration",
+        path,
+    ], timeout=120)
+    data = json.loads(out or "{}")
+    streams = data.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if not video:
+        raise RuntimeError("Dosyada video akışı yok.")
+    duration = float((data.get("format") or {}).get("duration") or video.get("duration") or 0)
+    if duration <= 0:
+        raise RuntimeError("Video süresi okunamadı.")
+    return ProbeInfo(
+        duration=duration,
+        width=int(video.get("width") or 0),
+        height=int(video.get("height") or 0),
+        has_audio=any(s.get("codec_type") == "audio" for s in streams),
+    )
+
+
+def pick_renditions(source_height: int, ladder: Sequence[Rendition] = RENDITIONS) -> List[Rendition]:
+    """Kaynaktan büyük olmayan basamaklar; hiçbiri uymazsa en düşüğü."""
+    picked = [r for r in ladder if not source_height or r.height <= source_height]
+    return picked or [ladder[0]]
+
+
+def thumbnail_cmd(src: str, dst: str, at_seconds: float, width: int = 640) -> List[str]:
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-ss", f"{max(0.0, at_seconds):.2f}", "-i", src,
+        "-frames:v", "1", "-vf", f"scale={width}:-2", "-q:v", "3",
+        dst,
+    ]
+
+
+def hls_cmd(src: str, out_dir: str, renditions: Sequence[Rendition], has_audio: bool,
+            threads: int = 0) -> List[str]:
+    """
+    Tek ffmpeg çağrısı: kaynak bir kez çözülür, split ile her basamağa
+    ölçeklenir; var_stream_map ile basamak başına ayrı liste + master.m3u8.
+    """
+    n = len(renditions)
+    split = f"[0:v]split={n}" + "".join(f"[v{i}]" for i in range(n))
+    scales = [f"[v{i}]scale=-2:{r.height}[v{i}o]" for i, r in enumerate(renditions)]
+    cmd = [
+        "ffmpeg", "-y", "-v", "error", "-i", src,
+        "-filter_complex", ";".join([split] + scales),
+    ]
+    stream_map = []
+    for i, r in enumerate(renditions):
+        cmd += [
+            "-map", f"[v{i}o]",
+            f"-c:v:{i}", "libx264", "-preset", "veryfast", f"-profile:v:{i}", "main",
+            f"-b:v:{i}", f"{r.video_kbps}k",
+            f"-maxrate:v:{i}", f"{int(r.video_kbps * 1.07)}k",
+            f"-bufsize:v:{i}", f"{int(r.video_kbps * 1.5)}k",
+        ]
+        if has_audio:
+            cmd += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", f"{r.audio_kbps}k", "-ac", "2"]
+            stream_map.append(f"v:{i},a:{i},name:{r.name}")
+        else:
+            stream_map.append(f"v:{i},name:{r.name}")
+    cmd += [
+        # Segment sınırları tüm basamaklarda hizalı olsun (kare hızından bağımsız)
+        "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+        "-sc_threshold", "0",
+        "-threads", str(threads),
+        "-f", "hls",
+        "-hls_time", str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_flags", "independent_segments",
+        "-hls_segment_filename", os.path.join(out_dir, "%v", "seg_%05d.ts"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(stream_map),
+        os.path.join(out_dir, "%v", "index.m3u8"),
+    ]
+    return cmd
+
+
+def transcode(src: str, out_dir: str, threads: int = 0, timeout: Optional[float] = None) -> TranscodeResult:
+    """
+    Süreyi ölçer, küçük resim ve HLS basamaklarını üretir.
+    Önce geçici dizine yazar, başarıda out_dir'i atomik olarak değiştirir;
+    yarım kalan iş önceki çıktıyı bozmaz.
+    """
+    require_ffmpeg()
+    info = probe(src)
+    ladder = pick_renditions(info.height)
+
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    work = tempfile.mkdtemp(prefix=".hls-", dir=parent)
+    try:
+        for r in ladder:
+            os.makedirs(os.path.join(work, r.name), exist_ok=True)
+        _run(hls_cmd(src, work, ladder, info.has_audio, threads=threads), timeout=timeout)
+        if not os.path.exists(os.path.join(work, "master.m3u8")):
+            raise RuntimeError("ffmpeg master.m3u8 üretmedi.")
+
+        thumb = "thumb.jpg"
+        try:
+            _run(thumbnail_cmd(src, os.path.join(work, thumb), info.duration * THUMBNAIL_AT_RATIO), timeout=120)
+        except RuntimeError:
+            thumb = None  # küçük resim zorunlu değil
+
+        old = None
+        if os.path.exists(out_dir):
+            old = out_dir + ".old"
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(out_dir, old)
+        os.replace(work, out_dir)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(work, ignore_errors=True)
+        raise
+
+    return TranscodeResult(
+        duration=info.duration,
+        thumbnail=thumb,
+        master="master.m3u8",
+        renditions=[r.name for r in ladder],
+    )
@@ -0,0 +1,182 @@
+# trainings/utils/video_analytics.py
+"""
+Online video bırakma (drop-off) ve tamamlama özetleri.
+
+Her video için tek satır (VideoAnalytics): max konum histogramı (BUCKETS
+eşit dilim), izleyici ve tamamlayan sayısı. İlerleme yazan her yol
+(tampon flush, v1/v2 görünümleri, izleme sayfası) değişimleri bir
+AnalyticsBatch'e işler; apply() etkilenen satırları kilitleyip tek toplu
+güncelleme yapar. Raporlar yalnızca bu satırları okur, VideoProgress'i taramaz.
+
+Video süresi değişirse dilimler geçersizleşir: rebuild() (ya da
+rebuild_video_analytics komutu) o videoyu baştan hesaplar.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+BUCKETS = 20  # %5'lik dilimler
+FUNNEL_STEPS = (25, 50, 75, 90)
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+def bucket_of(max_position: float, duration: float) -> int:
+    if not duration or duration <= 0:
+        return 0
+    ratio = max(0.0, float(max_position or 0.0)) / float(duration)
+    return max(0, min(BUCKETS - 1, int(ratio * BUCKETS)))
+
+
+class AnalyticsBatch:
+    """
+    Bir yazma işlemi boyunca biriken değişimler.
+      move(video, süre, eski_max, yeni_max)  eski_max None → yeni izleyici
+      complete(video)                        tamamlayan +1
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._viewers: Dict[int, int] = defaultdict(int)
+        self._completed: Dict[int, int] = defaultdict(int)
+
+    def move(self, video_id: int, duration: float, old_max: Optional[float], new_max: float):
+        new_b = bucket_of(new_max, duration)
+        if old_max is None:
+            self._viewers[video_id] += 1
+        else:
+            old_b = bucket_of(old_max, duration)
+            if old_b == new_b:
+                return
+            self._buckets[video_id][old_b] -= 1
+        self._buckets[video_id][new_b] += 1
+
+    def complete(self, video_id: int, n: int = 1):
+        if n:
+            self._completed[video_id] += n
+
+    def __bool__(self):
+        return bool(self._buckets or self._completed)
+
+    @transaction.atomic
+    def apply(self) -> int:
+        """Değişimleri uygular; dönüş: güncellenen video sayısı."""
+        VideoAnalytics = M("VideoAnalytics")
+        ids = set(self._buckets) | set(self._completed)
+        if not ids:
+            return 0
+        VideoAnalytics.objects.bulk_create(
+            [VideoAnalytics(video_id=v, buckets=[0] * BUCKETS) for v in ids],
+            ignore_conflicts=True,
+        )
+        rows = list(VideoAnalytics.objects.select_for_update().filter(video_id__in=ids))
+        now = timezone.now()
+        for row in rows:
+            v = row.video_id
+            buckets = list(row.buckets or [])
+            buckets += [0] * (BUCKETS - len(buckets))
+            for b, d in self._buckets.get(v, {}).items():
+                buckets[b] = max(0, buckets[b] + d)
+            row.buckets = buckets
+            row.viewers += self._viewers.get(v, 0)
+            row.completed += self._completed.get(v, 0)
+            row.updated_at = now
+        VideoAnalytics.objects.bulk_update(rows, ["buckets", "viewers", "completed", "updated_at"])
+        self.__init__()
+        return len(rows)
+
+
+def track(video_id: int, duration: float, old_max: Optional[float], new_max: float,
+          completed: bool = False):
+    """Tek satırlık değişim için kısayol."""
+    batch = AnalyticsBatch()
+    batch.move(video_id, duration, old_max, new_max)
+    if completed:
+        batch.complete(video_id)
+    if batch:
+        batch.apply()
+
+
+# -------- Yeniden hesaplama (backfill / süre değişimi) --------
+@transaction.atomic
+def rebuild(video_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Özetleri VideoProgress'ten baştan hesaplar (tam tarama; yalnızca
+    ilk kurulumda veya süre değişince). Dönüş: hesaplanan video sayısı.
+    """
+    OnlineVideo, VideoProgress, VideoAnalytics = M("OnlineVideo"), M("VideoProgress"), M("VideoAnalytics")
+    videos = OnlineVideo.objects.all()
+    if video_ids is not None:
+        videos = videos.filter(pk__in=list(video_ids))
+    durations = dict(videos.values_list("id", "duration_seconds"))
+    if not durations:
+        return 0
+
+    # Artımlı güncellemeler bu sırada beklesin
+    list(VideoAnalytics.objects.select_for_update().filter(video_id__in=durations).values_list("pk"))
+
+    acc = {v: ([0] * BUCKETS, [0], [0]) for v in durations}
+    qs = (
+        VideoProgress.objects.filter(video_id__in=durations)
+        .values_list("video_id", "max_position_seconds", "completed")
+        .iterator(chunk_size=5000)
+    )
+    for v, mx, done in qs:
+        buckets, viewers, completed = acc[v]
+        buckets[bucket_of(mx, durations[v])] += 1
+        viewers[0] += 1
+        completed[0] += 1 if done else 0
+
+    VideoAnalytics.objects.bulk_create(
+        [
+            VideoAnalytics(video_id=v, buckets=b, viewers=n[0], completed=c[0])
+            for v, (b, n, c) in acc.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["video"],
+        update_fields=["buckets", "viewers", "completed", "updated_at"],
+        batch_size=500,
+    )
+    return len(acc)
+
+
+# -------- Raporlar (yalnızca özet satırları) --------
+def dropoff_curve(row) -> List[dict]:
+    """
+    Dilim başına: o dilimin başlangıcına ulaşan izleyici sayısı ve oranı.
+    reached[i] = buckets[i:] toplamı (histogramın sondan kümülatifi).
+    """
+    buckets = list(row.buckets or []) + [0] * BUCKETS
+    buckets = buckets[:BUCKETS]
+    viewers = row.viewers or 0
+    out, running = [], 0
+    for i in range(BUCKETS - 1, -1, -1):
+        running += buckets[i]
+        out.append({
+            "from_percent": i * 100 // BUCKETS,
+            "stopped": buckets[i],
+            "reached": running,
+            "ratio": round(running / viewers, 4) if viewers else 0.0,
+        })
+    out.reverse()
+    return out
+
+
+def funnel(row) -> dict:
+    """İzleyici → %25 → %50 → %75 → %90 → tamamlayan."""
+    curve = dropoff_curve(row)
+    steps = [{"label": "Başladı", "count": row.viewers or 0}]
+    for pct in FUNNEL_STEPS:
+        steps.append({"label": f"%{pct}", "count": curve[pct * BUCKETS // 100]["reached"]})
+    steps.append({"label": "Tamamladı", "count": row.completed or 0})
+    return {"video_id": row.video_id, "viewers": row.viewers or 0, "steps": steps}
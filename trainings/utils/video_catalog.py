@@ -0,0 +1,67 @@
+# trainings/utils/video_catalog.py
+"""
+Online video kataloğu için süreç içi önbellek (online_list).
+
+Katalog nadiren değişir; her istekte OnlineVideo + Training join'i yerine
+salt-okunur satırlar bellekte tutulur. OnlineVideo/Training kaydı değişince
+trainings.signals sıfırlar; çok süreçli kurulumlarda diğer süreçler en geç
+CATALOG_TTL sonra tazelenir.
+"""
+from __future__ import annotations
+
+import time
+from typing import Optional, Tuple
+
+from django.apps import apps
+
+CATALOG_TTL = 300.0
+
+_catalog: Optional[Tuple[float, Tuple[dict, ...]]] = None
+_generation = 0  # kurulum sırasında gelen sıfırlama eski satırları yazdırmasın
+
+
+def M(name: str):
+    try:
+        return apps.get_model("trainings", name)
+    except Exception:
+        return None
+
+
+def _build() -> Tuple[dict, ...]:
+    OnlineVideo = M("OnlineVideo")
+    rows = (
+        OnlineVideo.objects.filter(is_active=True)
+        .order_by("-created_at")
+        .values_list("id", "title", "training__title", "thumbnail", "duration_seconds")
+    )
+    storage = OnlineVideo._meta.get_field("thumbnail").storage
+    return tuple(
+        {
+            "id": pk,
+            "pk": pk,
+            "title": title or training_title or "",
+            "thumbnail_url": storage.url(thumb) if thumb else "",
+            "duration_seconds": int(duration or 0),
+        }
+        for pk, title, training_title, thumb, duration in rows
+    )
+
+
+def get_catalog() -> Tuple[dict, ...]:
+    """Aktif videolar (yeniden eskiye). Satırlar paylaşılır: değiştirmeyin."""
+    global _catalog
+    now = time.monotonic()
+    hit = _catalog
+    if hit and now - hit[0] < CATALOG_TTL:
+        return hit[1]
+    gen = _generation
+    rows = _build()
+    if gen == _generation:
+        _catalog = (now, rows)
+    return rows
+
+
+def invalidate_catalog():
+    global _catalog, _generation
+    _generation += 1
+    _catalog = None
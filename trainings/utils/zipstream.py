@@ -0,0 +1,61 @@
+# trainings/utils/zipstream.py
+"""
+Bellekte tüm arşivi tutmadan ZIP üretimi (StreamingHttpResponse için).
+
+zipfile konumlanamayan (seek edilemeyen) bir hedefe yazarken yerel başlıktan
+sonra veri tanımlayıcı (data descriptor) kullanır; hedef her yazımı küçük bir
+tampona alır, üreteç bu tamponu parça parça boşaltır.
+"""
+from __future__ import annotations
+
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+CHUNK = 64 * 1024
+
+
+class _Sink:
+    """Yalnızca write destekleyen hedef; tell/seek yok → zipfile akış moduna geçer."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        if data:
+            self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_zip(files: Iterable[Tuple[str, str]], compression: int = zipfile.ZIP_STORED) -> Iterator[bytes]:
+    """
+    (arşiv içindeki ad, disk yolu) çiftlerinden ZIP akışı. PDF'ler zaten
+    sıkıştırılmış olduğundan varsayılan ZIP_STORED'dır.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", compression=compression, allowZip64=True) as zf:
+        for arcname, path in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+            with open(path, "rb") as src, zf.open(info, mode="w") as dst:
+                while True:
+                    block = src.read(CHUNK)
+                    if not block:
+                        break
+                    dst.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    data = sink.drain()
+    if data:
+        yield data
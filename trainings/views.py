@@ -1,10 +1,17 @@
 # trainings/views.py
+import os
+
 from django.apps import apps
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
-from django.http import Http404, HttpResponse, FileResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import quote_etag
+
+from .utils.byteserve import serve_file
+from .utils.certificates import file_digest, generate_now, max_attempts
 
 def M(name: str):
     try:
@@ -65,20 +72,50 @@ def enroll(request, pk):
 
 
 def download_certificate(request, pk):
+    """
+    Sertifika PDF'i: dosya özeti+boyutundan güçlü ETag (If-None-Match → 304),
+    MEDIA_SENDFILE ayarıyla ön sunucuya devretme. Dosya yoksa kuyruğa alınır
+    (202) ya da CERTIFICATE_ON_DEMAND açıksa istek içinde üretilir. Deneme
+    hakkı tükenmiş hatalı kayıt kuyrukta ilerlemez; 202 yerine hata döner.
+    """
     if Certificate is None:
         raise Http404("Certificate modeli bulunamadı.")
-    cert = get_object_or_404(Certificate, pk=pk)
+    cert = get_object_or_404(
+        Certificate.objects.only("id", "user_id", "serial", "status", "attempts", "error", "file", "file_sha256"),
+        pk=pk,
+    )
     if not (request.user.is_staff or cert.user_id == getattr(request.user, "id", None)):
         raise Http404("Bu sertifikaya erişiminiz yok.")
-    for cand in ("file", "pdf", "document"):
-        f = getattr(cert, cand, None)
-        if f:
-            return FileResponse(
-                f.open("rb"),
-                as_attachment=True,
-                filename=getattr(f, "name", f"certificate-{pk}.pdf"),
+
+    if not (cert.file and os.path.exists(cert.file.path)):
+        if cert.status == "ready":  # kayıt hazır ama dosya kaybolmuş
+            Certificate.objects.filter(pk=pk, status="ready").update(status="pending", attempts=0)
+            cert.status = "pending"
+        if cert.status == "failed" and cert.attempts >= max_attempts():
+            msg = f"Sertifika #{pk} üretilemedi ({cert.attempts} deneme). Lütfen yöneticiye başvurun."
+            if request.user.is_staff and cert.error:
+                msg += f"\n\nHata: {cert.error}"
+            return HttpResponse(msg, content_type="text/plain", status=500)
+        if getattr(settings, "CERTIFICATE_ON_DEMAND", False) and cert.status != "processing" and generate_now(pk):
+            cert.refresh_from_db(fields=["serial", "status", "file", "file_sha256"])
+        else:
+            resp = HttpResponse(
+                f"Sertifika #{pk} hazırlanıyor, lütfen biraz sonra tekrar deneyin.",
+                content_type="text/plain", status=202,
             )
-    return HttpResponse(f"Sertifika #{pk} indirilemedi (dosya bulunamadı).", content_type="text/plain")
+            resp["Retry-After"] = "30"
+            return resp
+
+    path = cert.file.path
+    etag = quote_etag(f"{file_digest(cert)[:32]}-{os.path.getsize(path):x}")
+    return serve_file(
+        request, path,
+        content_type="application/pdf",
+        filename=f"{cert.serial or f'sertifika-{pk}'}.pdf",
+        as_attachment=True,
+        etag=etag,
+        cache_control="private, max-age=86400",  # düzenlenen sertifika değişmez
+    )
 
 
 def whoami(request):
@@ -0,0 +1,68 @@
+# trainings/views_analytics.py
+"""
+Online video izlenme raporları (YALNIZCA STAFF).
+Yalnızca VideoAnalytics özet satırlarını okur; VideoProgress taranmaz.
+"""
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_GET
+
+from .models import OnlineVideo, VideoAnalytics
+from .utils.video_analytics import BUCKETS, dropoff_curve, funnel
+
+
+def _analytics_of(video):
+    try:
+        return video.analytics
+    except VideoAnalytics.DoesNotExist:
+        return VideoAnalytics(video=video, buckets=[0] * BUCKETS)
+
+
+def _videos():
+    return (
+        OnlineVideo.objects.filter(is_active=True)
+        .select_related("training", "analytics")
+        .order_by("-created_at")
+    )
+
+
+@require_GET
+@staff_member_required
+def api_video_dropoff(request, pk: int):
+    video = get_object_or_404(OnlineVideo.objects.select_related("analytics"), pk=pk)
+    row = _analytics_of(video)
+    return JsonResponse({
+        "video_id": video.pk,
+        "duration_seconds": video.duration_seconds,
+        "viewers": row.viewers,
+        "completed": row.completed,
+        "buckets": BUCKETS,
+        "curve": dropoff_curve(row),
+    })
+
+
+@require_GET
+@staff_member_required
+def api_video_funnel(request):
+    data = []
+    for v in _videos():
+        item = funnel(_analytics_of(v))
+        item["title"] = v.title or v.training.title
+        data.append(item)
+    return JsonResponse({"results": data})
+
+
+@staff_member_required
+def video_analytics_report(request):
+    """Video başına tamamlama hunisi + bırakma eğrisi (tek sorgu)."""
+    rows = []
+    for v in _videos():
+        a = _analytics_of(v)
+        rows.append({
+            "video": v,
+            "funnel": funnel(a)["steps"],
+            "curve": dropoff_curve(a),
+            "viewers": a.viewers,
+        })
+    return render(request, "trainings/video_analytics.html", {"rows": rows})
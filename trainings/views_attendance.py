@@ -0,0 +1,92 @@
+# trainings/views_attendance.py
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import get_object_or_404, redirect, render
+
+from .models import AttendanceImportLine, AttendanceImportSession
+from .utils.attendance_ocr import confirm_session, rematch_session
+
+
+def _selected_lines(request, session):
+    ids = [int(x) for x in request.POST.getlist("line") if str(x).isdigit()]
+    return list(session.lines.filter(pk__in=ids))
+
+
+@staff_member_required
+def attendance_import_review(request, pk: int):
+    """
+    OCR katılım listesi inceleme sayfası (YALNIZCA STAFF).
+    Satırlar en iyi k öneriyle listelenir; seçili satırlar toplu kabul/red
+    edilir, 'Onayla' tüm kabulleri tek işlemde plana ve katılımlara uygular.
+    """
+    session = get_object_or_404(
+        AttendanceImportSession.objects.select_related("plan", "plan__training"), pk=pk
+    )
+
+    if request.method == "POST":
+        action = request.POST.get("action")
+        if session.status != "pending":
+            messages.error(request, "Bu oturum artık düzenlenemez.")
+            return redirect("attendance_import_review", pk=pk)
+
+        if action in ("accept", "reject"):
+            rows = _selected_lines(request, session)
+            invalid = []
+            for ln in rows:
+                if action == "accept":
+                    choice = request.POST.get(f"user_{ln.pk}") or ""
+                    if choice.isdigit():
+                        # Yalnızca satırın önerileri (ya da mevcut eşleşmesi) seçilebilir
+                        allowed = {sg["user_id"] for sg in ln.suggestions or []} | {ln.user_id}
+                        if int(choice) not in allowed:
+                            invalid.append(ln)
+                            continue
+                        ln.user_id = int(choice)
+                    elif ln.suggestions:
+                        ln.user_id = ln.suggestions[0]["user_id"]
+                    ln.decision = "accepted" if ln.user_id else "pending"
+                else:
+                    ln.decision = "rejected"
+            if invalid:
+                messages.error(
+                    request,
+                    "Geçersiz kullanıcı seçimi (satır " + ", ".join(str(ln.position) for ln in invalid)
+                    + "); hiçbir satır güncellenmedi.",
+                )
+                return redirect("attendance_import_review", pk=pk)
+            AttendanceImportLine.objects.bulk_update(rows, ["user", "decision"])
+            messages.success(request, f"{len(rows)} satır güncellendi.")
+
+        elif action == "rematch":
+            try:
+                min_score = float(request.POST.get("min_score") or session.min_score)
+            except ValueError:
+                min_score = session.min_score
+            n = rematch_session(session, min_score=min_score)
+            messages.success(request, f"Kayıtlı OCR metninden {n} satır yeniden eşleştirildi.")
+
+        elif action == "confirm":
+            added, completed = confirm_session(
+                session,
+                user=request.user,
+                complete_enrollments=bool(request.POST.get("complete_enrollments")),
+            )
+            messages.success(request, f"Onaylandı: {added} katılımcı eklendi, {completed} katılım tamamlandı.")
+
+        elif action == "cancel":
+            session.status = "cancelled"
+            session.save(update_fields=["status"])
+            messages.info(request, "Oturum iptal edildi.")
+
+        return redirect("attendance_import_review", pk=pk)
+
+    lines = list(session.lines.select_related("user"))
+    counts = {"accepted": 0, "rejected": 0, "pending": 0}
+    for ln in lines:
+        counts[ln.decision] = counts.get(ln.decision, 0) + 1
+    return render(request, "trainings/attendance_review.html", {
+        "session": session,
+        "lines": lines,
+        "counts": counts,
+        "editable": session.status == "pending",
+    })
@@ -1,30 +1,44 @@
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, render
+from django.db import transaction
 from django.utils import timezone
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, require_safe
 
 from .models import OnlineVideo, VideoProgress, Enrollment
+from .utils import coverage, progress_buffer, video_analytics, video_catalog
+from .utils.byteserve import serve_file
+
+# v2: istemci bu aralıkla toplu gönderir; sunucu tek istekte en fazla
+# (geçen süre, üst sınır V2_MAX_BATCH_SECONDS) + 5 sn ilerlemeye izin verir.
+V2_BATCH_SECONDS = 15
+V2_MAX_BATCH_SECONDS = 2 * V2_BATCH_SECONDS
+
 
+def _buffered() -> bool:
+    return bool(getattr(settings, "VIDEO_PROGRESS_BUFFERED", True))
 
-def _progress_maps(user, videos):
+
+def _progress_maps(user):
     """
-    Kullanıcının ilerleme haritaları:
-      - pct_map: {video_id: yüzde_int}
-      - sec_map: {video_id: max_position_seconds_float}
+    Kullanıcının ilerleme haritaları (önbellek alanlarından; aralık çözülmez):
+      - pct_map: {video_id: izlenme_yüzdesi_int}
+      - sec_map: {video_id: izlenen_saniye}
+    Tek sorgu, (user, video) indeksinin ön eki üzerinden; katalog ile
+    eşleştirme bellekte yapılır (video alt sorgusu yok).
     """
     pct_map, sec_map = {}, {}
     if not user.is_authenticated:
         return pct_map, sec_map
-    qs = VideoProgress.objects.filter(user=user, video__in=videos).values(
-        "video_id", "max_position_seconds", "video__duration_seconds"
+    qs = VideoProgress.objects.filter(user_id=user.pk).values_list(
+        "video_id", "watched_percent", "watched_seconds"
     )
-    for row in qs:
-        dur = float(row["video__duration_seconds"] or 1.0)
-        secs = float(row["max_position_seconds"] or 0.0)
-        pct = int((secs / dur) * 100)
-        pct_map[row["video_id"]] = max(0, min(100, pct))
-        sec_map[row["video_id"]] = max(0.0, secs)
+    for video_id, pct, secs in qs:
+        pct_map[video_id] = max(0, min(100, int(pct or 0)))
+        sec_map[video_id] = max(0, int(secs or 0))
     return pct_map, sec_map
 
 
@@ -33,13 +47,19 @@ def online_list(request):
     Online videolar listesi. Kartların altında:
       - İlerleme: %X
       - İzlenen: H:M:S
-      - Toplam süre (video.duration_hours_display)
+      - Toplam süre
+    Katalog önbellekten gelir (utils/video_catalog); sayfa en fazla 2 sorgu
+    çalıştırır (soğuk katalog + kullanıcı ilerlemesi).
     """
-    videos = OnlineVideo.objects.filter(is_active=True).select_related("training").order_by("-created_at")
-    pct_map, sec_map = _progress_maps(request.user, videos)
-    for v in videos:
-        v.progress_percent = pct_map.get(v.id, 0)
-        v.progress_seconds = int(sec_map.get(v.id, 0))
+    catalog = video_catalog.get_catalog()
+    if request.user.is_authenticated:
+        pct_map, sec_map = _progress_maps(request.user)
+        videos = [
+            dict(v, progress_percent=pct_map.get(v["id"], 0), progress_seconds=sec_map.get(v["id"], 0))
+            for v in catalog
+        ]
+    else:
+        videos = catalog
     return render(request, "trainings/online_list.html", {"videos": videos})
 
 
@@ -47,7 +67,15 @@ def online_list(request):
 def online_watch(request, pk: int):
     """Video izleme sayfası + kaldığı yerden devam bilgisi."""
     video = get_object_or_404(OnlineVideo.objects.select_related("training"), pk=pk, is_active=True)
-    vp, _ = VideoProgress.objects.get_or_create(user=request.user, video=video)
+    vp, created = VideoProgress.objects.get_or_create(user=request.user, video=video)
+    if created:
+        video_analytics.track(video.pk, float(video.duration_seconds or 1), None, 0.0)
+    if _buffered():
+        # Henüz DB'ye yazılmamış kalp atışları varsa onları göster
+        pending = progress_buffer.buffered_state(request.user.id, video.pk)
+        if pending and pending.max > float(vp.max_position_seconds or 0.0):
+            vp.max_position_seconds = pending.max
+            vp.last_position_seconds = pending.last
 
     allowed_max = float(vp.max_position_seconds or 0.0)
     dur = float(video.duration_seconds or 1.0)
@@ -62,15 +90,68 @@ def online_watch(request, pk: int):
     return render(request, "trainings/online_watch.html", ctx)
 
 
+@login_required
+@require_safe
+def online_video_stream(request, pk: int):
+    """
+    Video dosyasını yetkili kullanıcıya sunar (MEDIA_URL yerine).
+    Range/206 ile ileri-geri sarma, If-Range/ETag ile güvenli devam desteklenir;
+    MEDIA_SENDFILE ayarlıysa gövde ön sunucuya devredilir.
+    """
+    video = get_object_or_404(OnlineVideo.objects.only("id", "video", "is_active"), pk=pk, is_active=True)
+    if not video.video:
+        raise Http404("Video dosyası yok.")
+    try:
+        path = video.video.path
+    except NotImplementedError:
+        raise Http404("Video yerel depoda değil.")
+    try:
+        return serve_file(request, path, content_type="video/mp4")
+    except FileNotFoundError:
+        raise Http404("Video dosyası bulunamadı.")
+
+
+# HLS dosyaları: ana/basamak listeleri kısa, segmentler uzun süre önbelleklenir
+_HLS_TYPES = {
+    ".m3u8": ("application/vnd.apple.mpegurl", "private, max-age=0, must-revalidate"),
+    ".ts": ("video/mp2t", "private, max-age=86400"),
+}
+
+
+@login_required
+@require_safe
+def online_video_hls(request, pk: int, name: str):
+    """
+    transcode_videos ile üretilen HLS listelerini/segmentlerini sunar.
+    Listeler göreli yol kullandığından master.m3u8 ile aynı URL altında kalır.
+    """
+    video = get_object_or_404(
+        OnlineVideo.objects.only("id", "is_active", "hls_status", "hls_master"),
+        pk=pk, is_active=True, hls_status="ready",
+    )
+    kind = _HLS_TYPES.get(Path(name).suffix.lower())
+    if not kind or not video.hls_master:
+        raise Http404("Dosya yok.")
+    base = (Path(settings.MEDIA_ROOT) / video.hls_master).parent.resolve()
+    target = (base / name).resolve()
+    if base not in target.parents:
+        raise Http404("Dosya yok.")
+    try:
+        return serve_file(request, target, content_type=kind[0], cache_control=kind[1])
+    except FileNotFoundError:
+        raise Http404("Dosya yok.")
+
+
 @login_required
 @require_POST
 def online_progress(request, pk: int):
     """
     İstemciden { position: saniye } alır.
     İleri sarma kısıtı: max + 5 saniye.
-    %90 eşiğinde tamamlandı sayar ve Enrollment'ı tamamlar.
+    Kapsama (izlenen aralıklar) %90'ı geçince tamamlandı sayar ve Enrollment'ı tamamlar.
+    VIDEO_PROGRESS_BUFFERED açıksa (varsayılan) kalp atışları bellekte
+    birleştirilip aralıklı toplu yazılır (bkz. utils/progress_buffer.py).
     """
-    video = get_object_or_404(OnlineVideo.objects.select_related("training"), pk=pk, is_active=True)
     try:
         position = float(request.POST.get("position", "0"))
     except (TypeError, ValueError):
@@ -78,7 +159,17 @@ def online_progress(request, pk: int):
     if position < 0:
         position = 0.0
 
-    vp, _ = VideoProgress.objects.get_or_create(user=request.user, video=video)
+    if _buffered():
+        meta = progress_buffer.video_meta(pk)
+        if meta is None:
+            raise Http404("Video bulunamadı.")
+        dur, training_id = meta
+        data = progress_buffer.record(request.user.id, pk, position, dur, training_id)
+        return JsonResponse({"ok": True, **data})
+
+    video = get_object_or_404(OnlineVideo.objects.select_related("training"), pk=pk, is_active=True)
+
+    vp, created = VideoProgress.objects.get_or_create(user=request.user, video=video)
 
     prev_max = float(vp.max_position_seconds or 0.0)
     allowed_new_max = min(position, prev_max + 5.0)  # en fazla +5 sn ilerleme
@@ -88,10 +179,12 @@ def online_progress(request, pk: int):
     vp.last_position_seconds = min(position, new_max)
 
     dur = float(video.duration_seconds or 1)
-    threshold = 0.90 * dur
+    cov = vp.get_coverage()
+    cov.add(prev_max, new_max)
+    vp.set_coverage(cov, float(video.duration_seconds or 0))  # süre bilinmiyorsa %0
 
     just_completed = False
-    if (not vp.completed) and (new_max >= threshold):
+    if (not vp.completed) and vp.watched_percent >= progress_buffer.COMPLETION_PERCENT:
         vp.completed = True
         vp.completed_at = timezone.now()
         just_completed = True
@@ -111,8 +204,81 @@ def online_progress(request, pk: int):
 
     vp.save(update_fields=[
         "max_position_seconds", "last_position_seconds",
+        "coverage", "watched_seconds", "watched_percent",
         "completed", "completed_at", "updated_at"
     ])
+    video_analytics.track(video.pk, dur, None if created else prev_max, new_max, completed=just_completed)
+
+    return JsonResponse({
+        "ok": True,
+        "allowed_max": new_max,
+        "completed": vp.completed,
+        "just_completed": just_completed,
+        "percent": int((new_max / dur) * 100),
+        "watched_seconds": int(new_max),
+    })
+
+
+@login_required
+@require_POST
+def online_progress_v2(request, pk: int):
+    """
+    v2 ilerleme protokolü: istemci izlenen aralıkları toplu gönderir
+      intervals = '[[0,30],[30,62]]'   (JSON, saniye)
+    Aralıklar kullanıcının kapsama listesine birleştirilir.
+    İleri sarma kısıtı: bu istekte max en fazla
+      min(son kayıttan geçen süre, V2_MAX_BATCH_SECONDS) + 5 sn ilerleyebilir;
+    daha ileriden başlayan aralıklar atılır. Tamamlanma v1 ile aynı: kapsama %90.
+    """
+    meta = progress_buffer.video_meta(pk)
+    if meta is None:
+        raise Http404("Video bulunamadı.")
+    dur, training_id = meta
+    try:
+        intervals = coverage.parse_intervals(request.POST.get("intervals") or "[]", dur)
+    except (TypeError, ValueError):
+        return HttpResponseBadRequest("bad intervals")
+
+    if _buffered():
+        # v1 kalp atışlarından bekleyen varsa önce onları yaz
+        progress_buffer.flush(keys=[(request.user.id, pk)])
+
+    now = timezone.now()
+    with transaction.atomic():
+        vp, created = VideoProgress.objects.select_for_update().get_or_create(user=request.user, video_id=pk)
+        prev_max = float(vp.max_position_seconds or 0.0)
+        elapsed = V2_MAX_BATCH_SECONDS if created else (now - vp.updated_at).total_seconds()
+        limit = prev_max + max(0.0, min(elapsed, V2_MAX_BATCH_SECONDS)) + 5.0
+
+        accepted = []
+        for s, e in sorted(intervals):
+            if s > limit:
+                break  # izin verilen noktanın ötesine atlama
+            if min(e, limit) > s:
+                accepted.append([s, min(e, limit)])
+
+        cov = vp.get_coverage()
+        for s, e in accepted:
+            cov.add(s, e)
+        vp.set_coverage(cov, progress_buffer.known_duration(pk))  # süre bilinmiyorsa %0
+        new_max = max([prev_max] + [e for _s, e in accepted])
+        vp.max_position_seconds = new_max
+        if accepted:
+            vp.last_position_seconds = accepted[-1][1]
+
+        just_completed = False
+        if (not vp.completed) and vp.watched_percent >= progress_buffer.COMPLETION_PERCENT:
+            vp.completed = True
+            vp.completed_at = now
+            just_completed = True
+            progress_buffer.complete_enrollment(request.user.id, training_id, now)
+
+        vp.save(update_fields=[
+            "max_position_seconds", "last_position_seconds",
+            "coverage", "watched_seconds", "watched_percent",
+            "completed", "completed_at", "updated_at",
+        ])
+        video_analytics.track(pk, dur, None if created else prev_max, new_max, completed=just_completed)
 
     return JsonResponse({
         "ok": True,
@@ -121,4 +287,5 @@ def online_progress(request, pk: int):
         "just_completed": just_completed,
         "percent": int((new_max / dur) * 100),
         "watched_seconds": int(new_max),
+        "coverage_percent": vp.watched_percent,
     })
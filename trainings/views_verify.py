@@ -0,0 +1,36 @@
+# trainings/views_verify.py
+"""
+Herkese açık sertifika doğrulama (denetçiler, QR okutma).
+Oturum gerektirmez; IP başına istek sınırı uygulanır.
+"""
+from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from .utils.cert_verify import check_signature, lookup, mask_name, normalize_serial, rate_limited
+
+
+@never_cache
+@require_GET
+def verify_certificate(request, serial: str):
+    serial = normalize_serial(serial)
+    if rate_limited(request):
+        resp = render(request, "trainings/certificate_verify.html",
+                      {"serial": serial, "throttled": True}, status=429)
+        resp["Retry-After"] = "60"
+        return resp
+
+    row = lookup(serial)
+    if row is None:
+        return render(request, "trainings/certificate_verify.html", {"serial": serial}, status=404)
+
+    signed = check_signature(serial, request.GET.get("s", ""))
+    expired = bool(row["expires_at"] and row["expires_at"] < timezone.now())
+    return render(request, "trainings/certificate_verify.html", {
+        "serial": serial,
+        "cert": row,
+        "holder": row["fullname"] if signed else mask_name(row["fullname"]),
+        "signed": signed,
+        "expired": expired,
+    })